@@ -1,18 +1,27 @@
 import streamlit as st 
+import hashlib
 import json
 import random
 import time
+import uuid
 from datetime import datetime, date
 
 # ─── Local Modules ───────────────────────────────────────────────────────────
 from resume_extractor import extract_all_from_resume, SKILLS_DATABASE
 from speech_handler import (
-    check_dependencies, get_prompt, transcribe_audio,
+    check_dependencies, get_prompt, submit_transcription, submit_session,
+    IncompleteSessionError,
+    field_grammars, rerank, record_retry,
     post_process_email, post_process_phone, post_process_name,
-    post_process_gender, post_process_education, post_process_skills,
-    LANGUAGE_MAP, get_audio_recorder,
+    LANGUAGE_MAP, get_audio_recorder, LocalWhisperBackend,
 )
-from fraud_checker import run_fraud_check, calculate_health_score
+from scoring import score
+from duplicate_index import DuplicateIndex
+from velocity import SqliteVelocityLimiter
+from image_hash import ImageHashIndex, document_hash
+from population_stats import PopulationStats
+from decision_log import DecisionLog
+from vocab_resolver import build_resolver
 
 # ─── Page Configuration ─────────────────────────────────────────────────────
 st.set_page_config(
@@ -223,6 +232,86 @@ TRENDING_JOBS = {
     ],
 }
 
+# How often the page re-runs to pick up voice clips still transcribing
+VOICE_POLL_SECONDS = 0.5
+
+
+# ─── Shared Resources ───────────────────────────────────────────────────────
+@st.cache_resource
+def get_duplicate_index():
+    """Process-wide duplicate registration index (shared by all sessions)."""
+    return DuplicateIndex(bloom_path="deet_registrations.bloom")
+
+
+@st.cache_resource
+def get_velocity_limiter():
+    """Process-wide registration velocity counters (shared via SQLite)."""
+    return SqliteVelocityLimiter()
+
+
+@st.cache_resource
+def get_image_index():
+    """Process-wide perceptual-hash index of uploaded documents."""
+    return ImageHashIndex()
+
+
+@st.cache_resource
+def get_population_stats():
+    """Process-wide cohort statistics, synced with other processes in SQLite."""
+    stats = PopulationStats.load()
+    stats.start_sync()
+    return stats
+
+
+@st.cache_resource
+def get_local_asr_backend():
+    """Offline speech recognizer, loaded and warmed once per process.
+    Returns (backend, error message)."""
+    try:
+        return LocalWhisperBackend().warm_up(), None
+    except ImportError:
+        return None, "Install the offline engine: pip install faster-whisper"
+    except Exception as e:
+        return None, str(e)
+
+
+@st.cache_resource
+def get_decision_log():
+    """Process-wide background writer for the fraud decision audit log."""
+    return DecisionLog()
+
+
+@st.cache_resource
+def get_fraud_model():
+    """Trained fraud model if numpy and a model file are available."""
+    try:
+        from fraud_model import FraudModel
+    except ImportError:
+        return None
+    return FraudModel.load()
+
+
+@st.cache_resource
+def get_vocab_resolver():
+    """Spoken-answer resolver over the form's option lists."""
+    return build_resolver(EDUCATION_OPTIONS, TELANGANA_DISTRICTS, ALL_SKILLS)
+
+
+@st.cache_resource
+def get_voice_grammars():
+    """Per-field grammars used to rerank recognizer alternatives."""
+    return field_grammars(get_vocab_resolver())
+
+
+def get_device_keys():
+    """Session and client-address keys for velocity limits."""
+    keys = {"session": st.session_state.session_uid}
+    headers = getattr(getattr(st, "context", None), "headers", None) or {}
+    client_ip = (headers.get("X-Forwarded-For") or "").split(",")[0].strip()
+    if client_ip:
+        keys["device"] = client_ip
+    return keys
+
 
 # ─── Session State Initialization ────────────────────────────────────────────
 def init_session_state():
@@ -253,6 +342,8 @@ def init_session_state():
         "form_cert1": None,
         "form_cert2": None,
         "form_cert3": None,
+        # Perceptual hashes of uploaded documents, keyed like form_data
+        "form_document_hashes": {},
         # Academic details
         "form_inter_institution": "",
         "form_inter_type": "Government",
@@ -290,6 +381,16 @@ def init_session_state():
         "voice_language": "English",
         "voice_step": 0,
         "voice_results": {},
+        "voice_jobs": {},
+        # field -> [(heard phrase, candidate values)] awaiting the user's pick
+        "voice_choices": {},
+        # Continuous recording: last processed clip, fields it did not reach
+        "voice_session_digest": None,
+        "voice_session_warning": "",
+        # Per-rule fraud results reused across reruns (see run_fraud_check)
+        "fraud_memo": {},
+        # Stable per-browser-session key for velocity limits
+        "session_uid": uuid.uuid4().hex,
     }
     for key, val in defaults.items():
         if key not in st.session_state:
@@ -301,7 +402,10 @@ init_session_state()
 
 def reset_form():
     """Reset all form fields."""
-    keys_to_remove = [k for k in st.session_state.keys()]
+    # Keep the session key so velocity limits survive a form reset
+    keys_to_remove = [
+        k for k in st.session_state.keys() if k != "session_uid"
+    ]
     for k in keys_to_remove:
         del st.session_state[k]
     init_session_state()
@@ -593,6 +697,145 @@ if st.session_state.registration_mode == "📄 Resume Upload (Auto-fill)":
     st.markdown("---")
     st.info("👇 Review and edit the auto-filled form below")
 
+# ─── Voice Field Updates ────────────────────────────────────────────────────
+def set_voice_choice(field_key, value):
+    """Fill a vocabulary field (gender, education, skills, location) with a
+    resolved value; list fields keep what is already there."""
+    if field_key == "gender":
+        st.session_state.form_gender = value
+        st.session_state.input_gender = value
+    elif field_key == "education":
+        st.session_state.form_education = value
+        st.session_state.input_education = value
+    elif field_key == "skills":
+        if value not in st.session_state.form_skills:
+            new_skills = st.session_state.form_skills + [value]
+            st.session_state.form_skills = new_skills
+            st.session_state.input_skills = new_skills
+    elif field_key == "location":
+        if value not in st.session_state.form_preferred_locations:
+            st.session_state.form_preferred_locations.append(value)
+            st.session_state.input_locations = st.session_state.form_preferred_locations
+
+
+def resolve_voice_matches(field_key, matches):
+    """Apply confident vocabulary matches; park ambiguous ones (near-tied
+    candidates such as Warangal Rural / Warangal Urban) in voice_choices
+    for the user to pick. Returns the applied values."""
+    applied = []
+    pending = []
+    for m in matches:
+        if m.ambiguous:
+            pending.append((m.heard, [m.value, *m.ties]))
+        else:
+            set_voice_choice(field_key, m.value)
+            applied.append(m.value)
+    if pending:
+        st.session_state.voice_choices[field_key] = pending
+    return applied
+
+
+def apply_voice_field(field_key, raw_text):
+    """Post-process a transcription and fill the matching form field.
+    Returns the processed value shown to the user."""
+    # A new recording replaces any question left from the previous one
+    st.session_state.voice_choices.pop(field_key, None)
+    if field_key == "name":
+        processed = post_process_name(raw_text)
+        st.session_state.form_name = processed
+        st.session_state.input_name = processed
+    elif field_key == "phone":
+        processed = post_process_phone(raw_text)
+        st.session_state.form_phone = processed
+        st.session_state.input_phone = processed
+    elif field_key == "email":
+        processed = post_process_email(raw_text)
+        st.session_state.form_email = processed
+        st.session_state.input_email = processed
+    elif field_key == "gender":
+        match = get_vocab_resolver().best("gender", raw_text)
+        matched = resolve_voice_matches(field_key, [match] if match else [])
+        processed = matched[0] if matched else raw_text.strip().title()
+    elif field_key == "education":
+        match = get_vocab_resolver().best("education", raw_text)
+        matched = resolve_voice_matches(field_key, [match] if match else [])
+        processed = matched[0] if matched else raw_text
+    elif field_key == "skills":
+        matched = resolve_voice_matches(
+            field_key, get_vocab_resolver().find("skills", raw_text)
+        )
+        processed = ", ".join(matched) or raw_text
+    elif field_key == "location":
+        matched = resolve_voice_matches(
+            field_key, get_vocab_resolver().find("location", raw_text)
+        )
+        processed = ", ".join(matched) or raw_text.strip().title()
+    else:
+        processed = raw_text
+    return processed
+
+
+def show_voice_result(field_key):
+    """Recognition result (or current value) for one voice field."""
+    result = st.session_state.voice_results.get(field_key)
+    if field_key in st.session_state.voice_jobs:
+        st.caption("⏳ Transcribing...")
+    elif result and result["processed"] is not None:
+        transcription = result["transcription"]
+        raw_text = transcription["text"]
+        st.success(f"✅ Recognized: **{result['processed']}**")
+        if raw_text != str(result["processed"]):
+            st.caption(f"Raw: {raw_text}")
+        if transcription.get("latency_ms") is not None:
+            rtf = transcription.get("rtf")
+            st.caption(
+                f"⏱️ {transcription['backend']}: "
+                f"{transcription['latency_ms']:.0f} ms"
+                + (f", RTF {rtf:.2f}" if rtf else "")
+            )
+        elif transcription.get("cached"):
+            st.caption(f"⏱️ {transcription['backend']}: from cache")
+        reranked = transcription.get("rerank")
+        if reranked and reranked["rescued"]:
+            st.caption(
+                f"🔁 Used alternative {reranked['chosen'] + 1} of "
+                f"{reranked['candidates']}, which fits this field"
+            )
+        pre = transcription.get("preprocess")
+        if pre and pre.get("bytes_saved"):
+            st.caption(
+                f"📦 Sent {pre['output_bytes'] / 1024:.0f} KB {pre['format']} "
+                f"instead of {pre['input_bytes'] / 1024:.0f} KB "
+                f"(+{pre['preprocess_ms']:.0f} ms to prepare)"
+            )
+        # Near-tied matches are never picked silently: ask which one
+        choices = st.session_state.voice_choices.get(field_key, [])
+        for i, (heard, options) in enumerate(list(choices)):
+            st.warning(f"🤔 \"{heard}\" could mean more than one option. "
+                       "Which did you mean?")
+            for col, option in zip(st.columns(len(options)), options):
+                if col.button(option, key=f"voice_choice_{field_key}_{i}_{option}"):
+                    set_voice_choice(field_key, option)
+                    del choices[i]
+                    if not choices:
+                        del st.session_state.voice_choices[field_key]
+                    st.rerun()
+    elif result:
+        st.warning(f"⚠️ {result['transcription']['message']}")
+    else:
+        current_val = ""
+        if field_key == "name":
+            current_val = st.session_state.form_name
+        elif field_key == "phone":
+            current_val = st.session_state.form_phone
+        elif field_key == "email":
+            current_val = st.session_state.form_email
+        if current_val:
+            st.info(f"Current: {current_val}")
+        else:
+            st.caption("Click the mic button and speak")
+
+
 # ─── MODE: Voice Registration ───────────────────────────────────────────────
 if st.session_state.registration_mode == "🎤 Voice Registration":
     st.markdown(
@@ -614,11 +857,36 @@ if st.session_state.registration_mode == "🎤 Voice Registration":
                 key="voice_language",
             )
         with vcol2:
-            openai_api_key = st.text_input(
-                "🔑 OpenAI API Key (Optional for Whisper AI)",
-                type="password",
-                help="Provide your OpenAI API Key to use the ultra-accurate Whisper AI for speech recognition. Without it, it will fall back to standard Google Speech Recognition."
+            asr_mode = st.radio(
+                "🖥️ Speech Recognition Engine",
+                ["Online", "Offline (this computer)"],
+                horizontal=True,
+                key="voice_asr_mode",
+                help="Offline mode runs a local Whisper model on this "
+                     "computer and needs no internet connection.",
             )
+            openai_api_key = None
+            asr_backend = None
+            if asr_mode == "Online":
+                openai_api_key = st.text_input(
+                    "🔑 OpenAI API Key (Optional for Whisper AI)",
+                    type="password",
+                    help="Provide your OpenAI API Key to use the ultra-accurate Whisper AI for speech recognition. Without it, it will fall back to standard Google Speech Recognition."
+                )
+            else:
+                with st.spinner("Loading offline speech model..."):
+                    asr_backend, asr_error = get_local_asr_backend()
+                if asr_backend is None:
+                    st.error(f"⚠️ Offline recognition unavailable: {asr_error}")
+
+        voice_flow = st.radio(
+            "🎙️ Recording",
+            ["One field at a time", "All fields in one recording"],
+            horizontal=True,
+            key="voice_flow",
+            help="In one recording, answer every question below in order "
+                 "and pause briefly between answers.",
+        )
 
         st.markdown("---")
 
@@ -633,105 +901,139 @@ if st.session_state.registration_mode == "🎤 Voice Registration":
         ]
 
         audio_recorder = get_audio_recorder()
+        # field -> (clip digest, Future) for clips still being transcribed
+        voice_jobs = st.session_state.voice_jobs
+        # field -> {"digest", "transcription", "processed"} once applied
+        voice_results = st.session_state.voice_results
 
-        for field_key, field_label in voice_fields:
-            st.markdown(f"**{field_label}**")
-            prompt = get_prompt(field_key, voice_lang)
-            st.caption(f"🗣️ {prompt}")
-
-            vcol_a, vcol_b = st.columns([1, 2])
-            with vcol_a:
-                if audio_recorder:
-                    audio_bytes = audio_recorder(
-                        text="",
-                        recording_color="#e8b62c",
-                        neutral_color="#6aa36f",
-                        icon_name="microphone",
-                        icon_size="2x",
-                        key=f"voice_{field_key}",
-                    )
-                else:
-                    audio_bytes = None
-                    st.warning("Audio recorder not available")
+        if voice_flow == "All fields in one recording":
+            for i, (field_key, field_label) in enumerate(voice_fields, 1):
+                st.markdown(
+                    f"**{i}. {field_label}** — "
+                    f"🗣️ {get_prompt(field_key, voice_lang)}"
+                )
 
-            with vcol_b:
-                if audio_bytes:
-                    transcription = transcribe_audio(audio_bytes, voice_lang, openai_api_key)
-
-                    if transcription["status"] == "success":
-                        raw_text = transcription["text"]
-
-                        # Post-process based on field type
-                        if field_key == "name":
-                            processed = post_process_name(raw_text)
-                            st.session_state.form_name = processed
-                            st.session_state.input_name = processed
-                        elif field_key == "phone":
-                            processed = post_process_phone(raw_text)
-                            st.session_state.form_phone = processed
-                            st.session_state.input_phone = processed
-                        elif field_key == "email":
-                            processed = post_process_email(raw_text)
-                            st.session_state.form_email = processed
-                            st.session_state.input_email = processed
-                        elif field_key == "gender":
-                            processed = post_process_gender(raw_text)
-                            if processed in [
-                                "Male", "Female", "Other", "Transgender"
-                            ]:
-                                st.session_state.form_gender = processed
-                                st.session_state.input_gender = processed
-                        elif field_key == "education":
-                            processed = post_process_education(raw_text)
-                            if processed and processed in EDUCATION_OPTIONS:
-                                st.session_state.form_education = processed
-                                st.session_state.input_education = processed
-                            processed = processed or raw_text
-                        elif field_key == "skills":
-                            processed_list = post_process_skills(raw_text)
-                            matched = [
-                                s for s in processed_list if s in ALL_SKILLS
-                            ]
-                            if matched:
-                                existing = st.session_state.form_skills
-                                new_skills = list(set(existing + matched))
-                                st.session_state.form_skills = new_skills
-                                st.session_state.input_skills = new_skills
-                            processed = ", ".join(processed_list)
-                        elif field_key == "location":
-                            processed = raw_text.strip().title()
-                            # Try to match to districts
-                            for dist in TELANGANA_DISTRICTS:
-                                if dist.lower() in processed.lower():
-                                    if dist not in st.session_state.form_preferred_locations:
-                                        st.session_state.form_preferred_locations.append(dist)
-                                        st.session_state.input_locations = st.session_state.form_preferred_locations
-                        else:
-                            processed = raw_text
-
-                        st.success(f"✅ Recognized: **{processed}**")
-                        if raw_text != str(processed):
-                            st.caption(f"Raw: {raw_text}")
-                        
-                        # Rerun to reflect the newly spoken field in the form
-                        time.sleep(1.5) # Give user a moment to see the success message
-                        st.rerun()
-                    else:
-                        st.warning(f"⚠️ {transcription['message']}")
-                else:
-                    current_val = ""
-                    if field_key == "name":
-                        current_val = st.session_state.form_name
-                    elif field_key == "phone":
-                        current_val = st.session_state.form_phone
-                    elif field_key == "email":
-                        current_val = st.session_state.form_email
-                    if current_val:
-                        st.info(f"Current: {current_val}")
-                    else:
-                        st.caption("Click the mic button and speak")
+            if audio_recorder:
+                session_audio = audio_recorder(
+                    text="Record all answers",
+                    recording_color="#e8b62c",
+                    neutral_color="#6aa36f",
+                    icon_name="microphone",
+                    icon_size="2x",
+                    # Keep recording through the pauses between answers
+                    pause_threshold=30.0,
+                    key="voice_session",
+                )
+            else:
+                session_audio = None
+                st.warning("Audio recorder not available")
+
+            if session_audio:
+                digest = hashlib.sha256(session_audio).hexdigest()
+                if digest != st.session_state.voice_session_digest:
+                    st.session_state.voice_session_digest = digest
+                    st.session_state.voice_session_warning = ""
+                    try:
+                        futures = submit_session(
+                            session_audio, voice_lang, openai_api_key,
+                            backend=asr_backend,
+                            fields=[key for key, _ in voice_fields],
+                        )
+                    except IncompleteSessionError as e:
+                        futures = {}
+                        st.session_state.voice_session_warning = (
+                            f"⚠️ Heard {e.heard} answers for {e.expected} "
+                            "questions, so the answers cannot be matched to "
+                            "their fields. Please record again, pausing "
+                            "briefly after each answer, or choose "
+                            "\"One field at a time\"."
+                        )
+                    except Exception as e:
+                        futures = {}
+                        st.session_state.voice_session_warning = (
+                            f"⚠️ Could not read the recording: {e}"
+                        )
+                    for field_key, future in futures.items():
+                        voice_jobs[field_key] = (f"{digest}:{field_key}", future)
+
+            if st.session_state.voice_session_warning:
+                st.warning(st.session_state.voice_session_warning)
 
             st.markdown("---")
+            for field_key, field_label in voice_fields:
+                rcol_a, rcol_b = st.columns([1, 2])
+                rcol_a.markdown(f"**{field_label}**")
+                with rcol_b:
+                    show_voice_result(field_key)
+
+        else:
+            for field_key, field_label in voice_fields:
+                st.markdown(f"**{field_label}**")
+                prompt = get_prompt(field_key, voice_lang)
+                st.caption(f"🗣️ {prompt}")
+
+                vcol_a, vcol_b = st.columns([1, 2])
+                with vcol_a:
+                    if audio_recorder:
+                        audio_bytes = audio_recorder(
+                            text="",
+                            recording_color="#e8b62c",
+                            neutral_color="#6aa36f",
+                            icon_name="microphone",
+                            icon_size="2x",
+                            key=f"voice_{field_key}",
+                        )
+                    else:
+                        audio_bytes = None
+                        st.warning("Audio recorder not available")
+
+                # The recorder returns its last clip on every rerun: only
+                # new clips are sent, and they start transcribing at once
+                if audio_bytes:
+                    digest = hashlib.sha256(audio_bytes).hexdigest()
+                    applied = voice_results.get(field_key, {}).get("digest")
+                    queued = voice_jobs.get(field_key, (None, None))[0]
+                    if digest not in (applied, queued):
+                        if applied:
+                            record_retry(field_key)
+                        voice_jobs[field_key] = (digest, submit_transcription(
+                            audio_bytes, voice_lang, openai_api_key,
+                            backend=asr_backend,
+                        ))
+
+                with vcol_b:
+                    show_voice_result(field_key)
+
+                st.markdown("---")
+
+        # Apply every clip that has finished in one pass, then rerun once so
+        # the widgets pick them up; clips still transcribing are polled by
+        # the rerun at the end of the page, so the page never waits on them
+        finished = [(field_key, digest, future)
+                    for field_key, (digest, future) in voice_jobs.items()
+                    if future.done()]
+        if finished:
+            for field_key, digest, future in finished:
+                try:
+                    transcription = future.result()
+                except Exception as e:
+                    transcription = {"status": "error", "text": "",
+                                     "message": f"Transcription failed: {e}"}
+                transcription = rerank(
+                    field_key, transcription, get_voice_grammars()
+                )
+                processed = None
+                if transcription["status"] == "success":
+                    processed = apply_voice_field(
+                        field_key, transcription["text"]
+                    )
+                voice_results[field_key] = {
+                    "digest": digest,
+                    "transcription": transcription,
+                    "processed": processed,
+                }
+                del voice_jobs[field_key]
+            st.rerun()
 
         st.info("👇 Review and edit the auto-filled form below")
 
@@ -1190,12 +1492,16 @@ if not st.session_state.submitted:
                 st.warning("⚠️ File exceeds 1MB limit")
             else:
                 st.session_state.form_identity_card = True
+                st.session_state.form_document_hashes["identity_card"] = (
+                    document_hash(identity_card.getvalue(), identity_card.name)
+                )
                 st.markdown(
                     f'<div class="status-card status-green">'
                     f'✅ ID uploaded: {identity_card.name}</div>',
                     unsafe_allow_html=True,
                 )
         else:
+            st.session_state.form_document_hashes.pop("identity_card", None)
             st.caption("🪪 Not uploaded")
 
     with doc_col2:
@@ -1210,12 +1516,18 @@ if not st.session_state.submitted:
                     st.warning(f"⚠️ Certificate {cert_num} exceeds 1MB")
                 else:
                     st.session_state[f"form_cert{cert_num}"] = True
+                    st.session_state.form_document_hashes[
+                        f"certificate_{cert_num}"
+                    ] = document_hash(cert_file.getvalue(), cert_file.name)
                     st.markdown(
                         f'<div class="status-card status-green">'
                         f'✅ Certificate {cert_num}: {cert_file.name}</div>',
                         unsafe_allow_html=True,
                     )
             else:
+                st.session_state.form_document_hashes.pop(
+                    f"certificate_{cert_num}", None
+                )
                 st.caption(f"📜 Certificate {cert_num}: Not uploaded")
 
     # ═════════════════════════════════════════════════════════════════════
@@ -1229,6 +1541,7 @@ if not st.session_state.submitted:
         "name": st.session_state.form_name,
         "phone": st.session_state.form_phone,
         "email": st.session_state.form_email,
+        "dob": st.session_state.form_dob,
         "aadhaar": st.session_state.form_aadhaar,
         "education": st.session_state.form_education,
         "institution_name": st.session_state.get("form_ug_institution", "")
@@ -1248,6 +1561,10 @@ if not st.session_state.submitted:
         "certificate_2": st.session_state.form_cert2,
         "certificate_3": st.session_state.form_cert3,
         "experience_entries": st.session_state.experience_entries,
+        "document_hashes": {
+            kind: h
+            for kind, h in st.session_state.form_document_hashes.items() if h
+        },
     }
 
     # ─── Fraud Detection Panel ──────────────────────────────────────────
@@ -1260,7 +1577,18 @@ if not st.session_state.submitted:
             unsafe_allow_html=True,
         )
 
-        fraud_report = run_fraud_check(form_data)
+        scored = score(
+            form_data,
+            duplicate_index=get_duplicate_index(),
+            memo=st.session_state.fraud_memo,
+            velocity_limiter=get_velocity_limiter(),
+            device_keys=get_device_keys(),
+            image_index=get_image_index(),
+            population_stats=get_population_stats(),
+            model=get_fraud_model(),
+            extraction=st.session_state.extraction_result,
+        )
+        fraud_report = scored["fraud_report"]
 
         # Risk score display
         risk_color = fraud_report["risk_color"]
@@ -1283,6 +1611,10 @@ if not st.session_state.submitted:
         st.progress(
             min(fraud_report["risk_score"] / 100, 1.0),
         )
+        if "model_score" in fraud_report:
+            st.caption(
+                f"🤖 Model fraud probability: {fraud_report['model_score']}%"
+            )
 
         if fraud_report["flags"]:
             st.markdown("**⚠️ Flagged Issues:**")
@@ -1313,7 +1645,7 @@ if not st.session_state.submitted:
             unsafe_allow_html=True,
         )
 
-        health = calculate_health_score(form_data)
+        health = scored["health_score"]
 
         health_css = {
             "green": "status-green",
@@ -1384,6 +1716,16 @@ if not st.session_state.submitted:
         # Generate Registration ID
         random_num = random.randint(10000, 99999)
         reg_id = f"DEET-TS-2025-{random_num}"
+        get_duplicate_index().register(reg_id, form_data)
+        get_image_index().add_many(reg_id, form_data["document_hashes"])
+        get_decision_log().record(reg_id, fraud_report)
+        # In memory only; the background sync persists it
+        get_population_stats().update(form_data)
+        get_velocity_limiter().record_many({
+            "phone": form_data["phone"],
+            "email": form_data["email"],
+            **get_device_keys(),
+        })
         st.session_state.registration_id = reg_id
         st.session_state.submitted = True
         st.session_state.submission_time = datetime.now().strftime(
@@ -1412,14 +1754,21 @@ if not st.session_state.submitted:
             st.session_state.form_looking_for_job
         )
         st.session_state.form_data_snapshot["fraud_report"] = fraud_report
+        extraction = st.session_state.extraction_result
+        if extraction and extraction.get("status") == "success":
+            # Kept for fraud model training (see fraud_model.py)
+            st.session_state.form_data_snapshot["resume_extraction"] = {
+                k: extraction.get(k)
+                for k in ("name", "email", "phone", "skills",
+                          "experience_years", "organizations")
+            }
         st.session_state.form_data_snapshot["health_score"] = health
-        # Remove non-serializable
-        st.session_state.form_data_snapshot.pop("resume_uploaded", None)
-        st.session_state.form_data_snapshot.pop("profile_image", None)
-        st.session_state.form_data_snapshot.pop("identity_card", None)
-        st.session_state.form_data_snapshot.pop("certificate_1", None)
-        st.session_state.form_data_snapshot.pop("certificate_2", None)
-        st.session_state.form_data_snapshot.pop("certificate_3", None)
+        # Upload flags as plain booleans (fraud model training reads them)
+        for key in ("resume_uploaded", "profile_image", "identity_card",
+                    "certificate_1", "certificate_2", "certificate_3"):
+            st.session_state.form_data_snapshot[key] = bool(
+                st.session_state.form_data_snapshot.get(key)
+            )
 
         st.rerun()
 
@@ -1563,3 +1912,12 @@ st.markdown(
     """,
     unsafe_allow_html=True,
 )
+
+# ─── Voice Polling ──────────────────────────────────────────────────────────
+# The page is fully drawn by now; while clips are still transcribing, re-run
+# shortly so each result appears as soon as it is ready (any interaction
+# re-runs sooner and interrupts this wait)
+if (st.session_state.registration_mode == "🎤 Voice Registration"
+        and st.session_state.voice_jobs):
+    time.sleep(VOICE_POLL_SECONDS)
+    st.rerun()
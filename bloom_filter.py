@@ -0,0 +1,114 @@
+"""
+bloom_filter.py
+Compact in-memory Bloom filter used as a prefilter in front of the
+duplicate registration index.
+
+Keys are the 16-byte digests produced by duplicate_index.hash_identifier, so
+no further hashing is needed: the two 64-bit halves of the digest drive
+Kirsch-Mitzenmacher double hashing to derive the k bit positions.
+"""
+
+import math
+import os
+import struct
+import tempfile
+from typing import Iterable
+
+
+SNAPSHOT_MAGIC = b"DEETBLM1"
+# magic, bit count, hash count, item count, high-water mark
+_HEADER = struct.Struct("<8sQIQd")
+
+
+class BloomFilter:
+    """
+    Bloom filter over pre-hashed byte keys.
+    A miss means "definitely never added"; a hit means "probably added".
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.01):
+        capacity = max(1, int(capacity))
+        num_bits = int(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.num_bits = max(8, num_bits)
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+        self.capacity = capacity
+        # Caller-defined position in the backing store (e.g. a timestamp)
+        self.high_water = 0.0
+
+    def _positions(self, key: bytes):
+        h1 = int.from_bytes(key[:8], "little")
+        h2 = int.from_bytes(key[8:16], "little") | 1
+        m = self.num_bits
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % m
+
+    def add(self, key: bytes):
+        bits = self.bits
+        for pos in self._positions(key):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def update(self, keys: Iterable[bytes]):
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key: bytes) -> bool:
+        bits = self.bits
+        for pos in self._positions(key):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self.bits)
+
+    def save(self, path: str):
+        """Write a snapshot atomically (temp file + rename). Each writer
+        gets its own temp file, so concurrent saves never mix."""
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=".bloom-", dir=os.path.dirname(os.path.abspath(path))
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_HEADER.pack(
+                    SNAPSHOT_MAGIC, self.num_bits, self.num_hashes,
+                    self.count, self.high_water,
+                ))
+                f.write(self.bits)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "BloomFilter":
+        """Read a snapshot written by save()."""
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                raise ValueError(f"Truncated Bloom filter snapshot: {path}")
+            magic, num_bits, num_hashes, count, high_water = (
+                _HEADER.unpack(header)
+            )
+            if magic != SNAPSHOT_MAGIC or num_hashes < 1:
+                raise ValueError(f"Not a Bloom filter snapshot: {path}")
+            bits = bytearray(f.read())
+        if len(bits) != (num_bits + 7) // 8:
+            raise ValueError(f"Truncated Bloom filter snapshot: {path}")
+        bloom = cls.__new__(cls)
+        bloom.num_bits = num_bits
+        bloom.num_hashes = num_hashes
+        bloom.bits = bits
+        bloom.count = count
+        bloom.capacity = round(num_bits * math.log(2) / num_hashes)
+        bloom.high_water = high_water
+        return bloom
@@ -0,0 +1,328 @@
+"""
+decision_log.py
+Append-only, compressed, rotated log of fraud decisions.
+
+Every decision (registration ID, inputs hash, rule hits, score, rule-set
+version, per-rule timings) is queued in memory and written by a background
+thread, so the submit path never waits on disk. When the bounded queue is
+full the decision is dropped and counted rather than blocking the caller.
+
+The writer appends each batch to the current segment as its own gzip member
+(concatenated members are a valid gzip file, and a crash can only lose the
+batch being written) and appends one line per member to an uncompressed
+".idx" sidecar: byte offset, length, time span and registration IDs. The
+reader uses the sidecars to decompress only the members that can match a
+registration ID or time range. Segments rotate by size and by day; each
+process writes its own segments.
+
+Usage:
+    python decision_log.py --id DEET-TS-2025-12345
+    python decision_log.py --since 2025-06-01 --until 2025-06-02T12:00
+"""
+
+import argparse
+import atexit
+import glob
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOG_DIR = os.environ.get("DEET_DECISION_LOG_DIR", "decision_log")
+
+QUEUE_SIZE = 10_000
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 1.0
+ROTATE_BYTES = 64 * 1024 * 1024
+
+_STOP = object()
+
+
+def inputs_hash(report: Dict[str, Any]) -> str:
+    """Digest of the per-rule input digests recorded in a fraud report."""
+    encoded = json.dumps(report.get("rule_inputs") or {}, sort_keys=True)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:32]
+
+
+def decision_entry(
+    registration_id: Optional[str],
+    report: Dict[str, Any],
+    source: str = "submit",
+    ts: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Log entry for one fraud decision."""
+    ts = time.time() if ts is None else ts
+    entry = {
+        "ts": ts,
+        "time": datetime.fromtimestamp(ts).isoformat(timespec="seconds"),
+        "registration_id": registration_id,
+        "source": source,
+        "inputs_hash": inputs_hash(report),
+        "risk_score": report.get("risk_score"),
+        "risk_level": report.get("risk_level"),
+        "flag_codes": report.get("flag_codes", []),
+        "flags": report.get("flags", []),
+        "failed_rules": sorted(
+            name for name, d in report.get("details", {}).items()
+            if not d.get("valid", True)
+        ),
+        "rule_set_version": report.get("rule_set_version"),
+        "rule_versions": report.get("rule_versions", {}),
+        "timings_us": report.get("timings_us", {}),
+        "short_circuited": report.get("short_circuited", False),
+    }
+    if "model_score" in report:
+        entry["model_score"] = report["model_score"]
+    return entry
+
+
+class DecisionLog:
+    """Background writer for the decision log."""
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_LOG_DIR,
+        queue_size: int = QUEUE_SIZE,
+        rotate_bytes: int = ROTATE_BYTES,
+        flush_interval: float = FLUSH_INTERVAL,
+    ):
+        self.directory = directory
+        self.rotate_bytes = rotate_bytes
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        os.makedirs(directory, exist_ok=True)
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._segment = None
+        self._segment_day = None
+        self._segment_seq = 0
+        self._thread = threading.Thread(
+            target=self._run, name="decision-log", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(
+        self,
+        registration_id: Optional[str],
+        report: Dict[str, Any],
+        source: str = "submit",
+    ) -> bool:
+        """Queue one decision; False if it was dropped (queue full)."""
+        try:
+            # The entry is built on the writer thread; the report must not
+            # be mutated after it is recorded
+            self._queue.put_nowait(
+                (registration_id, report, source, time.time())
+            )
+            return True
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning(
+                    "Decision log queue full; %d decisions dropped",
+                    self.dropped,
+                )
+            return False
+
+    def close(self, timeout: float = 5.0):
+        """Flush queued decisions and stop the writer."""
+        if not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+
+    # ─── Writer thread ──────────────────────────────────────────────────
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = [] if first is _STOP else [first]
+            stop = first is _STOP
+            while not stop and len(batch) < BATCH_SIZE:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                else:
+                    batch.append(item)
+            # Nothing may escape: a dead writer would silently drop every
+            # later decision once the queue fills
+            entries = []
+            for item in batch:
+                try:
+                    entries.append(decision_entry(*item))
+                except Exception:
+                    logger.exception("Could not log decision for %s", item[0])
+            if entries:
+                try:
+                    self._write(entries)
+                except Exception:
+                    logger.exception(
+                        "Could not write %d decisions to the log",
+                        len(entries),
+                    )
+            if stop:
+                return
+
+    def _segment_path(self) -> str:
+        day = time.strftime("%Y%m%d")
+        if (
+            self._segment is None
+            or day != self._segment_day
+            or os.path.getsize(self._segment) >= self.rotate_bytes
+        ):
+            stamp = time.strftime("%Y%m%dT%H%M%S")
+            self._segment_seq += 1
+            self._segment = os.path.join(
+                self.directory,
+                f"decisions-{stamp}-{os.getpid()}-{self._segment_seq:04d}"
+                f".jsonl.gz",
+            )
+            self._segment_day = day
+        return self._segment
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        path = self._segment_path()
+        data = b"".join(
+            json.dumps(entry, ensure_ascii=False, default=str)
+            .encode("utf-8") + b"\n"
+            for entry in batch
+        )
+        member = gzip.compress(data)
+        with open(path, "ab") as f:
+            offset = f.tell()
+            f.write(member)
+        index = {
+            "offset": offset,
+            "length": len(member),
+            "first": min(e["ts"] for e in batch),
+            "last": max(e["ts"] for e in batch),
+            "ids": sorted({e["registration_id"] for e in batch
+                           if e["registration_id"]}),
+        }
+        with open(f"{path}.idx", "a", encoding="utf-8") as f:
+            f.write(json.dumps(index) + "\n")
+        self.written += len(batch)
+
+
+# ─── Reader ─────────────────────────────────────────────────────────────────
+
+def _members(segment: str) -> List[Dict[str, Any]]:
+    try:
+        with open(f"{segment}.idx", encoding="utf-8") as f:
+            members = []
+            for line in f:
+                try:
+                    members.append(json.loads(line))
+                except ValueError:
+                    break  # torn last line
+            return members
+    except OSError:
+        # No sidecar: treat the whole segment as one member
+        return [{"offset": 0, "length": None, "first": None, "last": None,
+                 "ids": None}]
+
+
+def _decompress(segment: str, offset: int, length: Optional[int]) -> bytes:
+    with open(segment, "rb") as f:
+        f.seek(offset)
+        raw = f.read() if length is None else f.read(length)
+    try:
+        return gzip.decompress(raw)
+    except (EOFError, OSError):
+        # Truncated trailing member from a crash: keep what decodes
+        out = []
+        with gzip.GzipFile(fileobj=io.BytesIO(raw)) as g:
+            try:
+                for line in g:
+                    out.append(line)
+            except (EOFError, OSError):
+                pass
+        return b"".join(out[:-1] if out and not out[-1].endswith(b"\n")
+                        else out)
+
+
+def read_decisions(
+    directory: str = DEFAULT_LOG_DIR,
+    registration_id: Optional[str] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Decisions matching a registration ID and/or [start, end] epoch-second
+    time range, segment by segment in write order.
+    """
+    for segment in sorted(glob.glob(os.path.join(directory, "*.jsonl.gz"))):
+        for member in _members(segment):
+            if member["ids"] is not None:
+                if registration_id and registration_id not in member["ids"]:
+                    continue
+                if start is not None and member["last"] < start:
+                    continue
+                if end is not None and member["first"] > end:
+                    continue
+            data = _decompress(segment, member["offset"], member["length"])
+            for line in data.splitlines():
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if registration_id and entry.get("registration_id") != registration_id:
+                    continue
+                if start is not None and entry["ts"] < start:
+                    continue
+                if end is not None and entry["ts"] > end:
+                    continue
+                yield entry
+
+
+def _parse_time(value: Optional[str], end: bool = False) -> Optional[float]:
+    """Epoch seconds of an ISO date/time; with end=True a date-only value
+    means the last instant of that day, so --until DATE includes it."""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if end and len(value) == 10:    # YYYY-MM-DD
+        return (parsed + timedelta(days=1)).timestamp() - 1e-6
+    return parsed.timestamp()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the decision log.")
+    parser.add_argument("--dir", default=DEFAULT_LOG_DIR)
+    parser.add_argument("--id", help="Registration ID")
+    parser.add_argument("--since", help="ISO date/time (inclusive)")
+    parser.add_argument(
+        "--until", help="ISO date/time (inclusive; a date covers that day)"
+    )
+    args = parser.parse_args(argv)
+
+    for entry in read_decisions(
+        args.dir, args.id, _parse_time(args.since),
+        _parse_time(args.until, end=True),
+    ):
+        print(json.dumps(entry, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+domain_blocklist.py
+Disposable email domain blocklist with parent-suffix matching.
+
+Domains are stored label-reversed ("x.mailinator.com" -> "com.mailinator.x")
+in one sorted bytes blob plus an offsets array, which keeps 1M domains in a
+few tens of MB. A lookup bisects once per parent suffix of the queried
+domain, so "x.mailinator.com" matches a listed "mailinator.com".
+
+Blocklists are plain text files, one domain per line, '#' for comments (the
+format of the public disposable-email-domains lists). The file is re-read in
+the background when its mtime or size changes, without a restart.
+
+Run this module directly for a memory/latency benchmark:
+    python domain_blocklist.py 100000 1000000
+"""
+
+import bisect
+import hashlib
+import logging
+import os
+import threading
+import time
+from array import array
+from itertools import accumulate
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def reverse_domain(domain: str) -> str:
+    """'a.b.com' -> 'com.b.a' (lower-cased, trailing dot removed)."""
+    return ".".join(reversed(domain.strip().lower().rstrip(".").split(".")))
+
+
+class _SortedDomains:
+    """Immutable sorted sequence of reversed domains packed into one blob."""
+
+    def __init__(self, reversed_domains: Iterable[str]):
+        items = sorted({d.encode("utf-8") for d in reversed_domains if d})
+        self.blob = b"".join(items)
+        self.offsets = array("I", accumulate(map(len, items), initial=0))
+        self._digest = None
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> bytes:
+        return self.blob[self.offsets[i]:self.offsets[i + 1]]
+
+    def __contains__(self, item: bytes) -> bool:
+        i = bisect.bisect_left(self, item)
+        return i < len(self) and self[i] == item
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self.blob) + self.offsets.itemsize * len(self.offsets)
+
+    @property
+    def digest(self) -> str:
+        """Content fingerprint, computed on first use."""
+        if self._digest is None:
+            h = hashlib.sha1(self.offsets.tobytes())
+            h.update(self.blob)
+            self._digest = h.hexdigest()[:16]
+        return self._digest
+
+
+class DomainBlocklist:
+    """
+    Set of blocked domains where a listed domain also blocks every
+    subdomain. Optionally backed by a file that is watched for changes.
+    """
+
+    def __init__(
+        self,
+        domains: Iterable[str] = (),
+        path: Optional[str] = None,
+        check_interval: float = 5.0,
+    ):
+        self.base_domains = [reverse_domain(d) for d in domains]
+        self.path = path
+        self.check_interval = check_interval
+        self._file_stamp = None
+        self._last_check = time.monotonic()
+        self._reloading = threading.Lock()
+        self._domains = _SortedDomains(self.base_domains)
+        # Bumped on every reload so callers can key caches on it
+        self.generation = 0
+        if path:
+            self.reload()
+
+    @staticmethod
+    def read_file(path: str):
+        """Yield reversed domains from a blocklist file."""
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                line = line.split("#", 1)[0].strip()
+                if line and "." in line:
+                    yield reverse_domain(line)
+
+    def _stamp(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def reload(self):
+        """Rebuild from the base domains plus the blocklist file."""
+        stamp = self._stamp()
+        domains = list(self.base_domains)
+        if stamp is not None:
+            try:
+                domains.extend(self.read_file(self.path))
+            except OSError as e:
+                logger.warning("Could not read blocklist %s: %s", self.path, e)
+        # Swap in one assignment so concurrent lookups see old or new list
+        self._domains = _SortedDomains(domains)
+        self._file_stamp = stamp
+        self.generation += 1
+
+    def check_for_changes(self):
+        """Start a background reload if the file changed (rate-limited)."""
+        now = time.monotonic()
+        if not self.path or now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        if self._stamp() == self._file_stamp:
+            return
+        if self._reloading.acquire(blocking=False):
+            def _run():
+                try:
+                    self.reload()
+                finally:
+                    self._reloading.release()
+            threading.Thread(target=_run, daemon=True).start()
+
+    def match(self, domain: str) -> Optional[str]:
+        """The listed domain that blocks `domain`, or None."""
+        if not domain:
+            return None
+        self.check_for_changes()
+        domains = self._domains
+        labels = domain.strip().lower().rstrip(".").split(".")
+        suffix = ""
+        for label in reversed(labels):
+            suffix = f"{suffix}.{label}" if suffix else label
+            if suffix.encode("utf-8") in domains:
+                return ".".join(reversed(suffix.split(".")))
+        return None
+
+    def __contains__(self, domain: str) -> bool:
+        return self.match(domain) is not None
+
+    def __len__(self) -> int:
+        return len(self._domains)
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._domains.memory_bytes
+
+    @property
+    def digest(self) -> str:
+        """Fingerprint of the current contents (stable across processes)."""
+        return self._domains.digest
+
+
+def _benchmark(sizes):
+    import random
+    import string
+    import tracemalloc
+
+    rng = random.Random(42)
+    tlds = ["com", "net", "org", "io", "in", "xyz", "email", "co.in"]
+
+    def random_domain():
+        name = "".join(rng.choices(string.ascii_lowercase + string.digits,
+                                   k=rng.randint(5, 14)))
+        return f"{name}.{rng.choice(tlds)}"
+
+    for n in sizes:
+        domains = [random_domain() for _ in range(n)]
+        t0 = time.perf_counter()
+        blocklist = DomainBlocklist(domains)
+        build_s = time.perf_counter() - t0
+        tracemalloc.start()
+        DomainBlocklist(domains)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        hits = [f"mx{i}.{rng.choice(domains)}" for i in range(20000)]
+        misses = [f"mx{i}.{random_domain()}" for i in range(20000)]
+        t0 = time.perf_counter()
+        found = sum(1 for d in hits if d in blocklist)
+        hit_us = (time.perf_counter() - t0) / len(hits) * 1e6
+        t0 = time.perf_counter()
+        for d in misses:
+            d in blocklist
+        miss_us = (time.perf_counter() - t0) / len(misses) * 1e6
+
+        print(
+            f"{n:>9,} domains: resident {blocklist.memory_bytes / 2**20:6.1f} MiB"
+            f" (build peak {peak / 2**20:6.1f} MiB, {build_s:5.2f} s)"
+            f" | subdomain hit {hit_us:5.1f} us ({found}/{len(hits)})"
+            f" | miss {miss_us:5.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    import sys
+
+    _benchmark([int(a) for a in sys.argv[1:]] or [100_000, 1_000_000])
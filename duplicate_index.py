@@ -0,0 +1,399 @@
+"""
+duplicate_index.py
+Persistent cross-registration uniqueness index for phone, email and Aadhaar.
+
+Identifiers are never stored in clear text: each one is normalized and keyed
+with a salted HMAC-SHA256 digest (truncated to 16 bytes). The salt comes from
+DEET_INDEX_SALT or, if that is unset, from a random secret generated once and
+stored in the index database itself, so an index opened from any directory
+hashes with the salt its keys were written with. The first index a process
+opens also keys its velocity counters and rule input digests (index_salt).
+The index lives in a SQLite database in WAL mode so several app processes can read and write it
+concurrently; the key column is a WITHOUT ROWID primary key, so a lookup is a
+single index probe that stays at a handful of page reads past ten million
+entries.
+
+A BloomFilter prefilter is kept in memory in front of the store, so the
+common "definitely new" answer for as-you-type checks never touches disk.
+"""
+
+import atexit
+import hashlib
+import hmac
+import logging
+import os
+import re
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from bloom_filter import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = os.environ.get(
+    "DEET_DUPLICATE_INDEX", "deet_registrations.db"
+)
+BLOOM_CAPACITY = int(os.environ.get("DEET_BLOOM_CAPACITY", "10000000"))
+BLOOM_ERROR_RATE = 0.01
+
+# How often (seconds) the prefilter pulls keys written by other processes,
+# and how far back it re-reads to tolerate clock skew between writers
+BLOOM_SYNC_INTERVAL = 1.0
+BLOOM_SYNC_SLACK = 5.0
+# Snapshot the prefilter after this many local additions
+BLOOM_SNAPSHOT_EVERY = 1000
+# Store answers memoized per key. Hits never go stale (identifiers are never
+# released); misses that got past the prefilter are kept only briefly.
+LOOKUP_CACHE_SIZE = 65536
+LOOKUP_MISS_TTL = BLOOM_SYNC_INTERVAL
+
+# Identifier fields tracked by the index, with their display label
+INDEXED_FIELDS = {
+    "phone": "Phone number",
+    "email": "Email address",
+    "aadhaar": "Aadhaar number",
+}
+
+KEY_BYTES = 16
+
+_salt: Optional[bytes] = None
+_salt_lock = threading.Lock()
+
+
+def _load_or_create_salt(conn: sqlite3.Connection, path: str) -> bytes:
+    """Read the index's salt, generating it on first use of an empty index."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            "SELECT value FROM index_meta WHERE name = 'salt'"
+        ).fetchone()
+        if row:
+            conn.execute("COMMIT")
+            return bytes(row[0])
+        # Indexes created before the salt moved into the database kept it
+        # in a file beside them
+        legacy = path + ".salt"
+        salt = b""
+        if os.path.exists(legacy):
+            with open(legacy, "rb") as f:
+                salt = f.read().strip()
+        if not salt:
+            if conn.execute("SELECT 1 FROM identifiers LIMIT 1").fetchone():
+                raise RuntimeError(
+                    f"Duplicate index {path} has entries but no salt; set "
+                    "DEET_INDEX_SALT to the salt it was built with"
+                )
+            salt = secrets.token_hex(32).encode("ascii")
+        conn.execute(
+            "INSERT INTO index_meta (name, value) VALUES ('salt', ?)",
+            (salt,),
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return salt
+
+
+def index_salt() -> bytes:
+    """
+    Secret key for velocity counters and rule input digests: the salt of
+    the first DuplicateIndex opened in this process (DEFAULT_INDEX_PATH if
+    none has been).
+    """
+    if _salt is None:
+        DuplicateIndex(DEFAULT_INDEX_PATH, use_bloom=False).close()
+    return _salt
+
+
+def normalize_identifier(field: str, value: Any) -> str:
+    """Canonical form of an identifier, or '' if there is nothing to index."""
+    if not value:
+        return ""
+    value = str(value).strip()
+    if field == "phone":
+        digits = re.sub(r'\D', '', value)
+        if digits.startswith("91") and len(digits) == 12:
+            digits = digits[2:]
+        return digits[-10:] if len(digits) >= 10 else ""
+    if field == "aadhaar":
+        digits = re.sub(r'\D', '', value)
+        return digits if len(digits) == 12 else ""
+    if field == "email":
+        return value.lower() if '@' in value else ""
+    return value
+
+
+def hash_identifier(
+    field: str, value: Any, salt: Optional[bytes] = None
+) -> Optional[bytes]:
+    """Salted digest used as the index key, or None for empty values."""
+    normalized = normalize_identifier(field, value)
+    if not normalized:
+        return None
+    message = f"{field}:{normalized}".encode("utf-8")
+    return hmac.new(
+        salt or index_salt(), message, hashlib.sha256
+    ).digest()[:KEY_BYTES]
+
+
+class DuplicateIndex:
+    """
+    SQLite-backed uniqueness index mapping hashed identifiers to the
+    registration ID that first claimed them.
+
+    With use_bloom=True (the default) lookups go through an in-memory Bloom
+    filter first. bloom_path, if given, is used to warm-start the filter and
+    is rewritten periodically and at interpreter exit.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_INDEX_PATH,
+        timeout: float = 5.0,
+        use_bloom: bool = True,
+        bloom_path: Optional[str] = None,
+        bloom_capacity: int = BLOOM_CAPACITY,
+    ):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS identifiers ("
+            " key BLOB PRIMARY KEY,"
+            " field TEXT NOT NULL,"
+            " registration_id TEXT NOT NULL,"
+            " created_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS identifiers_created_at "
+            "ON identifiers (created_at)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS index_meta ("
+            " name TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL"
+            ")"
+        )
+        env = os.environ.get("DEET_INDEX_SALT")
+        self.salt = (env.encode("utf-8") if env
+                     else _load_or_create_salt(conn, path))
+        global _salt
+        with _salt_lock:
+            if _salt is None:
+                _salt = self.salt
+            elif _salt != self.salt:
+                logger.warning(
+                    "Duplicate index %s has a different salt from the first "
+                    "index opened; velocity keys and rule digests keep using "
+                    "the first", path,
+                )
+
+        self.bloom = None
+        self.bloom_path = bloom_path
+        self.bloom_capacity = bloom_capacity
+        self._bloom_lock = threading.Lock()
+        self._last_sync = 0.0
+        self._unsaved = 0
+        self._lookup_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        if use_bloom:
+            self._load_bloom()
+            if bloom_path:
+                atexit.register(self.save_bloom)
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread: Streamlit serves sessions from threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path, timeout=self.timeout, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+            self._local.conn = conn
+        return conn
+
+    # ── Bloom prefilter ──────────────────────────────────────────────
+
+    def _load_bloom(self):
+        bloom = None
+        if self.bloom_path and os.path.exists(self.bloom_path):
+            try:
+                bloom = BloomFilter.load(self.bloom_path)
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring Bloom snapshot: %s", e)
+        if bloom is None:
+            self.rebuild_bloom()
+        else:
+            self.bloom = bloom
+            self._sync_bloom(force=True)
+
+    def rebuild_bloom(self, capacity: Optional[int] = None):
+        """Rebuild the prefilter from every key in the store."""
+        bloom = BloomFilter(capacity or self.bloom_capacity, BLOOM_ERROR_RATE)
+        cur = self._conn().execute("SELECT key, created_at FROM identifiers")
+        high_water = 0.0
+        for key, created_at in cur:
+            bloom.add(key)
+            high_water = max(high_water, created_at)
+        bloom.high_water = high_water
+        with self._bloom_lock:
+            self.bloom = bloom
+            self._last_sync = time.time()
+
+    def _sync_bloom(self, force: bool = False):
+        """Pull keys written by other processes since the last sync."""
+        now = time.time()
+        if not force and now - self._last_sync < BLOOM_SYNC_INTERVAL:
+            return
+        with self._bloom_lock:
+            self._last_sync = now
+            bloom = self.bloom
+            cur = self._conn().execute(
+                "SELECT key, created_at FROM identifiers WHERE created_at >= ?",
+                (bloom.high_water - BLOOM_SYNC_SLACK,),
+            )
+            for key, created_at in cur:
+                if key not in bloom:
+                    bloom.add(key)
+                bloom.high_water = max(bloom.high_water, created_at)
+
+    def save_bloom(self, path: Optional[str] = None):
+        """Snapshot the prefilter for a fast warm start. A failed snapshot
+        is only logged: it must never fail the registration that triggered
+        it."""
+        path = path or self.bloom_path
+        if self.bloom is None or not path:
+            return
+        with self._bloom_lock:
+            try:
+                self.bloom.save(path)
+            except OSError as e:
+                logger.warning("Could not snapshot Bloom filter: %s", e)
+                return
+            self._unsaved = 0
+
+    def might_contain(self, field: str, value: Any) -> bool:
+        """
+        False if the identifier is definitely not registered (answered from
+        memory); True if the store has to be consulted.
+        """
+        key = hash_identifier(field, value, self.salt)
+        if key is None:
+            return False
+        if self.bloom is None:
+            return True
+        self._sync_bloom()
+        return key in self.bloom
+
+    # ── Store ────────────────────────────────────────────────────────
+
+    def lookup(self, field: str, value: Any) -> Optional[str]:
+        """Registration ID already holding this identifier, if any."""
+        key = hash_identifier(field, value, self.salt)
+        if key is None:
+            return None
+        if self.bloom is not None:
+            self._sync_bloom()
+            if key not in self.bloom:
+                return None
+
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._lookup_cache.get(key)
+            if cached is not None:
+                reg_id, expires_at = cached
+                if expires_at is None or expires_at > now:
+                    self._lookup_cache.move_to_end(key)
+                    return reg_id
+
+        row = self._conn().execute(
+            "SELECT registration_id FROM identifiers WHERE key = ?", (key,)
+        ).fetchone()
+        reg_id = row[0] if row else None
+        self._cache_put(key, reg_id, None if reg_id else now + LOOKUP_MISS_TTL)
+        return reg_id
+
+    def _cache_put(self, key: bytes, reg_id: Optional[str], expires_at):
+        with self._cache_lock:
+            self._lookup_cache[key] = (reg_id, expires_at)
+            self._lookup_cache.move_to_end(key)
+            if len(self._lookup_cache) > LOOKUP_CACHE_SIZE:
+                self._lookup_cache.popitem(last=False)
+
+    def lookup_many(self, form_data: Dict[str, Any]) -> Dict[str, str]:
+        """Map of field -> existing registration ID for every indexed hit."""
+        hits = {}
+        for field in INDEXED_FIELDS:
+            reg_id = self.lookup(field, form_data.get(field))
+            if reg_id:
+                hits[field] = reg_id
+        return hits
+
+    def register(
+        self, registration_id: str, form_data: Dict[str, Any]
+    ) -> Dict[str, str]:
+        """
+        Claim every identifier in form_data for registration_id.
+        Identifiers that already belong to another registration are left
+        untouched and returned as field -> existing registration ID.
+        """
+        conn = self._conn()
+        conflicts = {}
+        added = []
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for field in INDEXED_FIELDS:
+                key = hash_identifier(field, form_data.get(field), self.salt)
+                if key is None:
+                    continue
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO identifiers "
+                    "(key, field, registration_id, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, field, registration_id, now),
+                )
+                if cur.rowcount == 1:
+                    added.append((key, registration_id))
+                else:
+                    row = conn.execute(
+                        "SELECT registration_id FROM identifiers WHERE key = ?",
+                        (key,),
+                    ).fetchone()
+                    if row and row[0] != registration_id:
+                        conflicts[field] = row[0]
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        for key, reg_id in added:
+            self._cache_put(key, reg_id, None)
+        if self.bloom is not None and added:
+            with self._bloom_lock:
+                self.bloom.update(key for key, _ in added)
+                self._unsaved += len(added)
+                snapshot_due = self._unsaved >= BLOOM_SNAPSHOT_EVERY
+            if snapshot_due:
+                self.save_bloom()
+        return conflicts
+
+    def __len__(self) -> int:
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM identifiers"
+        ).fetchone()[0]
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
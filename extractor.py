@@ -1,6 +1,8 @@
 import re
 import time
 
+from verhoeff import verhoeff_validate
+
 SKILLS_DATABASE = [
     "Python", "Java", "JavaScript", "SQL", "HTML/CSS", "React", "Angular",
     "Node.js", "Django", "Flask", "Machine Learning", "Data Analysis",
@@ -92,12 +94,14 @@ def extract_all_from_resume(uploaded_file):
             result["phone"] = phone[-10:]
 
         # ── Extract Aadhaar ──────────────────────────────────────────
-        aadhaar_pattern = r'\b\d{4}\s?\d{4}\s?\d{4}\b'
-        aadhaars = re.findall(aadhaar_pattern, raw_text)
-        if aadhaars:
-            aadhaar = re.sub(r'\s', '', aadhaars[0])
-            if len(aadhaar) == 12:
+        # Only accept 12-digit runs with a valid Verhoeff check digit, so
+        # phone-number concatenations and other IDs are not picked up
+        aadhaar_pattern = r'\b[2-9][0-9]{3}\s?[0-9]{4}\s?[0-9]{4}\b'
+        for match in re.finditer(aadhaar_pattern, raw_text):
+            aadhaar = re.sub(r'\s', '', match.group(0))
+            if len(aadhaar) == 12 and verhoeff_validate(aadhaar):
                 result["aadhaar"] = aadhaar
+                break
 
         # ── Extract Name (first non-empty line heuristic) ────────────
         lines = [
@@ -0,0 +1,244 @@
+"""
+fraud_audit.py
+Re-run fraud checks and health scoring over exported registrations.
+
+Reads JSONL where each line is a registration in the form_data_snapshot
+shape written at submission, scores records in batches across worker
+processes, and writes each record back out with an "audit" object holding
+the fresh fraud report and health score. Only a bounded number of batches is
+in flight at once, so memory stays constant regardless of input size.
+
+Usage:
+    python fraud_audit.py registrations.jsonl -o audited.jsonl
+    cat registrations.jsonl | python fraud_audit.py - -o - --workers 8
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from scoring import score
+
+logger = logging.getLogger(__name__)
+
+_worker_duplicate_index = None
+
+
+def _init_worker(duplicate_index_path: Optional[str]):
+    global _worker_duplicate_index
+    if duplicate_index_path:
+        from duplicate_index import DuplicateIndex
+        _worker_duplicate_index = DuplicateIndex(duplicate_index_path)
+
+
+def audit_record(
+    record: Dict[str, Any], duplicate_index=None
+) -> Dict[str, Any]:
+    """Attach a fresh fraud report and health score to one registration."""
+    form_data = dict(record)
+    form_data.pop("audit", None)
+    if duplicate_index is not None:
+        # A registration must not be reported as a duplicate of itself
+        reg_id = record.get("registration_id")
+        duplicate_index = _ExcludingIndex(duplicate_index, reg_id)
+    scored = score(form_data, duplicate_index=duplicate_index)
+    record["audit"] = {
+        "fraud_report": scored["fraud_report"],
+        "health_score": scored["health_score"],
+        "audited_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    return record
+
+
+class _ExcludingIndex:
+    """DuplicateIndex view that ignores hits on one registration ID."""
+
+    def __init__(self, index, registration_id):
+        self.index = index
+        self.registration_id = registration_id
+
+    def lookup_many(self, form_data):
+        return {
+            field: reg_id
+            for field, reg_id in self.index.lookup_many(form_data).items()
+            if reg_id != self.registration_id
+        }
+
+
+def _score_batch(lines: List[str]) -> Tuple[List[str], Dict[str, Counter], int]:
+    """Worker entry point: score raw JSONL lines."""
+    out = []
+    counts = {"rules": Counter(), "codes": Counter(), "levels": Counter()}
+    errors = 0
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            errors += 1
+            continue
+        if not isinstance(record, dict):
+            errors += 1
+            continue
+        # One bad record (e.g. a null where a number is expected) must not
+        # abort the whole run
+        try:
+            record = audit_record(record, _worker_duplicate_index)
+            report = record["audit"]["fraud_report"]
+            line_out = json.dumps(record, ensure_ascii=False, default=str)
+        except Exception as e:
+            logger.warning("Could not audit %s: %r",
+                           record.get("registration_id", "record"), e)
+            errors += 1
+            continue
+        counts["levels"][report["risk_level"]] += 1
+        counts["codes"].update(report["flag_codes"])
+        for name, detail in report["details"].items():
+            if not detail["valid"]:
+                counts["rules"][name] += 1
+        out.append(line_out)
+    return out, counts, errors
+
+
+def _batches(lines: Iterator[str], size: int) -> Iterator[List[str]]:
+    lines = (ln for ln in lines if ln.strip())
+    while True:
+        batch = list(islice(lines, size))
+        if not batch:
+            return
+        yield batch
+
+
+def run_audit(
+    infile,
+    outfile,
+    workers: int = os.cpu_count() or 1,
+    batch_size: int = 500,
+    duplicate_index_path: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Stream infile -> outfile through the fraud checks.
+    Returns a summary dict with counts, per-rule hits and throughput.
+    """
+    totals = {"rules": Counter(), "codes": Counter(), "levels": Counter()}
+    records = errors = 0
+    start = time.perf_counter()
+
+    def collect(result):
+        nonlocal records, errors
+        out_lines, counts, batch_errors = result
+        for line in out_lines:
+            outfile.write(line + "\n")
+        for key, counter in counts.items():
+            totals[key].update(counter)
+        records += len(out_lines)
+        errors += batch_errors
+
+    if workers <= 1:
+        _init_worker(duplicate_index_path)
+        for batch in _batches(infile, batch_size):
+            collect(_score_batch(batch))
+    else:
+        max_in_flight = workers * 2
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(duplicate_index_path,),
+        ) as pool:
+            pending = deque()
+            for batch in _batches(infile, batch_size):
+                pending.append(pool.submit(_score_batch, batch))
+                # Keep output ordered and memory bounded
+                while len(pending) >= max_in_flight:
+                    collect(pending.popleft().result())
+            while pending:
+                collect(pending.popleft().result())
+
+    elapsed = time.perf_counter() - start
+    return {
+        "records": records,
+        "errors": errors,
+        "seconds": elapsed,
+        "records_per_sec": records / elapsed if elapsed > 0 else 0.0,
+        "risk_levels": dict(totals["levels"]),
+        "rule_hits": dict(totals["rules"].most_common()),
+        "issue_hits": dict(totals["codes"].most_common()),
+    }
+
+
+def print_summary(summary: Dict[str, Any], stream=sys.stderr):
+    print(
+        f"Audited {summary['records']:,} records "
+        f"({summary['errors']:,} skipped) in {summary['seconds']:.1f}s "
+        f"— {summary['records_per_sec']:,.0f} records/sec",
+        file=stream,
+    )
+    levels = summary["risk_levels"]
+    print(
+        "Risk levels: " + ", ".join(
+            f"{lvl} {levels.get(lvl, 0):,}" for lvl in ("LOW", "MEDIUM", "HIGH")
+        ),
+        file=stream,
+    )
+    print("Rule hits:", file=stream)
+    for name, count in summary["rule_hits"].items():
+        print(f"  {name:<12} {count:>10,}", file=stream)
+    print("Issue hits:", file=stream)
+    for code, count in summary["issue_hits"].items():
+        print(f"  {code:<28} {count:>10,}", file=stream)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Re-run fraud checks over registration JSONL exports."
+    )
+    parser.add_argument("input", help="Input JSONL file, or - for stdin")
+    parser.add_argument(
+        "-o", "--output", default="-",
+        help="Output JSONL file, or - for stdout (default)",
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=os.cpu_count() or 1,
+        help="Worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "-b", "--batch-size", type=int, default=500,
+        help="Records per batch sent to a worker (default: 500)",
+    )
+    parser.add_argument(
+        "--duplicate-index",
+        help="Path of the duplicate index database to check against",
+    )
+    args = parser.parse_args(argv)
+
+    infile = (
+        sys.stdin if args.input == "-"
+        else open(args.input, encoding="utf-8")
+    )
+    outfile = (
+        sys.stdout if args.output == "-"
+        else open(args.output, "w", encoding="utf-8")
+    )
+    try:
+        summary = run_audit(
+            infile, outfile, args.workers, args.batch_size,
+            args.duplicate_index,
+        )
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+        if outfile is not sys.stdout:
+            outfile.close()
+    print_summary(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
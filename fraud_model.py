@@ -0,0 +1,370 @@
+"""
+fraud_model.py
+Fixed-length feature vectors for registrations and an in-process logistic
+fraud scorer that runs next to the rule-based risk score.
+
+Features come from the form data, the rule report (issue counts per rule)
+and, when present, the resume extraction result. The same extractor feeds
+the training exporter and live scoring, so a model trained offline on the
+exported arrays sees exactly the features it is served (app.py keeps the
+upload flags in the submitted snapshot for this).
+
+The model file is JSON (feature names, standardization and weights). On
+load the standardization is folded into the weights, so scoring a record is
+one dot product and scoring a batch is one matrix-vector product.
+
+Usage:
+    python fraud_model.py export labelled.jsonl -o history.npz
+    python fraud_model.py train history.npz -o fraud_model.json
+    python fraud_model.py bench fraud_model.json
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import re
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from fraudchecker import FRAUD_RULES, run_fraud_check
+from population_stats import age_from_dob, total_experience
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_PATH = os.environ.get("DEET_FRAUD_MODEL", "fraud_model.json")
+
+RULE_CODES = tuple(rule.code for rule in FRAUD_RULES.rules)
+
+FORM_FEATURES = (
+    "name_length", "name_tokens", "phone_valid", "email_present",
+    "aadhaar_present", "age", "age_known", "experience_total",
+    "is_fresher", "experience_entries", "skills", "optional_skills",
+    "preferred_locations", "job_functions", "profile_image",
+    "resume_uploaded", "identity_card", "certificates", "document_hashes",
+)
+REPORT_FEATURES = ("rule_fail_fraction",) + tuple(
+    f"issues_{code.lower()}" for code in RULE_CODES
+)
+EXTRACTION_FEATURES = (
+    "resume_extracted", "resume_name_match", "resume_email_match",
+    "resume_phone_match", "resume_skill_overlap", "resume_experience_gap",
+    "resume_organizations",
+)
+FEATURE_NAMES = FORM_FEATURES + REPORT_FEATURES + EXTRACTION_FEATURES
+NUM_FEATURES = len(FEATURE_NAMES)
+
+# Count-like features are log1p-compressed before standardization
+_LOG_FEATURES = np.array([
+    name in {
+        "name_length", "experience_total", "experience_entries", "skills",
+        "optional_skills", "preferred_locations", "job_functions",
+        "resume_experience_gap", "resume_organizations",
+    }
+    for name in FEATURE_NAMES
+])
+
+_PHONE_RE = re.compile(r"^[6-9]\d{9}$")
+
+
+# ─── Feature Extraction ─────────────────────────────────────────────────────
+
+def _norm(value: Any) -> str:
+    return str(value or "").strip().lower()
+
+
+def _row(
+    form_data: Dict[str, Any],
+    report: Dict[str, Any],
+    extraction: Optional[Dict[str, Any]],
+) -> List[float]:
+    name = str(form_data.get("name") or "").strip()
+    phone = re.sub(r"[\s\-\+]", "", str(form_data.get("phone") or ""))[-10:]
+    age = age_from_dob(form_data.get("dob"))
+    skills = form_data.get("skills") or []
+    row = [
+        len(name),
+        len(name.split()),
+        bool(_PHONE_RE.match(phone)),
+        bool(form_data.get("email")),
+        bool(form_data.get("aadhaar")),
+        age or 0,
+        age is not None,
+        total_experience(form_data),
+        bool(form_data.get("is_fresher")),
+        len(form_data.get("experience_entries") or []),
+        len(skills),
+        len(form_data.get("optional_skills") or []),
+        len(form_data.get("preferred_locations") or []),
+        len(form_data.get("job_functions") or []),
+        bool(form_data.get("profile_image")),
+        bool(form_data.get("resume_uploaded")),
+        bool(form_data.get("identity_card")),
+        sum(bool(form_data.get(f"certificate_{i}")) for i in range(1, 4)),
+        len(form_data.get("document_hashes") or {}),
+    ]
+
+    total = report.get("total_checks") or 0
+    row.append(report.get("failed_checks", 0) / total if total else 0.0)
+    # Counted per rule, not by code prefix: CONTACTS reports PHONE_/EMAIL_
+    details = report.get("details") or {}
+    for rule in FRAUD_RULES.rules:
+        detail = details.get(rule.name) or {}
+        row.append(len(detail.get("codes") or detail.get("issues") or ()))
+
+    if extraction and extraction.get("status", "success") == "success":
+        resume_skills = {_norm(s) for s in extraction.get("skills") or []}
+        form_skills = {_norm(s) for s in skills}
+        resume_exp = extraction.get("experience_years")
+        row.extend([
+            1,
+            bool(extraction.get("name"))
+            and _norm(extraction["name"]) == _norm(name),
+            bool(extraction.get("email"))
+            and _norm(extraction["email"]) == _norm(form_data.get("email")),
+            bool(extraction.get("phone"))
+            and str(extraction["phone"])[-10:] == phone,
+            len(resume_skills & form_skills) / len(form_skills)
+            if form_skills else 0.0,
+            abs(total_experience(form_data) - resume_exp)
+            if resume_exp is not None else 0.0,
+            len(extraction.get("organizations") or []),
+        ])
+    else:
+        row.extend([0] * len(EXTRACTION_FEATURES))
+    return row
+
+
+def _transform(matrix: np.ndarray) -> np.ndarray:
+    matrix[:, _LOG_FEATURES] = np.log1p(np.maximum(matrix[:, _LOG_FEATURES], 0))
+    return matrix
+
+
+def extract_features(
+    form_data: Dict[str, Any],
+    report: Optional[Dict[str, Any]] = None,
+    extraction: Optional[Dict[str, Any]] = None,
+) -> np.ndarray:
+    """Feature vector (float32, NUM_FEATURES long) for one registration."""
+    if report is None:
+        report = run_fraud_check(form_data)
+    row = np.array([_row(form_data, report, extraction)], dtype=np.float32)
+    return _transform(row)[0]
+
+
+def extract_batch(
+    records: Iterable[Tuple[Dict[str, Any], Optional[Dict[str, Any]],
+                            Optional[Dict[str, Any]]]],
+) -> np.ndarray:
+    """
+    Feature matrix for (form_data, report, extraction) triples. A missing
+    report is computed with run_fraud_check.
+    """
+    rows = [
+        _row(fd, report if report is not None else run_fraud_check(fd), ext)
+        for fd, report, ext in records
+    ]
+    if not rows:
+        return np.empty((0, NUM_FEATURES), dtype=np.float32)
+    return _transform(np.array(rows, dtype=np.float32))
+
+
+# ─── Training Data Export ───────────────────────────────────────────────────
+
+def _label(record: Dict[str, Any]) -> Optional[int]:
+    for key in ("label", "is_fraud"):
+        if record.get(key) is not None:
+            return int(bool(record[key]))
+    return None
+
+
+def _record_parts(record: Dict[str, Any]):
+    report = (record.get("audit") or {}).get("fraud_report") or record.get(
+        "fraud_report"
+    )
+    return record, report, record.get("resume_extraction")
+
+
+def export_training_data(lines: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (X, y) from labelled registration JSONL lines (a "label" or "is_fraud"
+    field per record). Unlabelled and unreadable lines are skipped.
+    """
+    parts, labels = [], []
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        label = _label(record) if isinstance(record, dict) else None
+        if label is None:
+            continue
+        parts.append(_record_parts(record))
+        labels.append(label)
+    return extract_batch(parts), np.array(labels, dtype=np.int8)
+
+
+def train_logistic(
+    X: np.ndarray,
+    y: np.ndarray,
+    l2: float = 1e-3,
+    epochs: int = 500,
+    learning_rate: float = 0.5,
+) -> Dict[str, Any]:
+    """Full-batch gradient descent on standardized features (offline use)."""
+    X = X.astype(np.float64)
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1.0
+    Z = (X - mean) / scale
+    weights = np.zeros(Z.shape[1])
+    bias = 0.0
+    for _ in range(epochs):
+        p = 1.0 / (1.0 + np.exp(-(Z @ weights + bias)))
+        error = p - y
+        weights -= learning_rate * (Z.T @ error / len(y) + l2 * weights)
+        bias -= learning_rate * error.mean()
+    return {
+        "feature_names": list(FEATURE_NAMES),
+        "mean": mean.tolist(),
+        "scale": scale.tolist(),
+        "weights": weights.tolist(),
+        "bias": bias,
+        "trained_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "samples": int(len(y)),
+    }
+
+
+# ─── Scoring ────────────────────────────────────────────────────────────────
+
+class FraudModel:
+    """Logistic scorer with standardization folded into its weights."""
+
+    def __init__(self, spec: Dict[str, Any]):
+        if list(spec["feature_names"]) != list(FEATURE_NAMES):
+            raise ValueError(
+                "model was trained on a different feature set; re-export "
+                "and retrain"
+            )
+        weights = np.asarray(spec["weights"], dtype=np.float64)
+        scale = np.asarray(spec["scale"], dtype=np.float64)
+        mean = np.asarray(spec["mean"], dtype=np.float64)
+        self.weights = (weights / scale).astype(np.float32)
+        self.bias = float(spec["bias"] - np.dot(weights, mean / scale))
+        self.spec = spec
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_MODEL_PATH) -> Optional["FraudModel"]:
+        """Model from path, or None if it is missing or unusable."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                return cls(json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Could not load fraud model %s: %s", path, e)
+            return None
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.spec, f)
+
+    def score_vector(self, x: np.ndarray) -> float:
+        z = float(np.dot(self.weights, x)) + self.bias
+        return 1.0 / (1.0 + math.exp(-max(-500.0, min(500.0, z))))
+
+    def score_batch(self, X: np.ndarray) -> np.ndarray:
+        """Fraud probabilities for a feature matrix."""
+        z = X @ self.weights + np.float32(self.bias)
+        return 1.0 / (1.0 + np.exp(-np.clip(z, -500, 500)))
+
+    def score(
+        self,
+        form_data: Dict[str, Any],
+        report: Dict[str, Any],
+        extraction: Optional[Dict[str, Any]] = None,
+    ) -> float:
+        """Fraud probability for one registration and its rule report."""
+        return self.score_vector(extract_features(form_data, report, extraction))
+
+
+# ─── CLI ────────────────────────────────────────────────────────────────────
+
+def _bench(model: FraudModel):
+    x = np.random.default_rng(0).random(NUM_FEATURES, dtype=np.float32)
+    n = 100_000
+    start = time.perf_counter()
+    for _ in range(n):
+        model.score_vector(x)
+    single_us = (time.perf_counter() - start) / n * 1e6
+
+    X = np.random.default_rng(1).random((1_000_000, NUM_FEATURES), dtype=np.float32)
+    start = time.perf_counter()
+    model.score_batch(X)
+    batch_s = time.perf_counter() - start
+    print(f"features: {NUM_FEATURES}")
+    print(f"single record: {single_us:.2f} us")
+    print(f"1,000,000 records: {batch_s:.3f} s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fraud model tooling.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("export", help="Labelled JSONL -> feature arrays (.npz)")
+    p.add_argument("input", help="Labelled JSONL file, or - for stdin")
+    p.add_argument("-o", "--output", required=True)
+
+    p = sub.add_parser("train", help="Fit a logistic model on exported arrays")
+    p.add_argument("input", help=".npz written by export")
+    p.add_argument("-o", "--output", default=DEFAULT_MODEL_PATH)
+    p.add_argument("--l2", type=float, default=1e-3)
+    p.add_argument("--epochs", type=int, default=500)
+
+    p = sub.add_parser("bench", help="Time single and batch scoring")
+    p.add_argument("model", nargs="?", default=DEFAULT_MODEL_PATH)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        infile = (
+            sys.stdin if args.input == "-"
+            else open(args.input, encoding="utf-8")
+        )
+        try:
+            X, y = export_training_data(infile)
+        finally:
+            if infile is not sys.stdin:
+                infile.close()
+        np.savez_compressed(
+            args.output, X=X, y=y, feature_names=np.array(FEATURE_NAMES)
+        )
+        print(f"Exported {len(y):,} labelled records ({int(y.sum()):,} fraud)",
+              file=sys.stderr)
+    elif args.command == "train":
+        data = np.load(args.input)
+        if list(data["feature_names"]) != list(FEATURE_NAMES):
+            print("Feature set changed since export; re-export first.",
+                  file=sys.stderr)
+            return 1
+        spec = train_logistic(data["X"], data["y"], args.l2, args.epochs)
+        FraudModel(spec).save(args.output)
+        print(f"Trained on {spec['samples']:,} records -> {args.output}",
+              file=sys.stderr)
+    else:
+        model = FraudModel.load(args.model)
+        if model is None:
+            print(f"No usable model at {args.model}", file=sys.stderr)
+            return 1
+        _bench(model)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
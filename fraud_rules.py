@@ -0,0 +1,476 @@
+"""
+fraud_rules.py
+Declarative fraud rule registry and evaluation engine.
+
+A FraudRule names the form fields it reads, a cost class, and a check
+function returning (code, message) issues. Each issue code carries a
+severity weight. A RuleSet is compiled once (rules ordered cheap-first) and
+evaluates a form into the report shape used by fraudchecker.run_fraud_check,
+recording per-rule hit counts and timings.
+
+Passing a memo dict to RuleSet.evaluate makes it incremental: each rule's
+result is kept with a frozen copy of the fields it read and the rule's
+fingerprint, and only rules whose fields or data changed since the previous
+call are re-run.
+
+Reports also carry the time spent in each rule that was actually run
+(report["timings_us"]; reused and memoized results take no time).
+
+Every report records the fingerprint of each rule (its definition plus any
+external data such as the disposable-domain list) and a digest of the inputs
+each applied rule read, keyed with the duplicate index's secret salt since
+the inputs include phone and Aadhaar numbers. RuleSet.rescore uses these to
+bring a stored report up to date by re-running only the rules that changed
+since it was made.
+"""
+
+import hashlib
+import hmac
+import json
+import threading
+import time
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from duplicate_index import index_salt
+
+# Cost classes: rules run in ascending cost order
+COST_CHEAP = 0        # pure in-memory checks on one field
+COST_MODERATE = 1     # larger in-memory tables / cross-field checks
+COST_EXPENSIVE = 2    # store lookups (duplicate index, etc.)
+
+RISK_MEDIUM_AT = 30
+RISK_HIGH_AT = 60
+
+Issue = Tuple[str, str]
+
+
+def freeze(value: Any) -> Any:
+    """Hashable, comparable snapshot of a form value (lists/dicts nested)."""
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, set):
+        return tuple(sorted(freeze(v) for v in value))
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+class FraudRule:
+    """
+    One fraud check.
+
+    name     -- key of the rule in report["details"]
+    code     -- machine-readable rule code (issue codes are prefixed by it)
+    fields   -- form_data keys the rule reads
+    check    -- fn(form_data, context) -> list of (issue_code, message)
+    weights  -- severity weight per issue code (default: `weight`)
+    weight   -- severity weight for issue codes not listed in `weights`
+    cost     -- COST_CHEAP / COST_MODERATE / COST_EXPENSIVE
+    applies  -- fn(form_data, context) -> bool; a rule that does not apply
+                is skipped and does not count towards total_checks.
+                Defaults to "any of `fields` is non-empty".
+    show_skipped -- list a skipped rule in report["details"] as valid
+    memoize  -- allow reuse of the previous result when `fields` are
+                unchanged (turn off for time- or state-dependent rules)
+    version  -- bump whenever the check's logic or thresholds change, so
+                stored reports are re-scored
+    data_version -- fn() -> str fingerprint of external data the check
+                uses (e.g. a blocklist); part of the rule's fingerprint
+    requires -- context keys (stores) the check needs; when one is missing
+                from a rescore context, the stored result is carried forward
+    """
+
+    def __init__(
+        self,
+        name: str,
+        code: str,
+        fields: Iterable[str],
+        check: Callable[[Dict[str, Any], Dict[str, Any]], List[Issue]],
+        weights: Optional[Dict[str, int]] = None,
+        weight: int = 0,
+        cost: int = COST_CHEAP,
+        applies: Optional[Callable[[Dict[str, Any], Dict[str, Any]], bool]] = None,
+        show_skipped: bool = True,
+        memoize: bool = True,
+        version: str = "1",
+        data_version: Optional[Callable[[], str]] = None,
+        requires: Iterable[str] = (),
+    ):
+        self.name = name
+        self.code = code
+        self.fields = tuple(fields)
+        self.check = check
+        self.weights = dict(weights or {})
+        self.weight = weight
+        self.cost = cost
+        self.applies = applies or self._any_field_set
+        self.show_skipped = show_skipped
+        self.memoize = memoize
+        self.version = version
+        self.data_version = data_version
+        self.requires = tuple(requires)
+        definition = repr((
+            self.code, version, self.fields, sorted(self.weights.items()),
+            weight, cost,
+        ))
+        self._definition_digest = hashlib.sha1(
+            definition.encode("utf-8")
+        ).hexdigest()[:12]
+
+    def _any_field_set(self, form_data, context) -> bool:
+        return any(form_data.get(f) for f in self.fields)
+
+    def input_key(self, form_data: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Frozen values of the fields this rule reads."""
+        return tuple(freeze(form_data.get(f)) for f in self.fields)
+
+    def input_digest(self, form_data: Dict[str, Any]) -> str:
+        """
+        Short keyed digest of the rule's inputs, stable across JSON storage
+        (salted so stored digests cannot be brute-forced back to
+        identifiers).
+        """
+        # Dates are stored as ISO strings, so digest them that way
+        encoded = repr([
+            v.isoformat() if isinstance(v, date) else v
+            for v in map(form_data.get, self.fields)
+        ])
+        return hmac.new(
+            index_salt(), encoded.encode("utf-8"), hashlib.sha256
+        ).hexdigest()[:16]
+
+    def fingerprint(self) -> str:
+        """Changes whenever the rule's definition or its data changes."""
+        if self.data_version is None:
+            return self._definition_digest
+        return f"{self._definition_digest}.{self.data_version()}"
+
+    def severity(self, issue_code: str) -> int:
+        return self.weights.get(issue_code, self.weight)
+
+    def __repr__(self):
+        return f"FraudRule({self.code!r}, fields={self.fields}, cost={self.cost})"
+
+
+def risk_band(risk_pct: float) -> Tuple[str, str]:
+    """(risk_level, risk_color) for a risk percentage."""
+    if risk_pct < RISK_MEDIUM_AT:
+        return "LOW", "green"
+    if risk_pct < RISK_HIGH_AT:
+        return "MEDIUM", "orange"
+    return "HIGH", "red"
+
+
+class RuleSet:
+    """Compiled, cost-ordered collection of FraudRules with usage stats."""
+
+    def __init__(self, rules: Iterable[FraudRule]):
+        # Stable sort keeps registration order within a cost class
+        self.rules = sorted(rules, key=lambda r: r.cost)
+        self.by_code = {r.code: r for r in self.rules}
+        self._stats_lock = threading.Lock()
+        self._versions_cache = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats = {
+                r.code: {
+                    "evaluations": 0, "hits": 0, "cached": 0, "seconds": 0.0,
+                }
+                for r in self.rules
+            }
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per-rule evaluation count, hit count, memo reuse count, and
+        total/mean evaluation time.
+        """
+        with self._stats_lock:
+            out = {}
+            for code, s in self._stats.items():
+                out[code] = dict(s)
+                out[code]["mean_us"] = (
+                    s["seconds"] / s["evaluations"] * 1e6
+                    if s["evaluations"] else 0.0
+                )
+            return out
+
+    def _record(self, code: str, hit: bool, seconds: float):
+        with self._stats_lock:
+            s = self._stats[code]
+            s["evaluations"] += 1
+            s["hits"] += hit
+            s["seconds"] += seconds
+
+    def _record_cached(self, code: str):
+        with self._stats_lock:
+            self._stats[code]["cached"] += 1
+
+    def _current_versions(self) -> Tuple[Dict[str, str], str]:
+        # Fingerprints only change with data_version, so cache on those
+        fingerprints = tuple(r.fingerprint() for r in self.rules)
+        cached = self._versions_cache
+        if cached is None or cached[0] != fingerprints:
+            versions = {r.code: fp for r, fp in zip(self.rules, fingerprints)}
+            cached = (fingerprints, versions, self.version_of(versions))
+            self._versions_cache = cached
+        return cached[1], cached[2]
+
+    def versions(self) -> Dict[str, str]:
+        """Current fingerprint of every rule, by rule code."""
+        return dict(self._current_versions()[0])
+
+    @staticmethod
+    def version_of(versions: Dict[str, str]) -> str:
+        """Single fingerprint for a {code: fingerprint} mapping."""
+        encoded = json.dumps(versions, sort_keys=True)
+        return hashlib.sha1(encoded.encode("utf-8")).hexdigest()[:12]
+
+    def evaluate(
+        self,
+        form_data: Dict[str, Any],
+        context: Optional[Dict[str, Any]] = None,
+        stop_on_high: bool = False,
+        memo: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run every applicable rule and build the fraud report.
+
+        With stop_on_high=True evaluation stops as soon as the risk is
+        guaranteed to be HIGH even if every remaining rule were to pass;
+        report["short_circuited"] is then True.
+
+        memo is a caller-owned dict (e.g. one per Streamlit session); rules
+        whose input fields are unchanged since the last call reuse their
+        previous issues instead of being re-run.
+        """
+        return self._evaluate(form_data, context or {}, stop_on_high, memo)
+
+    def stale_rules(
+        self,
+        form_data: Dict[str, Any],
+        report: Dict[str, Any],
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Optional[List[FraudRule]]:
+        """
+        Rules whose stored result in report is out of date: the rule changed
+        (or is new) and applies to this record, or its inputs differ from
+        the ones recorded. None means the report cannot be updated
+        incrementally and needs a full evaluation.
+        """
+        context = context or {}
+        versions = report.get("rule_versions")
+        inputs = report.get("rule_inputs")
+        if versions is None or inputs is None or report.get("short_circuited"):
+            return None
+        stale = []
+        for rule in self.rules:
+            if rule.code in inputs:
+                if (
+                    versions.get(rule.code) != rule.fingerprint()
+                    or inputs[rule.code] != rule.input_digest(form_data)
+                ):
+                    stale.append(rule)
+            elif (
+                versions.get(rule.code) != rule.fingerprint()
+                and rule.applies(form_data, context)
+            ):
+                stale.append(rule)
+        return stale
+
+    def rescore(
+        self,
+        form_data: Dict[str, Any],
+        report: Dict[str, Any],
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Dict[str, Any], Optional[List[str]]]:
+        """
+        Bring a stored report up to date with the current rules.
+        Returns (report, codes of the rules re-run); codes is None after a
+        full evaluation and empty when the stored report was current (it is
+        then returned as is, apart from refreshed rule versions).
+        """
+        context = context or {}
+        carried = self._carried_results(report, context)
+        stale = self.stale_rules(form_data, report, context)
+        if stale is None:
+            updated = self._evaluate(form_data, context, False, None, carried)
+            return self._keep_carried(updated, report, carried), None
+        stale = [r for r in stale if r.code not in carried]
+        if not stale:
+            report = dict(report)
+            versions, version = self._current_versions()
+            report["rule_versions"] = dict(versions)
+            report["rule_set_version"] = version
+            return self._keep_carried(report, report, carried), []
+
+        stale_codes = {r.code for r in stale}
+        reuse = {}
+        for rule in self.rules:
+            if rule.code in stale_codes:
+                continue
+            detail = report["details"].get(rule.name)
+            if rule.code in report["rule_inputs"] and detail is not None:
+                reuse[rule.code] = tuple(zip(detail["codes"], detail["issues"]))
+            else:
+                reuse[rule.code] = None
+        reuse.update(carried)
+        updated = self._evaluate(form_data, context, False, None, reuse)
+        return (
+            self._keep_carried(updated, report, carried),
+            [r.code for r in stale],
+        )
+
+    def _carried_results(
+        self, report: Dict[str, Any], context: Dict[str, Any]
+    ) -> Dict[str, Tuple[Issue, ...]]:
+        """Stored issues of rules whose store is missing from context."""
+        carried = {}
+        details = report.get("details") or {}
+        for rule in self.rules:
+            if not rule.requires or all(
+                context.get(key) is not None for key in rule.requires
+            ):
+                continue
+            detail = details.get(rule.name)
+            if detail is None:
+                continue
+            issues = detail.get("issues") or []
+            codes = detail.get("codes") or [rule.code] * len(issues)
+            carried[rule.code] = tuple(zip(codes, issues))
+        return carried
+
+    def _keep_carried(
+        self,
+        updated: Dict[str, Any],
+        stored: Dict[str, Any],
+        carried: Dict[str, Tuple[Issue, ...]],
+    ) -> Dict[str, Any]:
+        # A carried result keeps the version and input digest it was made
+        # with, so a later rescore that has the store still re-runs it
+        if not carried:
+            return updated
+        stored_versions = stored.get("rule_versions") or {}
+        stored_inputs = stored.get("rule_inputs") or {}
+        versions = dict(updated["rule_versions"])
+        inputs = dict(updated["rule_inputs"])
+        for code in carried:
+            versions[code] = stored_versions.get(code, "")
+            if code in stored_inputs:
+                inputs[code] = stored_inputs[code]
+            else:
+                inputs.pop(code, None)
+        updated = dict(updated)
+        updated["rule_versions"] = versions
+        updated["rule_inputs"] = inputs
+        updated["rule_set_version"] = self.version_of(versions)
+        return updated
+
+    def _evaluate(
+        self,
+        form_data: Dict[str, Any],
+        context: Dict[str, Any],
+        stop_on_high: bool,
+        memo: Optional[Dict[str, Any]],
+        reuse: Optional[Dict[str, Optional[Tuple[Issue, ...]]]] = None,
+    ) -> Dict[str, Any]:
+        # reuse maps rule code -> stored issues (None: rule did not apply)
+        # for rules that must not be re-run
+        versions, version = self._current_versions()
+        report = {
+            "risk_score": 0,
+            "risk_level": "LOW",
+            "risk_color": "green",
+            "total_checks": 0,
+            "passed_checks": 0,
+            "failed_checks": 0,
+            "flags": [],
+            "flag_codes": [],
+            "details": {},
+            "short_circuited": False,
+            "rule_set_version": version,
+            "rule_versions": dict(versions),
+            "rule_inputs": {},
+            "timings_us": {},
+        }
+        severity_boost = 0
+        remaining = len(self.rules)
+
+        for rule in self.rules:
+            remaining -= 1
+            if reuse is not None and rule.code in reuse:
+                issues = reuse[rule.code]
+                applies = issues is not None
+            else:
+                issues = None
+                applies = rule.applies(form_data, context)
+            if not applies:
+                if rule.show_skipped:
+                    report["details"][rule.name] = {
+                        "valid": True, "issues": [], "codes": [],
+                    }
+                continue
+
+            if issues is None:
+                use_memo = memo is not None and rule.memoize
+                # Keyed by the rule's fingerprint too, so results computed
+                # against reloaded data (e.g. the domain blocklist) expire
+                key = (
+                    (versions[rule.code], rule.input_key(form_data))
+                    if use_memo else None
+                )
+                previous = memo.get(rule.code) if use_memo else None
+                if previous is not None and previous[0] == key:
+                    issues = previous[1]
+                    self._record_cached(rule.code)
+                else:
+                    start = time.perf_counter()
+                    issues = tuple(rule.check(form_data, context))
+                    elapsed = time.perf_counter() - start
+                    self._record(rule.code, bool(issues), elapsed)
+                    report["timings_us"][rule.code] = round(elapsed * 1e6, 1)
+                    if use_memo:
+                        memo[rule.code] = (key, issues)
+
+            report["rule_inputs"][rule.code] = rule.input_digest(form_data)
+            report["details"][rule.name] = {
+                "valid": not issues,
+                "issues": [message for _, message in issues],
+                "codes": [code for code, _ in issues],
+            }
+            report["total_checks"] += 1
+            if not issues:
+                report["passed_checks"] += 1
+                continue
+
+            report["failed_checks"] += 1
+            for code, message in issues:
+                report["flags"].append(message)
+                report["flag_codes"].append(code)
+                severity_boost += rule.severity(code)
+
+            if stop_on_high:
+                lower_bound = (
+                    report["failed_checks"]
+                    / (report["total_checks"] + remaining) * 100
+                    + severity_boost
+                )
+                if lower_bound >= RISK_HIGH_AT and remaining:
+                    report["short_circuited"] = True
+                    break
+
+        if report["total_checks"] > 0:
+            risk_pct = report["failed_checks"] / report["total_checks"] * 100
+        else:
+            risk_pct = 0
+
+        risk_pct = min(100, risk_pct + severity_boost)
+        report["risk_score"] = round(risk_pct, 1)
+        report["risk_level"], report["risk_color"] = risk_band(risk_pct)
+        return report
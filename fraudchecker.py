@@ -1,583 +1,875 @@
-"""
-fraud_checker.py
-Fraud detection scoring + Profile health/completeness score
-"""
-
-import re
-from typing import Dict, List, Any, Tuple
-
-
-# ─── Disposable Email Domains ───────────────────────────────────────────────
-DISPOSABLE_DOMAINS = {
-    'tempmail.com', 'throwaway.email', 'guerrillamail.com',
-    'mailinator.com', 'yopmail.com', 'temp-mail.org',
-    'fakeinbox.com', 'sharklasers.com', 'guerrillamail.info',
-    'grr.la', 'guerrillamail.de', 'tmail.com', 'tempail.com',
-    'dispostable.com', 'trashmail.com', 'trashmail.me',
-    'trashmail.net', 'maildrop.cc', 'mailnesia.com',
-    'mailcatch.com', 'tempr.email', 'discard.email',
-    'tempmailo.com', 'mohmal.com', 'burnermail.io',
-    'temp-mail.io', 'emailondeck.com', 'mintemail.com',
-    'getnada.com', 'jetable.org', 'throwawaymail.com',
-    '10minutemail.com', 'tempinbox.com', 'spambox.us',
-    'mytemp.email', 'binkmail.com', 'safetymail.info',
-}
-
-
-def check_phone_fraud(phone: str) -> Tuple[bool, List[str]]:
-    """
-    Validate phone number.
-    Returns (is_valid, list_of_issues)
-    """
-    issues = []
-
-    if not phone:
-        return True, []  # Empty is not fraud, just incomplete
-
-    # Remove spaces/dashes
-    phone_clean = re.sub(r'[\s\-]', '', phone)
-
-    # Must be 10 digits
-    if len(phone_clean) != 10:
-        issues.append(
-            f"Phone number must be exactly 10 digits (got {len(phone_clean)})"
-        )
-
-    # Must be all digits
-    if not phone_clean.isdigit():
-        issues.append("Phone number contains non-numeric characters")
-        return False, issues
-
-    # Must start with 6-9
-    if phone_clean[0] not in '6789':
-        issues.append(
-            f"Indian phone numbers must start with 6-9 (starts with {phone_clean[0]})"
-        )
-
-    # Not all same digits (e.g., 9999999999)
-    if len(set(phone_clean)) == 1:
-        issues.append("Phone number has all identical digits — likely fake")
-
-    # Not sequential (1234567890 or 9876543210)
-    sequential_asc = ''.join(str(i % 10) for i in range(
-        int(phone_clean[0]), int(phone_clean[0]) + 10
-    ))
-    if phone_clean == sequential_asc:
-        issues.append("Phone number is a sequential pattern — likely fake")
-
-    sequential_desc = ''.join(str(i % 10) for i in range(
-        int(phone_clean[0]), int(phone_clean[0]) - 10, -1
-    ))
-    if phone_clean == sequential_desc:
-        issues.append("Phone number is a reverse sequential pattern — likely fake")
-
-    # Common fake patterns
-    fake_patterns = [
-        '1234567890', '0987654321', '1111111111', '0000000000',
-        '9876543210', '1234512345', '9999999999', '8888888888',
-        '7777777777', '6666666666',
-    ]
-    if phone_clean in fake_patterns:
-        issues.append("Phone number matches a known fake pattern")
-
-    is_valid = len(issues) == 0
-    return is_valid, issues
-
-
-def check_email_fraud(email: str) -> Tuple[bool, List[str]]:
-    """
-    Validate email address.
-    Returns (is_valid, list_of_issues)
-    """
-    issues = []
-
-    if not email:
-        return True, []
-
-    email = email.strip().lower()
-
-    # Basic format check
-    email_pattern = r'^[a-zA-Z0-9._%+\-]+@[a-zA-Z0-9.\-]+\.[a-zA-Z]{2,}$'
-    if not re.match(email_pattern, email):
-        issues.append("Email format is invalid")
-
-    # Check for disposable domain
-    try:
-        domain = email.split('@')[1]
-        if domain in DISPOSABLE_DOMAINS:
-            issues.append(
-                f"Disposable/temporary email domain detected: {domain}"
-            )
-
-        # Check domain has at least one dot
-        if '.' not in domain:
-            issues.append("Email domain is invalid (no TLD)")
-
-        # Check for suspicious patterns in local part
-        local = email.split('@')[0]
-        if len(local) < 2:
-            issues.append("Email local part is too short")
-        if len(local) > 64:
-            issues.append("Email local part is too long")
-
-        # All numbers in local part
-        if local.isdigit() and len(local) > 8:
-            issues.append("Email local part is all numbers — potentially auto-generated")
-
-    except (IndexError, AttributeError):
-        issues.append("Email format is malformed")
-
-    is_valid = len(issues) == 0
-    return is_valid, issues
-
-
-def check_aadhaar_fraud(aadhaar: str) -> Tuple[bool, List[str]]:
-    """
-    Validate Aadhaar number (basic checks).
-    Returns (is_valid, list_of_issues)
-    """
-    issues = []
-
-    if not aadhaar:
-        return True, []
-
-    aadhaar_clean = re.sub(r'\s', '', aadhaar)
-
-    # Must be 12 digits
-    if len(aadhaar_clean) != 12:
-        issues.append(
-            f"Aadhaar must be 12 digits (got {len(aadhaar_clean)})"
-        )
-
-    if not aadhaar_clean.isdigit():
-        issues.append("Aadhaar contains non-numeric characters")
-        return False, issues
-
-    # Cannot start with 0 or 1
-    if aadhaar_clean[0] in '01':
-        issues.append("Aadhaar number cannot start with 0 or 1")
-
-    # Not all same digits
-    if len(set(aadhaar_clean)) == 1:
-        issues.append("Aadhaar has all identical digits — likely fake")
-
-    # Not sequential
-    if aadhaar_clean == '123456789012' or aadhaar_clean == '210987654321':
-        issues.append("Aadhaar is a sequential pattern — likely fake")
-
-    is_valid = len(issues) == 0
-    return is_valid, issues
-
-
-def check_name_fraud(name: str) -> Tuple[bool, List[str]]:
-    """
-    Validate name.
-    Returns (is_valid, list_of_issues)
-    """
-    issues = []
-
-    if not name:
-        return True, []
-
-    name = name.strip()
-
-    # Too short
-    if len(name) < 2:
-        issues.append("Name is too short (less than 2 characters)")
-
-    # Too long
-    if len(name) > 100:
-        issues.append("Name is unusually long (more than 100 characters)")
-
-    # Contains numbers
-    if any(c.isdigit() for c in name):
-        issues.append("Name contains numbers — likely invalid")
-
-    # Contains special characters (except spaces, dots, hyphens, apostrophes)
-    if re.search(r'[^a-zA-Z\s.\-\'\u0C00-\u0C7F\u0900-\u097F]', name):
-        issues.append("Name contains unusual special characters")
-
-    # All same character
-    if len(set(name.replace(' ', ''))) <= 1:
-        issues.append("Name has all identical characters — likely fake")
-
-    # Common test names
-    test_names = [
-        'test', 'testing', 'asdf', 'qwerty', 'abc', 'xyz',
-        'name', 'your name', 'full name', 'n/a', 'na', 'none',
-        'null', 'undefined', 'admin', 'user',
-    ]
-    if name.lower() in test_names:
-        issues.append(f"Name '{name}' appears to be a test/placeholder value")
-
-    is_valid = len(issues) == 0
-    return is_valid, issues
-
-
-def check_skills_fraud(skills: list) -> Tuple[bool, List[str]]:
-    """Check skills for spam patterns."""
-    issues = []
-
-    if not skills:
-        return True, []
-
-    if len(skills) > 50:
-        issues.append(
-            f"Too many skills listed ({len(skills)}) — possible spam"
-        )
-
-    # Check for duplicate skills
-    seen = set()
-    dupes = []
-    for s in skills:
-        s_lower = s.lower().strip()
-        if s_lower in seen:
-            dupes.append(s)
-        seen.add(s_lower)
-    if dupes:
-        issues.append(f"Duplicate skills found: {', '.join(dupes)}")
-
-    is_valid = len(issues) == 0
-    return is_valid, issues
-
-
-def check_experience_fraud(years: int, months: int = 0) -> Tuple[bool, List[str]]:
-    """Check experience for unrealistic values."""
-    issues = []
-
-    total = years + months / 12.0
-
-    if total > 50:
-        issues.append(
-            f"Experience of {years}y {months}m ({total:.1f} years) is unrealistic"
-        )
-
-    if total > 40:
-        issues.append(
-            f"Experience of {total:.1f} years is unusually high — please verify"
-        )
-
-    is_valid = len(issues) == 0
-    return is_valid, issues
-
-
-def run_fraud_check(form_data: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Run all fraud checks on the form data.
-    Returns comprehensive fraud report with risk score.
-    """
-    report = {
-        "risk_score": 0,
-        "risk_level": "LOW",
-        "risk_color": "green",
-        "total_checks": 0,
-        "passed_checks": 0,
-        "failed_checks": 0,
-        "flags": [],
-        "details": {},
-    }
-
-    all_issues = []
-
-    # 1. Phone check
-    phone_valid, phone_issues = check_phone_fraud(
-        form_data.get("phone", "")
-    )
-    report["details"]["phone"] = {
-        "valid": phone_valid,
-        "issues": phone_issues
-    }
-    if form_data.get("phone"):
-        report["total_checks"] += 1
-        if phone_valid:
-            report["passed_checks"] += 1
-        else:
-            report["failed_checks"] += 1
-            all_issues.extend(phone_issues)
-
-    # 2. Email check
-    email_valid, email_issues = check_email_fraud(
-        form_data.get("email", "")
-    )
-    report["details"]["email"] = {
-        "valid": email_valid,
-        "issues": email_issues
-    }
-    if form_data.get("email"):
-        report["total_checks"] += 1
-        if email_valid:
-            report["passed_checks"] += 1
-        else:
-            report["failed_checks"] += 1
-            all_issues.extend(email_issues)
-
-    # 3. Aadhaar check
-    aadhaar_valid, aadhaar_issues = check_aadhaar_fraud(
-        form_data.get("aadhaar", "")
-    )
-    report["details"]["aadhaar"] = {
-        "valid": aadhaar_valid,
-        "issues": aadhaar_issues
-    }
-    if form_data.get("aadhaar"):
-        report["total_checks"] += 1
-        if aadhaar_valid:
-            report["passed_checks"] += 1
-        else:
-            report["failed_checks"] += 1
-            all_issues.extend(aadhaar_issues)
-
-    # 4. Name check
-    name_valid, name_issues = check_name_fraud(
-        form_data.get("name", "")
-    )
-    report["details"]["name"] = {
-        "valid": name_valid,
-        "issues": name_issues
-    }
-    if form_data.get("name"):
-        report["total_checks"] += 1
-        if name_valid:
-            report["passed_checks"] += 1
-        else:
-            report["failed_checks"] += 1
-            all_issues.extend(name_issues)
-
-    # 5. Skills check
-    skills_valid, skills_issues = check_skills_fraud(
-        form_data.get("skills", [])
-    )
-    report["details"]["skills"] = {
-        "valid": skills_valid,
-        "issues": skills_issues
-    }
-    if form_data.get("skills"):
-        report["total_checks"] += 1
-        if skills_valid:
-            report["passed_checks"] += 1
-        else:
-            report["failed_checks"] += 1
-            all_issues.extend(skills_issues)
-
-    # 6. Experience check
-    exp_years = form_data.get("experience_years", 0)
-    exp_months = form_data.get("experience_months", 0)
-    exp_valid, exp_issues = check_experience_fraud(exp_years, exp_months)
-    report["details"]["experience"] = {
-        "valid": exp_valid,
-        "issues": exp_issues
-    }
-    report["total_checks"] += 1
-    if exp_valid:
-        report["passed_checks"] += 1
-    else:
-        report["failed_checks"] += 1
-        all_issues.extend(exp_issues)
-
-    report["flags"] = all_issues
-
-    # Calculate risk score
-    if report["total_checks"] > 0:
-        risk_pct = (report["failed_checks"] / report["total_checks"]) * 100
-    else:
-        risk_pct = 0
-
-    # Add weight for severity
-    severity_boost = 0
-    for issue in all_issues:
-        if 'fake' in issue.lower() or 'spam' in issue.lower():
-            severity_boost += 10
-        elif 'disposable' in issue.lower():
-            severity_boost += 15
-        elif 'test' in issue.lower() or 'placeholder' in issue.lower():
-            severity_boost += 10
-
-    risk_pct = min(100, risk_pct + severity_boost)
-    report["risk_score"] = round(risk_pct, 1)
-
-    if risk_pct < 30:
-        report["risk_level"] = "LOW"
-        report["risk_color"] = "green"
-    elif risk_pct < 60:
-        report["risk_level"] = "MEDIUM"
-        report["risk_color"] = "orange"
-    else:
-        report["risk_level"] = "HIGH"
-        report["risk_color"] = "red"
-
-    return report
-
-
-def calculate_health_score(form_data: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Calculate profile completeness / health score.
-    Returns score 0-100 with breakdown and tips.
-    """
-    score = 0
-    max_score = 100
-    breakdown = []
-    tips = []
-
-    # Name: +5
-    if form_data.get("name") and len(str(form_data["name"]).strip()) > 1:
-        score += 5
-        breakdown.append(("✅ Full Name", 5))
-    else:
-        breakdown.append(("❌ Full Name", 0))
-        tips.append("Add your full name to improve your profile")
-
-    # Phone: +5
-    if form_data.get("phone") and len(str(form_data["phone"]).strip()) >= 10:
-        score += 5
-        breakdown.append(("✅ Phone Number", 5))
-    else:
-        breakdown.append(("❌ Phone Number", 0))
-        tips.append("Add a valid 10-digit phone number")
-
-    # Email: +5
-    if form_data.get("email") and '@' in str(form_data["email"]):
-        score += 5
-        breakdown.append(("✅ Email Address", 5))
-    else:
-        breakdown.append(("❌ Email Address", 0))
-        tips.append("Add your email address")
-
-    # Profile Image: +5
-    if form_data.get("profile_image"):
-        score += 5
-        breakdown.append(("✅ Profile Image", 5))
-    else:
-        breakdown.append(("❌ Profile Image", 0))
-        tips.append("Upload a profile photo to stand out")
-
-    # Education: +10
-    if form_data.get("education") and form_data["education"] != "":
-        score += 10
-        breakdown.append(("✅ Education Qualification", 10))
-    else:
-        breakdown.append(("❌ Education Qualification", 0))
-        tips.append("Select your highest education qualification")
-
-    # Institution: +5
-    if form_data.get("institution_name") and len(
-        str(form_data["institution_name"]).strip()
-    ) > 2:
-        score += 5
-        breakdown.append(("✅ Institution Details", 5))
-    else:
-        breakdown.append(("❌ Institution Details", 0))
-        tips.append("Add your institution/college name")
-
-    # Year: +5
-    if form_data.get("year_passed"):
-        score += 5
-        breakdown.append(("✅ Year of Passing", 5))
-    else:
-        breakdown.append(("❌ Year of Passing", 0))
-        tips.append("Select your year of passing")
-
-    # Skills (5+): +15
-    skills = form_data.get("skills", [])
-    if len(skills) >= 5:
-        score += 15
-        breakdown.append(("✅ Skills (5+ added)", 15))
-    elif len(skills) > 0:
-        partial = int(15 * len(skills) / 5)
-        score += partial
-        breakdown.append((f"⚠️ Skills ({len(skills)}/5 minimum)", partial))
-        tips.append(f"Add {5 - len(skills)} more skills (minimum 5 required)")
-    else:
-        breakdown.append(("❌ Skills (none added)", 0))
-        tips.append("Add at least 5 skills — this is required")
-
-    # Job Preferences: +10
-    has_location = bool(form_data.get("preferred_locations"))
-    has_functions = bool(form_data.get("job_functions"))
-    if has_location and has_functions:
-        score += 10
-        breakdown.append(("✅ Job Preferences", 10))
-    elif has_location or has_functions:
-        score += 5
-        breakdown.append(("⚠️ Job Preferences (partial)", 5))
-        if not has_location:
-            tips.append("Select your preferred job locations")
-        if not has_functions:
-            tips.append("Select interested job functions")
-    else:
-        breakdown.append(("❌ Job Preferences", 0))
-        tips.append("Add job location and function preferences")
-
-    # Experience: +10
-    if (
-        form_data.get("experience_years", 0) > 0
-        or form_data.get("is_fresher", False)
-        or form_data.get("experience_entries")
-    ):
-        score += 10
-        breakdown.append(("✅ Experience Details", 10))
-    else:
-        breakdown.append(("❌ Experience Details", 0))
-        tips.append("Add your experience details or mark as fresher")
-
-    # Address/Location: +5
-    if form_data.get("preferred_locations"):
-        score += 5
-        breakdown.append(("✅ Location/Address", 5))
-    else:
-        breakdown.append(("❌ Location/Address", 0))
-        tips.append("Select at least one preferred location")
-
-    # Resume uploaded: +10
-    if form_data.get("resume_uploaded"):
-        score += 10
-        breakdown.append(("✅ Resume Uploaded", 10))
-    else:
-        breakdown.append(("❌ Resume Uploaded", 0))
-        tips.append("Upload your resume PDF for better visibility")
-
-    # Documents: +10
-    doc_count = 0
-    if form_data.get("identity_card"):
-        doc_count += 1
-    for i in range(1, 4):
-        if form_data.get(f"certificate_{i}"):
-            doc_count += 1
-    if doc_count > 0:
-        doc_score = min(10, doc_count * 3)
-        score += doc_score
-        breakdown.append((f"✅ Documents ({doc_count} uploaded)", doc_score))
-    else:
-        breakdown.append(("❌ Documents (none uploaded)", 0))
-        tips.append("Upload identity card and certificates for verification")
-
-    # Clamp
-    score = min(score, max_score)
-
-    # Determine grade
-    if score >= 90:
-        grade = "Excellent"
-        grade_color = "green"
-        grade_emoji = "🌟"
-    elif score >= 70:
-        grade = "Good"
-        grade_color = "blue"
-        grade_emoji = "👍"
-    elif score >= 50:
-        grade = "Average"
-        grade_color = "orange"
-        grade_emoji = "⚠️"
-    else:
-        grade = "Needs Improvement"
-        grade_color = "red"
-        grade_emoji = "❗"
-
-    return {
-        "score": score,
-        "max_score": max_score,
-        "percentage": score,
-        "breakdown": breakdown,
-        "tips": tips,
-        "grade": grade,
-        "grade_color": grade_color,
-        "grade_emoji": grade_emoji,
-    }
+"""
+fraud_checker.py
+Fraud detection scoring + Profile health/completeness score
+"""
+
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
+
+from domain_blocklist import DomainBlocklist
+from duplicate_index import INDEXED_FIELDS
+from image_hash import DOCUMENT_LABELS
+from fraud_rules import (
+    COST_EXPENSIVE, COST_MODERATE, FraudRule, Issue, RuleSet, freeze,
+)
+from population_stats import (
+    MIN_WORKING_AGE, age_from_dob, describe_deviation,
+)
+from phone_plan import PHONE_INDEX, REASON_IDENTICAL
+from velocity import KEY_LABELS
+from verhoeff import verhoeff_validate
+
+
+# ─── Disposable Email Domains ───────────────────────────────────────────────
+DISPOSABLE_DOMAINS = {
+    'tempmail.com', 'throwaway.email', 'guerrillamail.com',
+    'mailinator.com', 'yopmail.com', 'temp-mail.org',
+    'fakeinbox.com', 'sharklasers.com', 'guerrillamail.info',
+    'grr.la', 'guerrillamail.de', 'tmail.com', 'tempail.com',
+    'dispostable.com', 'trashmail.com', 'trashmail.me',
+    'trashmail.net', 'maildrop.cc', 'mailnesia.com',
+    'mailcatch.com', 'tempr.email', 'discard.email',
+    'tempmailo.com', 'mohmal.com', 'burnermail.io',
+    'temp-mail.io', 'emailondeck.com', 'mintemail.com',
+    'getnada.com', 'jetable.org', 'throwawaymail.com',
+    '10minutemail.com', 'tempinbox.com', 'spambox.us',
+    'mytemp.email', 'binkmail.com', 'safetymail.info',
+}
+
+# Built-in domains plus an optional public blocklist file (one domain per
+# line), reloaded automatically when the file changes. Subdomains of a
+# listed domain are blocked too.
+DISPOSABLE_BLOCKLIST = DomainBlocklist(
+    DISPOSABLE_DOMAINS,
+    path=os.environ.get("DEET_DISPOSABLE_DOMAINS_FILE"),
+)
+
+# Field checkers are memoized on their input value: Streamlit reruns the
+# whole script on every widget change, mostly with unchanged values.
+FIELD_CACHE_SIZE = 4096
+
+
+def _issue_messages(issues: Tuple[Issue, ...]) -> Tuple[bool, List[str]]:
+    """(is_valid, messages) view of a list of (code, message) issues."""
+    return len(issues) == 0, [message for _, message in issues]
+
+
+@lru_cache(maxsize=FIELD_CACHE_SIZE)
+def phone_issues(phone: str) -> Tuple[Issue, ...]:
+    """Coded issues for a phone number."""
+    issues = []
+
+    if not phone:
+        return ()  # Empty is not fraud, just incomplete
+
+    # Remove spaces/dashes
+    phone_clean = re.sub(r'[\s\-]', '', phone)
+
+    # Must be 10 digits
+    if len(phone_clean) != 10:
+        issues.append((
+            "PHONE_LENGTH",
+            f"Phone number must be exactly 10 digits (got {len(phone_clean)})",
+        ))
+
+    # Must be all digits
+    if not phone_clean.isdigit():
+        issues.append((
+            "PHONE_NON_NUMERIC",
+            "Phone number contains non-numeric characters",
+        ))
+        return tuple(issues)
+
+    # Must start with 6-9
+    if phone_clean[0] not in '6789':
+        issues.append((
+            "PHONE_PREFIX",
+            f"Indian phone numbers must start with 6-9 (starts with {phone_clean[0]})",
+        ))
+
+    # Repeating, sequential and known fake numbers (one table probe)
+    if len(phone_clean) == 10:
+        phone_info = PHONE_INDEX.lookup(phone_clean)
+        issues.extend(phone_info["fake_issues"])
+        if phone_info["allocated"] is False and phone_clean[0] in '6789':
+            issues.append((
+                "PHONE_UNALLOCATED_SERIES",
+                f"Phone number series {phone_clean[:5]} is not an allocated "
+                f"mobile series",
+            ))
+    elif len(set(phone_clean)) == 1:
+        issues.append(("PHONE_IDENTICAL", REASON_IDENTICAL))
+
+    return tuple(issues)
+
+
+def check_phone_fraud(phone: str) -> Tuple[bool, List[str]]:
+    """
+    Validate phone number.
+    Returns (is_valid, list_of_issues)
+    """
+    return _issue_messages(phone_issues(phone))
+
+
+def email_issues(email: str, from_resume: bool = False) -> Tuple[Issue, ...]:
+    """Coded issues for an email address (from_resume adds the stricter
+    checks applied to addresses parsed out of a resume)."""
+    # Keyed on the blocklist generation so a reloaded list takes effect
+    DISPOSABLE_BLOCKLIST.check_for_changes()
+    return _email_issues(email, DISPOSABLE_BLOCKLIST.generation, from_resume)
+
+
+@lru_cache(maxsize=FIELD_CACHE_SIZE)
+def _email_issues(
+    email: str, blocklist_generation: int, from_resume: bool
+) -> Tuple[Issue, ...]:
+    issues = []
+
+    if not email:
+        return ()
+
+    email = email.strip().lower()
+
+    # Basic format check
+    email_pattern = r'^[a-zA-Z0-9._%+\-]+@[a-zA-Z0-9.\-]+\.[a-zA-Z]{2,}$'
+    if not re.match(email_pattern, email) or (from_resume and '..' in email):
+        issues.append(("EMAIL_FORMAT", "Email format is invalid"))
+
+    # Check for disposable domain
+    try:
+        domain = email.split('@')[1]
+        if domain in DISPOSABLE_BLOCKLIST:
+            issues.append((
+                "EMAIL_DISPOSABLE",
+                f"Disposable/temporary email domain detected: {domain}",
+            ))
+
+        # Check domain has at least one dot
+        if '.' not in domain:
+            issues.append(("EMAIL_NO_TLD", "Email domain is invalid (no TLD)"))
+
+        # Check for suspicious patterns in local part
+        local = email.split('@')[0]
+        if len(local) < 2:
+            issues.append(("EMAIL_LOCAL_SHORT", "Email local part is too short"))
+        if len(local) > 64:
+            issues.append(("EMAIL_LOCAL_LONG", "Email local part is too long"))
+
+        # All numbers in local part
+        if local.isdigit() and len(local) > 8:
+            issues.append((
+                "EMAIL_NUMERIC_LOCAL",
+                "Email local part is all numbers — potentially auto-generated",
+            ))
+
+    except (IndexError, AttributeError):
+        issues.append(("EMAIL_MALFORMED", "Email format is malformed"))
+
+    return tuple(issues)
+
+
+def contact_list_issues(
+    phones: Optional[List[str]], emails: Optional[List[str]]
+) -> Tuple[Issue, ...]:
+    """Phone and email issues for extra contacts, naming each value."""
+    issues = []
+    for phone in phones or ():
+        issues.extend(
+            (code, f"{message}: {phone}")
+            for code, message in phone_issues(phone)
+        )
+    for email in emails or ():
+        issues.extend(
+            (code, f"{message}: {email}")
+            for code, message in email_issues(email, from_resume=True)
+        )
+    return tuple(issues)
+
+
+def check_email_fraud(email: str) -> Tuple[bool, List[str]]:
+    """
+    Validate email address.
+    Returns (is_valid, list_of_issues)
+    """
+    return _issue_messages(email_issues(email))
+
+
+@lru_cache(maxsize=FIELD_CACHE_SIZE)
+def aadhaar_issues(aadhaar: str) -> Tuple[Issue, ...]:
+    """Coded issues for an Aadhaar number (basic checks)."""
+    issues = []
+
+    if not aadhaar:
+        return ()
+
+    aadhaar_clean = re.sub(r'\s', '', aadhaar)
+
+    # Must be 12 digits
+    if len(aadhaar_clean) != 12:
+        issues.append((
+            "AADHAAR_LENGTH",
+            f"Aadhaar must be 12 digits (got {len(aadhaar_clean)})",
+        ))
+
+    if not aadhaar_clean.isdigit():
+        issues.append((
+            "AADHAAR_NON_NUMERIC",
+            "Aadhaar contains non-numeric characters",
+        ))
+        return tuple(issues)
+
+    # Cannot start with 0 or 1
+    if aadhaar_clean[0] in '01':
+        issues.append((
+            "AADHAAR_PREFIX", "Aadhaar number cannot start with 0 or 1"
+        ))
+
+    # Not all same digits
+    if len(set(aadhaar_clean)) == 1:
+        issues.append((
+            "AADHAAR_IDENTICAL",
+            "Aadhaar has all identical digits — likely fake",
+        ))
+
+    # Not sequential
+    if aadhaar_clean == '123456789012' or aadhaar_clean == '210987654321':
+        issues.append((
+            "AADHAAR_SEQUENTIAL",
+            "Aadhaar is a sequential pattern — likely fake",
+        ))
+
+    # Last digit is a Verhoeff check digit
+    if len(aadhaar_clean) == 12 and not verhoeff_validate(aadhaar_clean):
+        issues.append((
+            "AADHAAR_CHECKSUM",
+            "Aadhaar check digit is invalid (Verhoeff checksum failed)",
+        ))
+
+    return tuple(issues)
+
+
+def check_aadhaar_fraud(aadhaar: str) -> Tuple[bool, List[str]]:
+    """
+    Validate Aadhaar number (basic checks).
+    Returns (is_valid, list_of_issues)
+    """
+    return _issue_messages(aadhaar_issues(aadhaar))
+
+
+TEST_NAMES = {
+    'test', 'testing', 'asdf', 'qwerty', 'abc', 'xyz',
+    'name', 'your name', 'full name', 'n/a', 'na', 'none',
+    'null', 'undefined', 'admin', 'user',
+}
+
+
+@lru_cache(maxsize=FIELD_CACHE_SIZE)
+def name_issues(name: str) -> Tuple[Issue, ...]:
+    """Coded issues for a name."""
+    issues = []
+
+    if not name:
+        return ()
+
+    name = name.strip()
+
+    # Too short
+    if len(name) < 2:
+        issues.append((
+            "NAME_TOO_SHORT", "Name is too short (less than 2 characters)"
+        ))
+
+    # Too long
+    if len(name) > 100:
+        issues.append((
+            "NAME_TOO_LONG",
+            "Name is unusually long (more than 100 characters)",
+        ))
+
+    # Contains numbers
+    if any(c.isdigit() for c in name):
+        issues.append(("NAME_DIGITS", "Name contains numbers — likely invalid"))
+
+    # Contains special characters (except spaces, dots, hyphens, apostrophes)
+    if re.search(r'[^a-zA-Z\s.\-\'\u0C00-\u0C7F\u0900-\u097F]', name):
+        issues.append((
+            "NAME_SPECIAL_CHARS", "Name contains unusual special characters"
+        ))
+
+    # All same character
+    if len(set(name.replace(' ', ''))) <= 1:
+        issues.append((
+            "NAME_IDENTICAL",
+            "Name has all identical characters — likely fake",
+        ))
+
+    # Common test names
+    if name.lower() in TEST_NAMES:
+        issues.append((
+            "NAME_PLACEHOLDER",
+            f"Name '{name}' appears to be a test/placeholder value",
+        ))
+
+    return tuple(issues)
+
+
+def check_name_fraud(name: str) -> Tuple[bool, List[str]]:
+    """
+    Validate name.
+    Returns (is_valid, list_of_issues)
+    """
+    return _issue_messages(name_issues(name))
+
+
+def skills_issues(
+    skills: list, has_name: Optional[bool] = None
+) -> Tuple[Issue, ...]:
+    """Coded issues for a skills list (spam patterns). has_name is given
+    only for resumes, where a long skill list with no name is flagged."""
+    return _skills_issues(tuple(skills or ()), has_name)
+
+
+@lru_cache(maxsize=FIELD_CACHE_SIZE)
+def _skills_issues(
+    skills: Tuple[str, ...], has_name: Optional[bool]
+) -> Tuple[Issue, ...]:
+    issues = []
+
+    if not skills:
+        return ()
+
+    if len(skills) > 50:
+        issues.append((
+            "SKILLS_TOO_MANY",
+            f"Too many skills listed ({len(skills)}) — possible spam",
+        ))
+
+    if has_name is False and len(skills) > 10:
+        issues.append((
+            "SKILLS_WITHOUT_NAME",
+            f"No name given but {len(skills)} skills listed",
+        ))
+
+    # Check for duplicate skills
+    seen = set()
+    dupes = []
+    for s in skills:
+        s_lower = s.lower().strip()
+        if s_lower in seen:
+            dupes.append(s)
+        seen.add(s_lower)
+    if dupes:
+        issues.append((
+            "SKILLS_DUPLICATE", f"Duplicate skills found: {', '.join(dupes)}"
+        ))
+
+    return tuple(issues)
+
+
+def check_skills_fraud(skills: list) -> Tuple[bool, List[str]]:
+    """Check skills for spam patterns."""
+    return _issue_messages(skills_issues(skills))
+
+
+@lru_cache(maxsize=FIELD_CACHE_SIZE)
+def experience_issues(
+    years: int, months: int = 0, age: Optional[int] = None
+) -> Tuple[Issue, ...]:
+    """Coded issues for unrealistic experience values (and age, if known)."""
+    issues = []
+
+    total = years + months / 12.0
+
+    if total > 50:
+        issues.append((
+            "EXPERIENCE_UNREALISTIC",
+            f"Experience of {years}y {months}m ({total:.1f} years) is unrealistic",
+        ))
+
+    if total > 40:
+        issues.append((
+            "EXPERIENCE_HIGH",
+            f"Experience of {total:.1f} years is unusually high — please verify",
+        ))
+
+    if age is not None and total > max(0, age - MIN_WORKING_AGE):
+        issues.append((
+            "EXPERIENCE_EXCEEDS_AGE",
+            f"Experience of {total:.1f} years is impossible at age {age}",
+        ))
+
+    return tuple(issues)
+
+
+def check_experience_fraud(
+    years: int, months: int = 0, age: Optional[int] = None
+) -> Tuple[bool, List[str]]:
+    """Check experience for unrealistic values."""
+    return _issue_messages(experience_issues(years, months, age))
+
+
+def duplicate_issues(
+    form_data: Dict[str, Any], duplicate_index
+) -> Tuple[Issue, ...]:
+    """Coded issues for identifiers already held by other registrations."""
+    if duplicate_index is None:
+        return ()
+
+    hits = duplicate_index.lookup_many(form_data)
+    return tuple(
+        (
+            f"DUPLICATE_{field.upper()}",
+            f"{INDEXED_FIELDS[field]} already registered under {reg_id}",
+        )
+        for field, reg_id in hits.items()
+    )
+
+
+def check_duplicate_registration(
+    form_data: Dict[str, Any], duplicate_index
+) -> Tuple[bool, List[str]]:
+    """Check phone/email/Aadhaar against earlier registrations."""
+    return _issue_messages(duplicate_issues(form_data, duplicate_index))
+
+
+def velocity_issues(keys: Dict[str, Any], velocity_limiter) -> Tuple[Issue, ...]:
+    """Coded issues for identifiers registering faster than allowed."""
+    if velocity_limiter is None:
+        return ()
+
+    minutes = velocity_limiter.window_seconds // 60
+    issues = []
+    for hit in velocity_limiter.exceeded(keys):
+        label = KEY_LABELS.get(hit["kind"], hit["kind"])
+        issues.append((
+            f"VELOCITY_{hit['kind'].upper()}",
+            f"{hit['count']} registrations from {label} in the last "
+            f"{minutes} minutes (limit {hit['limit']})",
+        ))
+    return tuple(issues)
+
+
+def document_issues(
+    document_hashes: Dict[str, str], image_index
+) -> Tuple[Issue, ...]:
+    """Coded issues for uploads that closely match earlier registrations."""
+    if image_index is None:
+        return ()
+
+    issues = []
+    for kind, hash_hex in (document_hashes or {}).items():
+        if not hash_hex:
+            continue
+        matches = image_index.query(hash_hex, limit=1)
+        if matches:
+            match = matches[0]
+            issues.append((
+                "DOCUMENT_REUSED",
+                f"{DOCUMENT_LABELS.get(kind, kind)} closely matches a document "
+                f"uploaded for {match['registration_id']} "
+                f"(distance {match['distance']}/64)",
+            ))
+    return tuple(issues)
+
+
+def population_issues(
+    form_data: Dict[str, Any], population_stats
+) -> Tuple[Issue, ...]:
+    """Coded issues for registrations far outside their cohort's norms."""
+    if population_stats is None:
+        return ()
+    return tuple(
+        describe_deviation(hit)
+        for hit in population_stats.deviations(form_data)
+    )
+
+
+def _velocity_keys(form_data: Dict[str, Any], context: Dict[str, Any]):
+    keys = {"phone": form_data.get("phone"), "email": form_data.get("email")}
+    keys.update(context.get("device_keys") or {})
+    return keys
+
+
+# ─── Rule Registry ──────────────────────────────────────────────────────────
+# Rules are compiled once into a cost-ordered RuleSet. Issue codes not listed
+# in a rule's weights carry no severity boost beyond the failed check itself.
+# Bump a rule's version= when its check logic or thresholds change so that
+# rescore.py re-evaluates stored reports for it.
+
+FRAUD_RULES = RuleSet([
+    FraudRule(
+        "phone", "PHONE", ("phone",),
+        lambda fd, ctx: phone_issues(fd.get("phone", "")),
+        weights={
+            "PHONE_IDENTICAL": 10, "PHONE_SEQUENTIAL": 10,
+            "PHONE_REVERSE_SEQUENTIAL": 10, "PHONE_KNOWN_FAKE": 10,
+        },
+        data_version=lambda: PHONE_INDEX.digest,
+    ),
+    FraudRule(
+        "email", "EMAIL", ("email", "from_resume"),
+        lambda fd, ctx: email_issues(
+            fd.get("email", ""), bool(fd.get("from_resume"))
+        ),
+        weights={"EMAIL_DISPOSABLE": 15},
+        applies=lambda fd, ctx: bool(fd.get("email")),
+        version="2",
+        data_version=lambda: DISPOSABLE_BLOCKLIST.digest,
+    ),
+    FraudRule(
+        # Phones/emails beyond the first, e.g. every contact in a resume
+        "contacts", "CONTACTS", ("other_phones", "other_emails"),
+        lambda fd, ctx: contact_list_issues(
+            fd.get("other_phones"), fd.get("other_emails")
+        ),
+        weights={
+            "PHONE_IDENTICAL": 10, "PHONE_SEQUENTIAL": 10,
+            "PHONE_REVERSE_SEQUENTIAL": 10, "PHONE_KNOWN_FAKE": 10,
+            "EMAIL_DISPOSABLE": 15,
+        },
+        show_skipped=False,
+        data_version=lambda: (
+            f"{PHONE_INDEX.digest}.{DISPOSABLE_BLOCKLIST.digest}"
+        ),
+    ),
+    FraudRule(
+        "aadhaar", "AADHAAR", ("aadhaar",),
+        lambda fd, ctx: aadhaar_issues(fd.get("aadhaar", "")),
+        weights={"AADHAAR_IDENTICAL": 10, "AADHAAR_SEQUENTIAL": 10},
+    ),
+    FraudRule(
+        "name", "NAME", ("name",),
+        lambda fd, ctx: name_issues(fd.get("name", "")),
+        weights={"NAME_IDENTICAL": 10, "NAME_PLACEHOLDER": 10},
+    ),
+    FraudRule(
+        # Name only matters for resumes (a form is scored while being typed)
+        "skills", "SKILLS", ("skills", "name", "from_resume"),
+        lambda fd, ctx: skills_issues(
+            fd.get("skills", []),
+            bool(fd.get("name")) if fd.get("from_resume") else None,
+        ),
+        weights={"SKILLS_TOO_MANY": 10},
+        applies=lambda fd, ctx: bool(fd.get("skills")),
+        version="2",
+    ),
+    FraudRule(
+        "experience", "EXPERIENCE",
+        ("experience_years", "experience_months", "dob"),
+        lambda fd, ctx: experience_issues(
+            fd.get("experience_years", 0), fd.get("experience_months", 0),
+            age_from_dob(fd.get("dob")),
+        ),
+        weights={"EXPERIENCE_EXCEEDS_AGE": 15},
+        applies=lambda fd, ctx: True,
+    ),
+    FraudRule(
+        "duplicate", "DUPLICATE", tuple(INDEXED_FIELDS),
+        lambda fd, ctx: duplicate_issues(fd, ctx.get("duplicate_index")),
+        weight=25,
+        cost=COST_EXPENSIVE,
+        requires=("duplicate_index",),
+        applies=lambda fd, ctx: (
+            ctx.get("duplicate_index") is not None
+            and any(fd.get(f) for f in INDEXED_FIELDS)
+        ),
+        show_skipped=False,
+    ),
+    FraudRule(
+        "documents", "DOCUMENT", ("document_hashes",),
+        lambda fd, ctx: document_issues(
+            fd.get("document_hashes"), ctx.get("image_index")
+        ),
+        weight=25,
+        cost=COST_EXPENSIVE,
+        requires=("image_index",),
+        applies=lambda fd, ctx: (
+            ctx.get("image_index") is not None
+            and bool(fd.get("document_hashes"))
+        ),
+        show_skipped=False,
+    ),
+    FraudRule(
+        "population", "POPULATION",
+        ("dob", "experience_years", "experience_months", "education",
+         "skills", "preferred_locations"),
+        lambda fd, ctx: population_issues(fd, ctx.get("population_stats")),
+        weight=10,
+        cost=COST_MODERATE,
+        requires=("population_stats",),
+        applies=lambda fd, ctx: ctx.get("population_stats") is not None,
+        show_skipped=False,
+        memoize=False,
+    ),
+    FraudRule(
+        "velocity", "VELOCITY", ("phone", "email"),
+        lambda fd, ctx: velocity_issues(
+            _velocity_keys(fd, ctx), ctx.get("velocity_limiter")
+        ),
+        weight=20,
+        cost=COST_MODERATE,
+        requires=("velocity_limiter",),
+        applies=lambda fd, ctx: ctx.get("velocity_limiter") is not None,
+        show_skipped=False,
+        memoize=False,
+    ),
+])
+
+
+def run_fraud_check(
+    form_data: Dict[str, Any],
+    duplicate_index=None,
+    stop_on_high: bool = False,
+    memo: Dict[str, Any] = None,
+    velocity_limiter=None,
+    device_keys: Dict[str, Any] = None,
+    image_index=None,
+    population_stats=None,
+    model=None,
+    extraction: Dict[str, Any] = None,
+) -> Dict[str, Any]:
+    """
+    Run all fraud checks on the form data.
+    Pass a DuplicateIndex to also check for earlier registrations, and
+    stop_on_high=True to skip the remaining (costlier) rules once the risk
+    is certain to be HIGH. Pass the same memo dict on every rerun to only
+    re-evaluate rules whose fields changed. Pass a VelocityLimiter (and
+    optional {"session": ..., "device": ...} device_keys) to flag
+    registrations arriving too fast from the same phone/email/device.
+    Pass an ImageHashIndex to flag uploaded ID cards/certificates that are
+    near-copies of documents from other registrations. Pass PopulationStats
+    to flag values far outside the registrant's cohort (age band, education,
+    district). Pass a fraud_model.FraudModel (and the resume extraction
+    result, if any) to add its fraud probability as report["model_score"]
+    alongside the rule-based risk score.
+    Returns comprehensive fraud report with risk score.
+    """
+    context = {
+        "duplicate_index": duplicate_index,
+        "velocity_limiter": velocity_limiter,
+        "device_keys": device_keys,
+        "image_index": image_index,
+        "population_stats": population_stats,
+    }
+    report = FRAUD_RULES.evaluate(
+        form_data, context, stop_on_high=stop_on_high, memo=memo
+    )
+    if model is not None:
+        report["model_score"] = round(
+            model.score(form_data, report, extraction) * 100, 1
+        )
+    return report
+
+
+def fraud_rule_stats() -> Dict[str, Dict[str, float]]:
+    """Per-rule evaluation/hit counts and timings since start (or reset)."""
+    return FRAUD_RULES.stats()
+
+
+def clear_field_caches():
+    """Drop all memoized field-checker and health-score results."""
+    for fn in (
+        phone_issues, _email_issues, aadhaar_issues, name_issues,
+        _skills_issues, experience_issues, _health_score_cached,
+    ):
+        fn.cache_clear()
+
+
+# Fields read by calculate_health_score (its memo key)
+HEALTH_FIELDS = (
+    "name", "phone", "email", "profile_image", "education",
+    "institution_name", "year_passed", "skills", "preferred_locations",
+    "job_functions", "experience_years", "is_fresher", "experience_entries",
+    "resume_uploaded", "identity_card", "certificate_1", "certificate_2",
+    "certificate_3",
+)
+
+
+def calculate_health_score(form_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Calculate profile completeness / health score.
+    Returns score 0-100 with breakdown and tips.
+    Memoized on the values of HEALTH_FIELDS.
+    """
+    key = tuple(
+        (f, freeze(form_data[f])) for f in HEALTH_FIELDS if f in form_data
+    )
+    result = _health_score_cached(key)
+    return {
+        **result,
+        "breakdown": list(result["breakdown"]),
+        "tips": list(result["tips"]),
+    }
+
+
+@lru_cache(maxsize=FIELD_CACHE_SIZE)
+def _health_score_cached(key: Tuple[Tuple[str, Any], ...]) -> Dict[str, Any]:
+    return _calculate_health_score(dict(key))
+
+
+def health_grade(score: int) -> Tuple[str, str, str]:
+    """(grade, grade_color, grade_emoji) for a 0-100 health score."""
+    if score >= 90:
+        return "Excellent", "green", "🌟"
+    if score >= 70:
+        return "Good", "blue", "👍"
+    if score >= 50:
+        return "Average", "orange", "⚠️"
+    return "Needs Improvement", "red", "❗"
+
+
+def _calculate_health_score(form_data: Dict[str, Any]) -> Dict[str, Any]:
+    score = 0
+    max_score = 100
+    breakdown = []
+    tips = []
+
+    # Name: +5
+    if form_data.get("name") and len(str(form_data["name"]).strip()) > 1:
+        score += 5
+        breakdown.append(("✅ Full Name", 5))
+    else:
+        breakdown.append(("❌ Full Name", 0))
+        tips.append("Add your full name to improve your profile")
+
+    # Phone: +5
+    if form_data.get("phone") and len(str(form_data["phone"]).strip()) >= 10:
+        score += 5
+        breakdown.append(("✅ Phone Number", 5))
+    else:
+        breakdown.append(("❌ Phone Number", 0))
+        tips.append("Add a valid 10-digit phone number")
+
+    # Email: +5
+    if form_data.get("email") and '@' in str(form_data["email"]):
+        score += 5
+        breakdown.append(("✅ Email Address", 5))
+    else:
+        breakdown.append(("❌ Email Address", 0))
+        tips.append("Add your email address")
+
+    # Profile Image: +5
+    if form_data.get("profile_image"):
+        score += 5
+        breakdown.append(("✅ Profile Image", 5))
+    else:
+        breakdown.append(("❌ Profile Image", 0))
+        tips.append("Upload a profile photo to stand out")
+
+    # Education: +10
+    if form_data.get("education") and form_data["education"] != "":
+        score += 10
+        breakdown.append(("✅ Education Qualification", 10))
+    else:
+        breakdown.append(("❌ Education Qualification", 0))
+        tips.append("Select your highest education qualification")
+
+    # Institution: +5
+    if form_data.get("institution_name") and len(
+        str(form_data["institution_name"]).strip()
+    ) > 2:
+        score += 5
+        breakdown.append(("✅ Institution Details", 5))
+    else:
+        breakdown.append(("❌ Institution Details", 0))
+        tips.append("Add your institution/college name")
+
+    # Year: +5
+    if form_data.get("year_passed"):
+        score += 5
+        breakdown.append(("✅ Year of Passing", 5))
+    else:
+        breakdown.append(("❌ Year of Passing", 0))
+        tips.append("Select your year of passing")
+
+    # Skills (5+): +15
+    skills = form_data.get("skills", [])
+    if len(skills) >= 5:
+        score += 15
+        breakdown.append(("✅ Skills (5+ added)", 15))
+    elif len(skills) > 0:
+        partial = int(15 * len(skills) / 5)
+        score += partial
+        breakdown.append((f"⚠️ Skills ({len(skills)}/5 minimum)", partial))
+        tips.append(f"Add {5 - len(skills)} more skills (minimum 5 required)")
+    else:
+        breakdown.append(("❌ Skills (none added)", 0))
+        tips.append("Add at least 5 skills — this is required")
+
+    # Job Preferences: +10
+    has_location = bool(form_data.get("preferred_locations"))
+    has_functions = bool(form_data.get("job_functions"))
+    if has_location and has_functions:
+        score += 10
+        breakdown.append(("✅ Job Preferences", 10))
+    elif has_location or has_functions:
+        score += 5
+        breakdown.append(("⚠️ Job Preferences (partial)", 5))
+        if not has_location:
+            tips.append("Select your preferred job locations")
+        if not has_functions:
+            tips.append("Select interested job functions")
+    else:
+        breakdown.append(("❌ Job Preferences", 0))
+        tips.append("Add job location and function preferences")
+
+    # Experience: +10
+    if (
+        form_data.get("experience_years", 0) > 0
+        or form_data.get("is_fresher", False)
+        or form_data.get("experience_entries")
+    ):
+        score += 10
+        breakdown.append(("✅ Experience Details", 10))
+    else:
+        breakdown.append(("❌ Experience Details", 0))
+        tips.append("Add your experience details or mark as fresher")
+
+    # Address/Location: +5
+    if form_data.get("preferred_locations"):
+        score += 5
+        breakdown.append(("✅ Location/Address", 5))
+    else:
+        breakdown.append(("❌ Location/Address", 0))
+        tips.append("Select at least one preferred location")
+
+    # Resume uploaded: +10
+    if form_data.get("resume_uploaded"):
+        score += 10
+        breakdown.append(("✅ Resume Uploaded", 10))
+    else:
+        breakdown.append(("❌ Resume Uploaded", 0))
+        tips.append("Upload your resume PDF for better visibility")
+
+    # Documents: +10
+    doc_count = 0
+    if form_data.get("identity_card"):
+        doc_count += 1
+    for i in range(1, 4):
+        if form_data.get(f"certificate_{i}"):
+            doc_count += 1
+    if doc_count > 0:
+        doc_score = min(10, doc_count * 3)
+        score += doc_score
+        breakdown.append((f"✅ Documents ({doc_count} uploaded)", doc_score))
+    else:
+        breakdown.append(("❌ Documents (none uploaded)", 0))
+        tips.append("Upload identity card and certificates for verification")
+
+    # Clamp
+    score = min(score, max_score)
+
+    grade, grade_color, grade_emoji = health_grade(score)
+
+    return {
+        "score": score,
+        "max_score": max_score,
+        "percentage": score,
+        "breakdown": breakdown,
+        "tips": tips,
+        "grade": grade,
+        "grade_color": grade_color,
+        "grade_emoji": grade_emoji,
+    }
@@ -0,0 +1,244 @@
+"""
+image_hash.py
+Perceptual hashes of uploaded ID cards and certificates, and an index to
+catch the same document being reused across registrations.
+
+Each image (or the first page of a PDF) is reduced to a 64-bit dHash, which
+survives re-encoding, resizing and small brightness changes. Hashes are kept
+in a multi-index hash table in SQLite: the 64 bits are split into
+NUM_CHUNKS chunks, each stored in its own indexed column. By the pigeonhole
+principle any hash within Hamming distance < NUM_CHUNKS of a query shares at
+least one chunk with it exactly, so a radius query is NUM_CHUNKS indexed
+probes plus a popcount over the few candidates, even with millions of rows.
+
+Blank or near-uniform images (empty photos, faint scans) carry no identity:
+their hashes sit near all-zeros, match each other, and would pile into one
+chunk bucket. Such images are not hashed, and hashes with too few set bits
+or bit transitions are neither indexed nor queried.
+"""
+
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+DEFAULT_IMAGE_INDEX_PATH = os.environ.get(
+    "DEET_IMAGE_INDEX", "deet_documents.db"
+)
+
+HASH_BITS = 64
+NUM_CHUNKS = 4
+CHUNK_BITS = HASH_BITS // NUM_CHUNKS
+MAX_DISTANCE = NUM_CHUNKS - 1
+
+# Below these an image/hash is too uniform to tell documents apart
+MIN_PIXEL_STDDEV = 6.0      # grayscale, 0..255
+MIN_SET_BITS = 8            # of either polarity
+MIN_TRANSITIONS = 8         # bit flips along the hash
+
+# Uploads are re-sent on every Streamlit rerun; hash each file only once
+HASH_CACHE_SIZE = 256
+_hash_cache = OrderedDict()
+_hash_cache_lock = threading.Lock()
+
+DOCUMENT_LABELS = {
+    "identity_card": "Identity card",
+    "certificate_1": "Certificate 1",
+    "certificate_2": "Certificate 2",
+    "certificate_3": "Certificate 3",
+}
+
+
+def _load_image(data: bytes, filename: str = ""):
+    """PIL image for an image upload or the first page of a PDF, or None."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+
+    is_pdf = filename.lower().endswith(".pdf") or data[:5] == b"%PDF-"
+    if not is_pdf:
+        try:
+            return Image.open(io.BytesIO(data))
+        except Exception:
+            return None
+
+    # Render the first page with poppler if available ...
+    try:
+        from pdf2image import convert_from_bytes
+        pages = convert_from_bytes(data, first_page=1, last_page=1, dpi=72)
+        if pages:
+            return pages[0]
+    except Exception:
+        pass
+    # ... otherwise use the first embedded image (scanned PDFs are one image)
+    try:
+        import PyPDF2
+        reader = PyPDF2.PdfReader(io.BytesIO(data))
+        images = reader.pages[0].images
+        if images:
+            return Image.open(io.BytesIO(images[0].data))
+    except Exception:
+        pass
+    return None
+
+
+def dhash(image, size: int = 8) -> int:
+    """64-bit difference hash of a PIL image."""
+    from PIL import Image
+
+    gray = image.convert("L").resize((size + 1, size), Image.LANCZOS)
+    pixels = list(gray.getdata())
+    value = 0
+    for row in range(size):
+        offset = row * (size + 1)
+        for col in range(size):
+            value = (value << 1) | (
+                pixels[offset + col] > pixels[offset + col + 1]
+            )
+    return value
+
+
+def _is_uniform(image) -> bool:
+    from PIL import ImageStat
+
+    thumb = image.convert("L")
+    thumb.thumbnail((64, 64))
+    return ImageStat.Stat(thumb).stddev[0] < MIN_PIXEL_STDDEV
+
+
+def is_distinctive(hash_hex: str) -> bool:
+    """False for degenerate hashes that would match unrelated documents."""
+    value = int(hash_hex, 16)
+    ones = bin(value).count("1")
+    transitions = bin((value ^ (value >> 1)) & ((1 << (HASH_BITS - 1)) - 1))
+    return (
+        min(ones, HASH_BITS - ones) >= MIN_SET_BITS
+        and transitions.count("1") >= MIN_TRANSITIONS
+    )
+
+
+def document_hash(data: bytes, filename: str = "") -> Optional[str]:
+    """
+    Perceptual hash of an uploaded document as 16 hex digits, or None if
+    it could not be decoded or is too uniform to identify. Memoized on the
+    file contents.
+    """
+    if not data:
+        return None
+    digest = hashlib.sha256(data).digest()
+    with _hash_cache_lock:
+        if digest in _hash_cache:
+            _hash_cache.move_to_end(digest)
+            return _hash_cache[digest]
+    image = _load_image(data, filename)
+    result = None
+    if image is not None and not _is_uniform(image):
+        result = f"{dhash(image):016x}"
+        if not is_distinctive(result):
+            result = None
+    with _hash_cache_lock:
+        _hash_cache[digest] = result
+        if len(_hash_cache) > HASH_CACHE_SIZE:
+            _hash_cache.popitem(last=False)
+    return result
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _chunks(value: int) -> List[int]:
+    mask = (1 << CHUNK_BITS) - 1
+    return [(value >> (i * CHUNK_BITS)) & mask for i in range(NUM_CHUNKS)]
+
+
+def _to_signed(value: int) -> int:
+    # SQLite integers are signed 64-bit
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+class ImageHashIndex:
+    """SQLite multi-index hash table of document hashes."""
+
+    def __init__(self, path: str = DEFAULT_IMAGE_INDEX_PATH, timeout: float = 5.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        chunk_cols = ", ".join(f"c{i} INTEGER NOT NULL" for i in range(NUM_CHUNKS))
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS document_hashes ("
+            " hash INTEGER NOT NULL,"
+            f" {chunk_cols},"
+            " kind TEXT NOT NULL,"
+            " registration_id TEXT NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        for i in range(NUM_CHUNKS):
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS document_hashes_c{i} "
+                f"ON document_hashes (c{i})"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path, timeout=self.timeout, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def add(self, registration_id: str, kind: str, hash_hex: str):
+        if not is_distinctive(hash_hex):
+            return
+        value = int(hash_hex, 16)
+        self._conn().execute(
+            "INSERT INTO document_hashes VALUES "
+            f"(?, {', '.join('?' * NUM_CHUNKS)}, ?, ?, ?)",
+            (_to_signed(value), *_chunks(value), kind, registration_id,
+             time.time()),
+        )
+
+    def add_many(self, registration_id: str, hashes: Dict[str, str]):
+        for kind, hash_hex in (hashes or {}).items():
+            if hash_hex:
+                self.add(registration_id, kind, hash_hex)
+
+    def query(
+        self, hash_hex: str, max_distance: int = MAX_DISTANCE, limit: int = 5
+    ) -> List[Dict[str, object]]:
+        """Indexed documents within max_distance bits, closest first."""
+        if not is_distinctive(hash_hex):
+            return []
+        max_distance = min(max_distance, MAX_DISTANCE)
+        value = int(hash_hex, 16)
+        where = " OR ".join(f"c{i} = ?" for i in range(NUM_CHUNKS))
+        rows = self._conn().execute(
+            f"SELECT hash, kind, registration_id FROM document_hashes "
+            f"WHERE {where}",
+            _chunks(value),
+        ).fetchall()
+        matches = []
+        for stored, kind, reg_id in rows:
+            distance = hamming(value, stored & ((1 << 64) - 1))
+            if distance <= max_distance:
+                matches.append({
+                    "registration_id": reg_id,
+                    "kind": kind,
+                    "distance": distance,
+                })
+        matches.sort(key=lambda m: m["distance"])
+        return matches[:limit]
+
+    def __len__(self) -> int:
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM document_hashes"
+        ).fetchone()[0]
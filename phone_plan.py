@@ -0,0 +1,151 @@
+"""
+phone_plan.py
+Precomputed Indian mobile numbering-plan index for phone validation.
+
+One index, built once at import, answers both questions asked of a
+10-digit mobile number with a single dict probe each:
+  - is it a known fake (repeating, sequential or blacklisted)?
+  - which operator/circle holds its series?
+
+Series allocations come from a CSV with columns prefix,operator,circle
+(4- or 5-digit MSC prefixes as published in the DoT/TRAI numbering plan),
+given by DEET_MOBILE_SERIES_FILE or mobile_series.csv next to this file.
+Without that file the allocation check is skipped and only the fake-number
+table is used.
+"""
+
+import csv
+import hashlib
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SERIES_PATH = os.environ.get(
+    "DEET_MOBILE_SERIES_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "mobile_series.csv"),
+)
+
+SERIES_PREFIX_LEN = 5
+
+REASON_IDENTICAL = "Phone number has all identical digits — likely fake"
+REASON_SEQUENTIAL = "Phone number is a sequential pattern — likely fake"
+REASON_REVERSE = "Phone number is a reverse sequential pattern — likely fake"
+REASON_KNOWN_FAKE = "Phone number matches a known fake pattern"
+
+KNOWN_FAKE_NUMBERS = [
+    '1234567890', '0987654321', '1111111111', '0000000000',
+    '9876543210', '1234512345', '9999999999', '8888888888',
+    '7777777777', '6666666666',
+]
+
+
+def _build_fake_table() -> Dict[str, Tuple[Tuple[str, str], ...]]:
+    """
+    Every 10-digit fake number mapped to its (issue code, reason) pairs,
+    in report order.
+    """
+    reasons: Dict[str, List[Tuple[str, str]]] = {}
+
+    def add(number, code, reason):
+        reasons.setdefault(number, []).append((code, reason))
+
+    for d in range(10):
+        add(str(d) * 10, "PHONE_IDENTICAL", REASON_IDENTICAL)
+    for start in range(10):
+        add(''.join(str(i % 10) for i in range(start, start + 10)),
+            "PHONE_SEQUENTIAL", REASON_SEQUENTIAL)
+    for start in range(10):
+        add(''.join(str(i % 10) for i in range(start, start - 10, -1)),
+            "PHONE_REVERSE_SEQUENTIAL", REASON_REVERSE)
+    for number in KNOWN_FAKE_NUMBERS:
+        add(number, "PHONE_KNOWN_FAKE", REASON_KNOWN_FAKE)
+    return {number: tuple(r) for number, r in reasons.items()}
+
+
+class MobileNumberIndex:
+    """Fake-number table plus series-prefix -> (operator, circle) table."""
+
+    def __init__(
+        self,
+        series: Optional[Dict[str, Tuple[str, str]]] = None,
+    ):
+        self.fakes = _build_fake_table()
+        self.series = series or {}
+        self._digest = None
+
+    @classmethod
+    def load(cls, path: Optional[str] = DEFAULT_SERIES_PATH):
+        """Build the index, reading series allocations from path if present."""
+        series = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, newline='', encoding='utf-8') as f:
+                    for row in csv.DictReader(f):
+                        cls._add_series(
+                            series, row["prefix"].strip(),
+                            row.get("operator", "").strip(),
+                            row.get("circle", "").strip(),
+                        )
+            except (OSError, KeyError, csv.Error) as e:
+                logger.warning("Could not load mobile series %s: %s", path, e)
+                series = {}
+        return cls(series)
+
+    @staticmethod
+    def _add_series(series, prefix, operator, circle):
+        # Expand shorter prefixes so every lookup is one fixed-width probe;
+        # explicit longer prefixes win over expanded shorter ones
+        if not prefix.isdigit() or len(prefix) > SERIES_PREFIX_LEN:
+            return
+        if len(prefix) == SERIES_PREFIX_LEN:
+            series[prefix] = (operator, circle)
+            return
+        width = SERIES_PREFIX_LEN - len(prefix)
+        for n in range(10 ** width):
+            series.setdefault(f"{prefix}{n:0{width}d}", (operator, circle))
+
+    @property
+    def has_series(self) -> bool:
+        return bool(self.series)
+
+    @property
+    def digest(self) -> str:
+        """Fingerprint of the fake and series tables, computed on first use."""
+        if self._digest is None:
+            h = hashlib.sha1(repr(sorted(self.fakes.items())).encode("utf-8"))
+            h.update(repr(sorted(self.series.items())).encode("utf-8"))
+            self._digest = h.hexdigest()[:16]
+        return self._digest
+
+    def fake_issues(self, phone: str) -> Tuple[Tuple[str, str], ...]:
+        """(issue code, reason) pairs if a cleaned number is fake."""
+        return self.fakes.get(phone, ())
+
+    def fake_reasons(self, phone: str) -> Tuple[str, ...]:
+        """Reasons a cleaned 10-digit number is fake (empty if none)."""
+        return tuple(reason for _, reason in self.fakes.get(phone, ()))
+
+    def lookup(self, phone: str) -> Dict[str, object]:
+        """
+        Look up a cleaned 10-digit number.
+        Returns {"operator", "circle", "allocated", "fake_issues",
+        "fake_reasons"}; allocated is None when no series table is loaded.
+        """
+        allocation = self.series.get(phone[:SERIES_PREFIX_LEN])
+        fake_issues = self.fakes.get(phone, ())
+        return {
+            "operator": allocation[0] if allocation else None,
+            "circle": allocation[1] if allocation else None,
+            "allocated": (allocation is not None) if self.series else None,
+            "fake_issues": fake_issues,
+            "fake_reasons": tuple(reason for _, reason in fake_issues),
+        }
+
+    def lookup_batch(self, phones: Iterable[str]) -> List[Dict[str, object]]:
+        """lookup() over many numbers, for bulk audits."""
+        return [self.lookup(p) for p in phones]
+
+
+PHONE_INDEX = MobileNumberIndex.load()
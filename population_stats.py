@@ -0,0 +1,461 @@
+"""
+population_stats.py
+Streaming per-cohort statistics of registrations, used to score how far a
+new registration deviates from the people who registered before it.
+
+Three cohorts are tracked:
+  - experience by age band (age from the date of birth, 5-year bands)
+  - skill count by education level
+  - registrations per district per day
+
+Each cohort holds a RunningStats (Welford's online mean/variance), so an
+update and a z-score are O(1) and memory depends only on the number of
+cohort keys, never on the number of registrations. Day counts per district
+are folded into their RunningStats when the day rolls over; idle days are
+merged in as a batch of zeros in O(1).
+
+The shared snapshot lives in SQLite so several app processes can use it.
+Each process records its own updates as a delta; sync() merges the delta
+into the stored snapshot inside one write transaction (running stats
+combine exactly with the parallel-variance formula) and pulls in what the
+other processes merged. start_sync() does this from a background thread,
+so submitting a registration only touches memory.
+"""
+
+import atexit
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATS_PATH = os.environ.get(
+    "DEET_POPULATION_STATS", "deet_population.db"
+)
+SYNC_INTERVAL = 5.0
+
+AGE_BAND_YEARS = 5
+MIN_WORKING_AGE = 14
+
+# Cohorts need this many samples (days, for districts) before scoring
+MIN_SAMPLES = 30
+MIN_DISTRICT_DAYS = 7
+Z_THRESHOLD = 3.5
+
+# Bound on distinct keys per cohort (education / district are free-ish text)
+MAX_COHORT_KEYS = 1000
+
+
+class RunningStats:
+    """Welford's online mean and variance."""
+
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self, n: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+
+    def update(self, x: float):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def merge(self, n: int, mean: float, m2: float = 0.0):
+        """Fold in another sample summary (Chan et al. parallel update)."""
+        if n <= 0:
+            return
+        total = self.n + n
+        delta = mean - self.mean
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.mean += delta * n / total
+        self.n = total
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def zscore(self, x: float) -> Optional[float]:
+        """Standard score of x, or None when the spread is zero."""
+        std = self.std
+        if std == 0:
+            return None
+        return (x - self.mean) / std
+
+    def to_list(self) -> List[float]:
+        return [self.n, self.mean, self.m2]
+
+
+def age_from_dob(dob: Any, today: Optional[date] = None) -> Optional[int]:
+    """Age in whole years from a date or ISO date string, or None."""
+    if isinstance(dob, datetime):
+        dob = dob.date()
+    elif isinstance(dob, str):
+        try:
+            dob = date.fromisoformat(dob.strip()[:10])
+        except ValueError:
+            return None
+    if not isinstance(dob, date):
+        return None
+    today = today or date.today()
+    age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
+    return age if age >= 0 else None
+
+
+def total_experience(form_data: Dict[str, Any]) -> float:
+    return (
+        (form_data.get("experience_years") or 0)
+        + (form_data.get("experience_months") or 0) / 12.0
+    )
+
+
+def _age_band(age: int) -> str:
+    low = age // AGE_BAND_YEARS * AGE_BAND_YEARS
+    return f"{low}-{low + AGE_BAND_YEARS - 1}"
+
+
+def _district(form_data: Dict[str, Any]) -> Optional[str]:
+    locations = form_data.get("preferred_locations") or []
+    return locations[0] if locations else None
+
+
+class _Delta:
+    """Updates made by this process since its last sync."""
+
+    __slots__ = ("experience_by_age", "skills_by_education", "district_days")
+
+    def __init__(self):
+        self.experience_by_age: Dict[str, RunningStats] = {}
+        self.skills_by_education: Dict[str, RunningStats] = {}
+        # (district, day ordinal) -> registrations
+        self.district_days: Dict[Tuple[str, int], int] = {}
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.experience_by_age or self.skills_by_education
+            or self.district_days
+        )
+
+    def absorb(self, other: "_Delta"):
+        """Fold another delta into this one."""
+        for name in ("experience_by_age", "skills_by_education"):
+            table = getattr(self, name)
+            for key, s in getattr(other, name).items():
+                table.setdefault(key, RunningStats()).merge(s.n, s.mean, s.m2)
+        for key, count in other.district_days.items():
+            self.district_days[key] = self.district_days.get(key, 0) + count
+
+    def apply_to(self, stats: "PopulationStats"):
+        """Merge into stats (the caller holds stats' lock if it is shared)."""
+        for name in ("experience_by_age", "skills_by_education"):
+            table = getattr(stats, name)
+            for key, s in getattr(self, name).items():
+                cohort = stats._cohort(table, key)
+                if cohort is not None:
+                    cohort.merge(s.n, s.mean, s.m2)
+        for (district, day), count in sorted(
+            self.district_days.items(), key=lambda item: item[0][1]
+        ):
+            if (district not in stats.district_today
+                    and len(stats.district_today) >= MAX_COHORT_KEYS):
+                continue
+            current = stats._roll_district(district, day)
+            # Counts for a day the store has already rolled past are late
+            # (a process syncing across midnight) and cannot be placed
+            if current[0] == day:
+                current[1] += count
+
+
+class PopulationStats:
+    """Per-cohort running statistics with O(1) update and scoring."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.experience_by_age: Dict[str, RunningStats] = {}
+        self.skills_by_education: Dict[str, RunningStats] = {}
+        self.district_daily: Dict[str, RunningStats] = {}
+        # district -> [day ordinal, registrations so far that day]
+        self.district_today: Dict[str, List[int]] = {}
+        self.path: Optional[str] = None
+        self._delta = _Delta()
+        self._sync_lock = threading.Lock()
+        self._stop_sync: Optional[threading.Event] = None
+        self._sync_thread: Optional[threading.Thread] = None
+
+    # ─── Updates ────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _cohort(table: Dict[str, RunningStats], key: str) -> Optional[RunningStats]:
+        stats = table.get(key)
+        if stats is None:
+            if len(table) >= MAX_COHORT_KEYS:
+                return None
+            stats = table[key] = RunningStats()
+        return stats
+
+    def _roll_district(self, district: str, day: int) -> List[int]:
+        current = self.district_today.get(district)
+        if current is None:
+            current = self.district_today[district] = [day, 0]
+        elif current[0] < day:
+            stats = self._cohort(self.district_daily, district)
+            if stats is not None:
+                stats.update(current[1])
+                stats.merge(day - current[0] - 1, 0.0)
+            current[0], current[1] = day, 0
+        return current
+
+    def update(self, form_data: Dict[str, Any], today: Optional[date] = None):
+        """Add one submitted registration to every cohort it belongs to."""
+        today = today or date.today()
+        age = age_from_dob(form_data.get("dob"), today)
+        education = form_data.get("education")
+        district = _district(form_data)
+        with self._lock:
+            delta = self._delta
+            if age is not None:
+                band = _age_band(age)
+                stats = self._cohort(self.experience_by_age, band)
+                if stats is not None:
+                    experience = total_experience(form_data)
+                    stats.update(experience)
+                    delta.experience_by_age.setdefault(
+                        band, RunningStats()
+                    ).update(experience)
+            if education:
+                stats = self._cohort(self.skills_by_education, education)
+                if stats is not None:
+                    skills = len(form_data.get("skills") or [])
+                    stats.update(skills)
+                    delta.skills_by_education.setdefault(
+                        education, RunningStats()
+                    ).update(skills)
+            if district and (
+                district in self.district_today
+                or len(self.district_today) < MAX_COHORT_KEYS
+            ):
+                day = today.toordinal()
+                self._roll_district(district, day)[1] += 1
+                key = (district, day)
+                delta.district_days[key] = delta.district_days.get(key, 0) + 1
+
+    # ─── Scoring ────────────────────────────────────────────────────────
+
+    def deviations(
+        self, form_data: Dict[str, Any], today: Optional[date] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Cohorts where the registration sits more than Z_THRESHOLD standard
+        deviations above its peers. Each hit is {"cohort", "key", "value",
+        "mean", "z"}.
+        """
+        today = today or date.today()
+        hits = []
+
+        def check(cohort, key, stats, value, min_samples):
+            if stats is None or stats.n < min_samples:
+                return
+            z = stats.zscore(value)
+            if z is not None and z > Z_THRESHOLD:
+                hits.append({
+                    "cohort": cohort, "key": key, "value": value,
+                    "mean": stats.mean, "z": z,
+                })
+
+        age = age_from_dob(form_data.get("dob"), today)
+        education = form_data.get("education")
+        district = _district(form_data)
+        with self._lock:
+            if age is not None:
+                band = _age_band(age)
+                check("experience", band, self.experience_by_age.get(band),
+                      total_experience(form_data), MIN_SAMPLES)
+            if education:
+                check("skills", education,
+                      self.skills_by_education.get(education),
+                      len(form_data.get("skills") or []), MIN_SAMPLES)
+            if district:
+                current = self.district_today.get(district)
+                so_far = (
+                    current[1] if current and current[0] == today.toordinal()
+                    else 0
+                )
+                # Count this registration as part of today's volume
+                check("district", district, self.district_daily.get(district),
+                      so_far + 1, MIN_DISTRICT_DAYS)
+        return hits
+
+    # ─── Persistence ────────────────────────────────────────────────────
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "experience_by_age": {
+                    k: s.to_list() for k, s in self.experience_by_age.items()
+                },
+                "skills_by_education": {
+                    k: s.to_list() for k, s in self.skills_by_education.items()
+                },
+                "district_daily": {
+                    k: s.to_list() for k, s in self.district_daily.items()
+                },
+                "district_today": {
+                    k: list(v) for k, v in self.district_today.items()
+                },
+            }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PopulationStats":
+        stats = cls()
+        for name in ("experience_by_age", "skills_by_education", "district_daily"):
+            setattr(stats, name, {
+                k: RunningStats(int(v[0]), float(v[1]), float(v[2]))
+                for k, v in (data.get(name) or {}).items()
+            })
+        stats.district_today = {
+            k: [int(v[0]), int(v[1])]
+            for k, v in (data.get("district_today") or {}).items()
+        }
+        return stats
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_STATS_PATH) -> "PopulationStats":
+        """Statistics backed by the store at path (empty if unreadable)."""
+        stats = cls()
+        stats.path = path
+        stats.sync()
+        return stats
+
+    # ─── Shared store ───────────────────────────────────────────────────
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(path, timeout=5.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS population_stats ("
+            " id INTEGER PRIMARY KEY CHECK (id = 0),"
+            " data TEXT NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        return conn
+
+    def _merge_into_store(self, delta: _Delta) -> "PopulationStats":
+        """Merge delta into the stored snapshot and return the result."""
+        conn = self._connect(self.path)
+        try:
+            # IMMEDIATE takes the write lock up front, so concurrent
+            # read-merge-write cycles from other processes serialize
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT data FROM population_stats WHERE id = 0"
+                ).fetchone()
+                stored = PopulationStats()
+                if row:
+                    try:
+                        stored = PopulationStats.from_dict(json.loads(row[0]))
+                    except (ValueError, KeyError, TypeError, IndexError) as e:
+                        logger.warning("Replacing unreadable population "
+                                       "stats in %s: %s", self.path, e)
+                if delta:
+                    delta.apply_to(stored)
+                    conn.execute(
+                        "INSERT OR REPLACE INTO population_stats "
+                        "(id, data, updated_at) VALUES (0, ?, ?)",
+                        (json.dumps(stored.to_dict()), time.time()),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+        return stored
+
+    def sync(self) -> bool:
+        """
+        Merge this process' updates into the store and load everyone
+        else's. On failure the updates are kept for the next attempt.
+        """
+        if not self.path:
+            return False
+        with self._sync_lock:
+            with self._lock:
+                delta, self._delta = self._delta, _Delta()
+            try:
+                stored = self._merge_into_store(delta)
+            except sqlite3.Error as e:
+                logger.warning("Could not sync population stats: %s", e)
+                with self._lock:
+                    delta.absorb(self._delta)
+                    self._delta = delta
+                return False
+            with self._lock:
+                # Keep updates that arrived while the store was busy
+                self._delta.apply_to(stored)
+                self.experience_by_age = stored.experience_by_age
+                self.skills_by_education = stored.skills_by_education
+                self.district_daily = stored.district_daily
+                self.district_today = stored.district_today
+        return True
+
+    def start_sync(self, interval: float = SYNC_INTERVAL):
+        """Sync from a background thread every interval seconds."""
+        if self._sync_thread is not None or not self.path:
+            return
+        self._stop_sync = threading.Event()
+
+        def _run():
+            while not self._stop_sync.wait(interval):
+                try:
+                    self.sync()
+                except Exception:
+                    logger.exception("Population stats sync failed")
+
+        self._sync_thread = threading.Thread(
+            target=_run, name="population-stats-sync", daemon=True
+        )
+        self._sync_thread.start()
+        atexit.register(self.close)
+
+    def close(self):
+        """Stop background syncing and write out pending updates."""
+        if self._sync_thread is not None:
+            self._stop_sync.set()
+            self._sync_thread.join()
+            self._sync_thread = None
+        self.sync()
+
+
+def describe_deviation(hit: Dict[str, Any]) -> Tuple[str, str]:
+    """(issue code, message) for one deviations() hit."""
+    cohort, key, value = hit["cohort"], hit["key"], hit["value"]
+    if cohort == "experience":
+        return (
+            "POPULATION_EXPERIENCE",
+            f"Experience of {value:.1f} years is far above others aged {key} "
+            f"(average {hit['mean']:.1f}, z={hit['z']:.1f})",
+        )
+    if cohort == "skills":
+        return (
+            "POPULATION_SKILLS",
+            f"{value} skills is far above other {key} registrants "
+            f"(average {hit['mean']:.1f}, z={hit['z']:.1f})",
+        )
+    return (
+        "POPULATION_DISTRICT_SURGE",
+        f"Unusual registration volume for {key} today: {value} "
+        f"(daily average {hit['mean']:.1f}, z={hit['z']:.1f})",
+    )
@@ -0,0 +1,296 @@
+"""
+rescore.py
+Bring stored fraud reports up to date after a rule change.
+
+Each stored report records the fingerprint of every rule and a digest of
+the inputs each rule read (see fraud_rules.py). This job re-runs only the
+rules whose fingerprint changed, and only on records they apply to: after
+a disposable-domain list update only records with an email are touched,
+and their other rule results are kept. Records already scored with the
+current rule set are copied through without being parsed. Results of rules
+that need a store this job does not open (velocity, documents, population,
+and duplicates without --duplicate-index) are carried forward unchanged.
+
+Input and output are registration JSONL (form_data_snapshot shape, with
+the report under "fraud_report" or "audit.fraud_report"). Batches run in
+worker processes; progress is checkpointed after every batch so an
+interrupted run continues where it stopped with --resume.
+
+Usage:
+    python rescore.py registrations.jsonl -o rescored.jsonl
+    python rescore.py registrations.jsonl -o rescored.jsonl --resume
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from fraud_audit import _ExcludingIndex
+from fraudchecker import FRAUD_RULES
+
+_worker_duplicate_index = None
+_worker_version = None
+
+
+def _init_worker(duplicate_index_path: Optional[str]):
+    global _worker_duplicate_index, _worker_version
+    if duplicate_index_path:
+        from duplicate_index import DuplicateIndex
+        _worker_duplicate_index = DuplicateIndex(duplicate_index_path)
+    _worker_version = FRAUD_RULES.version_of(FRAUD_RULES.versions())
+
+
+def _current_markers(version: str) -> Tuple[bytes, ...]:
+    return tuple(
+        f'"rule_set_version"{sep}"{version}"'.encode("utf-8")
+        for sep in (": ", ":")
+    )
+
+
+def rescore_record(
+    record: Dict[str, Any], duplicate_index=None
+) -> Tuple[Dict[str, Any], Optional[List[str]]]:
+    """
+    Update one record's stored fraud report in place.
+    Returns (record, codes of the rules re-run; None for a full evaluation).
+    """
+    audit = record.get("audit")
+    in_audit = "fraud_report" not in record and isinstance(audit, dict)
+    stored = (audit.get("fraud_report") if in_audit else
+              record.get("fraud_report")) or {}
+    context = {}
+    if duplicate_index is not None:
+        context["duplicate_index"] = _ExcludingIndex(
+            duplicate_index, record.get("registration_id")
+        )
+    report, rerun = FRAUD_RULES.rescore(record, stored, context)
+    if in_audit:
+        audit["fraud_report"] = report
+    else:
+        record["fraud_report"] = report
+    return record, rerun
+
+
+def _rescore_batch(lines: List[bytes]) -> Tuple[List[bytes], Dict[str, Any]]:
+    """Worker entry point: rescore raw JSONL lines."""
+    markers = _current_markers(_worker_version)
+    stats = {"current": 0, "unchanged": 0, "partial": 0, "full": 0,
+             "errors": 0, "rules": Counter()}
+    out = []
+    for line in lines:
+        if any(m in line for m in markers):
+            # Already scored with the current rule set
+            stats["current"] += 1
+            out.append(line.rstrip(b"\r\n"))
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            stats["errors"] += 1
+            continue
+        if not isinstance(record, dict):
+            stats["errors"] += 1
+            continue
+        record, rerun = rescore_record(record, _worker_duplicate_index)
+        if rerun is None:
+            stats["full"] += 1
+        elif rerun:
+            stats["partial"] += 1
+            stats["rules"].update(rerun)
+        else:
+            stats["unchanged"] += 1
+        out.append(
+            json.dumps(record, ensure_ascii=False, default=str).encode("utf-8")
+        )
+    return out, stats
+
+
+def _batches(infile, size: int) -> Iterator[Tuple[List[bytes], int]]:
+    """(non-blank lines, bytes consumed) per batch."""
+    while True:
+        raw = list(islice(infile, size))
+        if not raw:
+            return
+        yield [ln for ln in raw if ln.strip()], sum(map(len, raw))
+
+
+# ─── Checkpoints ────────────────────────────────────────────────────────────
+
+def _load_state(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_state(path: str, state: Dict[str, Any]):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def run_rescore(
+    input_path: str,
+    output_path: str,
+    workers: int = os.cpu_count() or 1,
+    batch_size: int = 1000,
+    duplicate_index_path: Optional[str] = None,
+    state_path: Optional[str] = None,
+    resume: bool = False,
+) -> Dict[str, Any]:
+    """
+    Rescore input_path into output_path, checkpointing to state_path
+    (default: output_path + ".state"). Returns a summary dict.
+    """
+    state_path = state_path or f"{output_path}.state"
+    version = FRAUD_RULES.version_of(FRAUD_RULES.versions())
+    state = _load_state(state_path) if resume else None
+    if state and (
+        state.get("input") != os.path.abspath(input_path)
+        or state.get("rule_set_version") != version
+    ):
+        print("Checkpoint is for another input or rule set; starting over.",
+              file=sys.stderr)
+        state = None
+    state = state or {
+        "input": os.path.abspath(input_path),
+        "rule_set_version": version,
+        "input_offset": 0,
+        "output_offset": 0,
+        "records": 0,
+        "counts": {},
+        "rules": {},
+    }
+    counts = Counter(state["counts"])
+    rules = Counter(state["rules"])
+    start = time.perf_counter()
+    processed = 0
+
+    infile = open(input_path, "rb")
+    outfile = open(output_path, "r+b" if state["output_offset"] else "wb")
+    try:
+        infile.seek(state["input_offset"])
+        outfile.seek(state["output_offset"])
+        outfile.truncate()
+
+        def collect(result, consumed):
+            nonlocal processed
+            out_lines, stats = result
+            for line in out_lines:
+                outfile.write(line + b"\n")
+            outfile.flush()
+            rules.update(stats.pop("rules"))
+            counts.update(stats)
+            processed += len(out_lines)
+            state["input_offset"] += consumed
+            state["output_offset"] = outfile.tell()
+            state["records"] += len(out_lines)
+            state["counts"] = dict(counts)
+            state["rules"] = dict(rules)
+            _save_state(state_path, state)
+
+        if workers <= 1:
+            _init_worker(duplicate_index_path)
+            for batch, consumed in _batches(infile, batch_size):
+                collect(_rescore_batch(batch), consumed)
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(duplicate_index_path,),
+            ) as pool:
+                pending = deque()
+                for batch, consumed in _batches(infile, batch_size):
+                    pending.append(
+                        (pool.submit(_rescore_batch, batch), consumed)
+                    )
+                    # Collect in order so the checkpoint is a clean prefix
+                    while len(pending) >= workers * 2:
+                        future, size = pending.popleft()
+                        collect(future.result(), size)
+                while pending:
+                    future, size = pending.popleft()
+                    collect(future.result(), size)
+    finally:
+        infile.close()
+        outfile.close()
+
+    elapsed = time.perf_counter() - start
+    state["done"] = True
+    _save_state(state_path, state)
+    return {
+        "records": state["records"],
+        "this_run": processed,
+        "seconds": elapsed,
+        "records_per_sec": processed / elapsed if elapsed > 0 else 0.0,
+        "rule_set_version": version,
+        "counts": dict(counts),
+        "rules_rerun": dict(rules.most_common()),
+    }
+
+
+def print_summary(summary: Dict[str, Any], stream=sys.stderr):
+    counts = summary["counts"]
+    print(
+        f"Rescored {summary['this_run']:,} records this run "
+        f"({summary['records']:,} total) in {summary['seconds']:.1f}s "
+        f"— {summary['records_per_sec']:,.0f} records/sec",
+        file=stream,
+    )
+    print(
+        f"Rule set {summary['rule_set_version']}: "
+        f"{counts.get('current', 0):,} already current, "
+        f"{counts.get('unchanged', 0):,} unaffected, "
+        f"{counts.get('partial', 0):,} partially re-run, "
+        f"{counts.get('full', 0):,} fully re-run, "
+        f"{counts.get('errors', 0):,} unreadable",
+        file=stream,
+    )
+    for code, count in summary["rules_rerun"].items():
+        print(f"  {code:<12} {count:>10,}", file=stream)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Re-run changed fraud rules over stored registrations."
+    )
+    parser.add_argument("input", help="Input registrations JSONL")
+    parser.add_argument("-o", "--output", required=True,
+                        help="Output JSONL (must differ from the input)")
+    parser.add_argument(
+        "-w", "--workers", type=int, default=os.cpu_count() or 1,
+        help="Worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "-b", "--batch-size", type=int, default=1000,
+        help="Records per batch / checkpoint (default: 1000)",
+    )
+    parser.add_argument(
+        "--duplicate-index",
+        help="Duplicate index database, if the duplicate rule changed",
+    )
+    parser.add_argument("--state", help="Checkpoint file (default: OUTPUT.state)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue from the last checkpoint")
+    args = parser.parse_args(argv)
+
+    if os.path.abspath(args.input) == os.path.abspath(args.output):
+        parser.error("output must be a different file from the input")
+    summary = run_rescore(
+        args.input, args.output, args.workers, args.batch_size,
+        args.duplicate_index, args.state, args.resume,
+    )
+    print_summary(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
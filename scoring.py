@@ -0,0 +1,155 @@
+"""
+scoring.py
+Single scoring core for registrations and parsed resumes.
+
+Every caller (the Streamlit form, scorer.py's resume schema, fraud_audit.py)
+goes through score() / score_batch(): an adapter maps its input shape onto
+the registration form_data fields once, then the fraud rules and the health
+score run over those precomputed fields. Both are memoized per field value
+in fraudchecker, so batches with repeated values stay cheap.
+
+Each shape has its own health profile: a resume never carries a photo,
+documents or job preferences, so it is scored only on what a resume can
+contain.
+
+Shapes:
+  "form"    -- form_data as built by app.py (passed through unchanged)
+  "resume"  -- {"ContactInfo": {"Phones", "Emails"}, "Entities": {"Name",
+               "Organization"}, "MatchedSkills", "RawText"}
+"""
+
+import re
+from typing import Any, Callable, Dict, Iterable, List
+
+from fraudchecker import calculate_health_score, health_grade, run_fraud_check
+
+EDUCATION_KEYWORDS = (
+    "university", "college", "institute", "school", "academy",
+    "b.tech", "bsc", "msc", "phd",
+)
+_EDUCATION_RE = re.compile(
+    "|".join(re.escape(k) for k in EDUCATION_KEYWORDS), re.IGNORECASE
+)
+
+
+# ─── Adapters ───────────────────────────────────────────────────────────────
+
+def _mobile_number(phone: str) -> str:
+    """Digits of a phone number with an Indian country/trunk prefix removed."""
+    digits = re.sub(r"\D", "", phone or "")
+    if len(digits) == 12 and digits.startswith("91"):
+        return digits[2:]
+    if len(digits) == 11 and digits.startswith("0"):
+        return digits[1:]
+    return digits
+
+
+def form_from_resume(extracted: Dict[str, Any]) -> Dict[str, Any]:
+    """Map the parsed-resume schema onto registration form_data fields."""
+    contact = extracted.get("ContactInfo") or {}
+    entities = extracted.get("Entities") or {}
+    names = entities.get("Name") or []
+    phones = contact.get("Phones") or []
+    emails = contact.get("Emails") or []
+
+    # Education: an institution among the organizations, else one regex
+    # pass over the raw text
+    institution = next(
+        (org for org in entities.get("Organization") or []
+         if _EDUCATION_RE.search(org)),
+        "",
+    )
+    has_education = bool(institution) or bool(
+        _EDUCATION_RE.search(extracted.get("RawText") or "")
+    )
+
+    return {
+        "name": names[0] if names else "",
+        "phone": _mobile_number(phones[0]) if phones else "",
+        "email": emails[0] if emails else "",
+        # Checked by the CONTACTS rule, so every number/address is validated
+        "other_phones": [_mobile_number(p) for p in phones[1:]],
+        "other_emails": list(emails[1:]),
+        "education": "Detected in resume" if has_education else "",
+        "institution_name": institution,
+        "skills": list(extracted.get("MatchedSkills") or []),
+        "resume_uploaded": True,
+        # Enables the resume-only checks (e.g. many skills but no name)
+        "from_resume": True,
+    }
+
+
+ADAPTERS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "form": lambda form_data: form_data,
+    "resume": form_from_resume,
+}
+
+
+# ─── Health profiles ────────────────────────────────────────────────────────
+
+# Resume health: a parseable resume starts at 40
+RESUME_HEALTH_BASE = 40
+RESUME_HEALTH_WEIGHTS = (
+    ("Email Address", "email", 10, "Add an email address to the resume"),
+    ("Phone Number", "phone", 10, "Add a phone number to the resume"),
+    ("Education", "education", 20, "Mention your college or degree"),
+    ("Skills", "skills", 20, "List your skills in the resume"),
+)
+
+
+def resume_health_score(form_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Health score of a parsed resume, in calculate_health_score's shape."""
+    score = RESUME_HEALTH_BASE
+    breakdown = [("✅ Parseable Resume", RESUME_HEALTH_BASE)]
+    tips = []
+    for label, field, points, tip in RESUME_HEALTH_WEIGHTS:
+        if form_data.get(field):
+            score += points
+            breakdown.append((f"✅ {label}", points))
+        else:
+            breakdown.append((f"❌ {label}", 0))
+            tips.append(tip)
+    score = min(score, 100)
+    grade, grade_color, grade_emoji = health_grade(score)
+    return {
+        "score": score,
+        "max_score": 100,
+        "percentage": score,
+        "breakdown": breakdown,
+        "tips": tips,
+        "grade": grade,
+        "grade_color": grade_color,
+        "grade_emoji": grade_emoji,
+    }
+
+
+HEALTH_PROFILES: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "form": calculate_health_score,
+    "resume": resume_health_score,
+}
+
+
+# ─── Scoring ────────────────────────────────────────────────────────────────
+
+def score(
+    record: Dict[str, Any], shape: str = "form", **fraud_options
+) -> Dict[str, Any]:
+    """
+    Fraud report and health score for one record of the given shape.
+    fraud_options are passed to run_fraud_check (duplicate_index, memo, ...).
+    Returns {"form_data", "fraud_report", "health_score"}.
+    """
+    form_data = ADAPTERS[shape](record)
+    return {
+        "form_data": form_data,
+        "fraud_report": run_fraud_check(form_data, **fraud_options),
+        "health_score": HEALTH_PROFILES[shape](form_data),
+    }
+
+
+def score_batch(
+    records: Iterable[Dict[str, Any]], shape: str = "form", **fraud_options
+) -> List[Dict[str, Any]]:
+    """score() over many records of one shape; fraud_audit.py drives this
+    across worker processes."""
+    return [score(record, shape, **fraud_options) for record in records]
@@ -0,0 +1,288 @@
+"""
+spoken_forms.py
+Normalizes spoken phone numbers and email addresses in English, Hindi and
+Telugu.
+
+Transcripts come back as words: "nine eight double four ...", "ravi
+underscore kumar at the rate gmail dot com", "नौ आठ चार ...",
+"తొమ్మిది ఎనిమిది ...". Each field has one table, compiled at import,
+mapping word sequences (number words, "double"/"triple", spoken
+punctuation) to their written form. Normalizing a transcript is one pass
+over its tokens: Devanagari and Telugu digits are translated to ASCII, the
+text is split once by a precompiled regex, and at each position the
+longest phrase in the table is taken with a few dict probes.
+
+Usage:
+    python spoken_forms.py check     # run the golden corpus
+    python spoken_forms.py bench     # time both normalizers
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+GOLDEN_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "spoken_forms_golden.jsonl"
+)
+
+# Devanagari (U+0966..) and Telugu (U+0C66..) digits -> ASCII
+_DIGITS = str.maketrans(
+    {chr(base + i): str(i) for base in (0x0966, 0x0C66) for i in range(10)}
+)
+
+# Runs of digits, single symbols, or words (anything else up to a space or
+# symbol, so Indic vowel signs stay inside their word)
+_TOKEN_RE = re.compile(r"\d+|[@._+\-]|[^\s\d@._+\-,;:!?()\[\]\"'।]+")
+
+# Phrase kinds
+_TEXT, _DIGIT, _TENS, _REPEAT = range(4)
+
+
+# ─── Vocabulary ─────────────────────────────────────────────────────────────
+
+DIGIT_WORDS = {
+    # English
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9,
+    # Hindi
+    "शून्य": 0, "सून्य": 0, "एक": 1, "दो": 2, "तीन": 3, "चार": 4,
+    "पांच": 5, "पाँच": 5, "छह": 6, "छः": 6, "छे": 6, "सात": 7,
+    "आठ": 8, "नौ": 9,
+    # Telugu
+    "సున్నా": 0, "సున్న": 0, "ఒకటి": 1, "ఒక్కటి": 1, "రెండు": 2,
+    "మూడు": 3, "నాలుగు": 4, "ఐదు": 5, "అయిదు": 5, "ఆరు": 6, "ఏడు": 7,
+    "ఎనిమిది": 8, "తొమ్మిది": 9,
+}
+
+# Only read as digits where a number is expected (phone), since they are
+# also ordinary words or name fragments
+PHONE_ONLY_DIGIT_WORDS = {
+    # English homophones
+    "oh": 0, "o": 0, "won": 1, "to": 2, "too": 2, "tree": 3, "for": 4,
+    "ate": 8, "niner": 9,
+    # Romanized Hindi
+    "shunya": 0, "shoonya": 0, "sunya": 0, "ek": 1, "do": 2, "teen": 3,
+    "char": 4, "chaar": 4, "panch": 5, "paanch": 5, "chhah": 6, "chhe": 6,
+    "che": 6, "chah": 6, "saat": 7, "sat": 7, "aath": 8, "ath": 8,
+    "nau": 9,
+    # Romanized Telugu
+    "sunna": 0, "okati": 1, "rendu": 2, "moodu": 3, "mudu": 3,
+    "naalugu": 4, "nalugu": 4, "aidu": 5, "ayidu": 5, "aaru": 6, "aru": 6,
+    "edu": 7, "yedu": 7, "enimidi": 8, "yenimidi": 8, "tommidi": 9,
+    "thommidi": 9,
+}
+
+TEEN_WORDS = {
+    "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14,
+    "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18,
+    "nineteen": 19, "दस": 10, "das": 10, "పది": 10, "padi": 10,
+}
+
+TENS_WORDS = {
+    "twenty": 2, "thirty": 3, "forty": 4, "fifty": 5, "sixty": 6,
+    "seventy": 7, "eighty": 8, "ninety": 9,
+}
+
+SCALE_WORDS = {"hundred": "00", "thousand": "000"}
+
+REPEAT_WORDS = {
+    "double": 2, "triple": 3, "dabal": 2, "tripal": 3,
+    "डबल": 2, "ट्रिपल": 3, "డబుల్": 2, "ట్రిపుల్": 3,
+}
+
+EMAIL_SYMBOLS = {
+    # English
+    "at the rate of": "@", "at the rate": "@", "at rate": "@",
+    "at sign": "@", "at symbol": "@", "at": "@",
+    "dot": ".", "period": ".",
+    "underscore": "_", "under score": "_",
+    "hyphen": "-", "dash": "-", "minus": "-", "plus": "+",
+    "space": "",
+    # Hindi
+    "एट द रेट": "@", "ऐट द रेट": "@", "एट": "@", "ऐट": "@",
+    "डॉट": ".", "डोट": ".", "अंडरस्कोर": "_", "अंडर स्कोर": "_",
+    "हाइफ़न": "-", "हाइफन": "-", "डैश": "-",
+    # Telugu
+    "ఎట్ ద రేట్": "@", "ఎట్": "@", "డాట్": ".", "అండర్‌స్కోర్": "_",
+    "అండర్ స్కోర్": "_", "అండర్స్కోర్": "_", "హైఫన్": "-", "డ్యాష్": "-",
+}
+
+# Provider names as Hindi/Telugu transcripts spell them
+EMAIL_WORDS = {
+    "जीमेल": "gmail", "याहू": "yahoo", "आउटलुक": "outlook",
+    "हॉटमेल": "hotmail", "कॉम": "com", "इन": "in",
+    "జీమెయిల్": "gmail", "జిమెయిల్": "gmail", "యాహూ": "yahoo",
+    "ఔట్లుక్": "outlook", "హాట్మెయిల్": "hotmail", "కామ్": "com",
+}
+
+
+# ─── Normalizer ─────────────────────────────────────────────────────────────
+
+class SpokenNormalizer:
+    """Longest-match phrase table applied in one pass over the tokens."""
+
+    def __init__(self, phrases: Dict[str, Tuple[int, object]]):
+        # Single-word phrases are keyed by the word, longer ones by tuple;
+        # _longest[word] is the longest phrase starting with that word, so
+        # most tokens cost a single probe
+        self._phrases = {}
+        self._longest: Dict[str, int] = {}
+        for key, value in phrases.items():
+            words = tuple(_TOKEN_RE.findall(key))
+            if len(words) == 1:
+                self._phrases[words[0]] = value
+            else:
+                self._phrases[words] = value
+                self._longest[words[0]] = max(
+                    self._longest.get(words[0], 1), len(words)
+                )
+
+    def _match(self, tokens: List[str], i: int) -> Tuple[int, object, int]:
+        """(kind, value, tokens consumed) of the longest phrase at i."""
+        token = tokens[i]
+        longest = self._longest.get(token)
+        if longest is not None:
+            for n in range(min(longest, len(tokens) - i), 1, -1):
+                hit = self._phrases.get(tuple(tokens[i:i + n]))
+                if hit is not None:
+                    return hit[0], hit[1], n
+        hit = self._phrases.get(token)
+        if hit is not None:
+            return hit[0], hit[1], 1
+        return _TEXT, token, 1
+
+    def pieces(self, text: str) -> Iterator[Tuple[int, str]]:
+        """(kind, written form) of each spoken unit in text."""
+        tokens = _TOKEN_RE.findall(text.lower().translate(_DIGITS))
+        i, n = 0, len(tokens)
+        repeat = 1
+        while i < n:
+            kind, value, used = self._match(tokens, i)
+            i += used
+            if kind == _REPEAT:
+                repeat = value
+                continue
+            if kind == _TENS:
+                # "ninety eight" -> 98, "ninety" -> 90
+                if i < n:
+                    next_kind, next_value, next_used = self._match(tokens, i)
+                    if next_kind == _DIGIT and len(next_value) == 1 \
+                            and next_value != "0":
+                        value = value[0] + next_value
+                        i += next_used
+                kind = _DIGIT
+            yield kind, value * repeat
+            repeat = 1
+
+    def normalize(self, text: str, sep: str = "") -> str:
+        return sep.join(value for _, value in self.pieces(text))
+
+
+def _number_phrases(include_phone_only: bool) -> Dict[str, Tuple[int, object]]:
+    words = dict(DIGIT_WORDS)
+    if include_phone_only:
+        words.update(PHONE_ONLY_DIGIT_WORDS)
+    phrases = {w: (_DIGIT, str(d)) for w, d in words.items()}
+    phrases.update({w: (_REPEAT, n) for w, n in REPEAT_WORDS.items()})
+    return phrases
+
+
+def _build_phone() -> SpokenNormalizer:
+    phrases = _number_phrases(include_phone_only=True)
+    phrases.update({w: (_DIGIT, str(n)) for w, n in TEEN_WORDS.items()})
+    phrases.update({w: (_TENS, f"{d}0") for w, d in TENS_WORDS.items()})
+    phrases.update({w: (_DIGIT, z) for w, z in SCALE_WORDS.items()})
+    return SpokenNormalizer(phrases)
+
+
+def _build_email() -> SpokenNormalizer:
+    phrases = _number_phrases(include_phone_only=False)
+    phrases.update({w: (_TEXT, s) for w, s in EMAIL_WORDS.items()})
+    phrases.update({w: (_TEXT, s) for w, s in EMAIL_SYMBOLS.items()})
+    return SpokenNormalizer(phrases)
+
+
+PHONE_NORMALIZER = _build_phone()
+EMAIL_NORMALIZER = _build_email()
+
+_NON_DIGITS = re.compile(r"\D")
+
+
+def normalize_phone(text: str) -> str:
+    """Digits of a spoken phone number; the last 10 if there are more."""
+    digits = _NON_DIGITS.sub("", PHONE_NORMALIZER.normalize(text))
+    return digits[-10:] if len(digits) >= 10 else digits
+
+
+def normalize_email(text: str) -> str:
+    """Written form of a spoken email address (lowercase, no spaces)."""
+    return EMAIL_NORMALIZER.normalize(text).strip(".")
+
+
+NORMALIZERS = {"phone": normalize_phone, "email": normalize_email}
+
+
+# ─── Golden corpus / benchmark ──────────────────────────────────────────────
+
+def load_golden(path: str = GOLDEN_PATH) -> List[Dict[str, str]]:
+    """Cases {"field", "lang", "input", "expected"} from the JSONL corpus."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def check_golden(path: str = GOLDEN_PATH) -> List[Tuple[Dict[str, str], str]]:
+    """(case, actual output) for every golden case that does not match."""
+    failures = []
+    for case in load_golden(path):
+        actual = NORMALIZERS[case["field"]](case["input"])
+        if actual != case["expected"]:
+            failures.append((case, actual))
+    return failures
+
+
+def _bench(path: str = GOLDEN_PATH, rounds: int = 2000):
+    cases = load_golden(path)
+    for field, normalize in NORMALIZERS.items():
+        inputs = [c["input"] for c in cases if c["field"] == field]
+        if not inputs:
+            continue
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for text in inputs:
+                normalize(text)
+        elapsed = time.perf_counter() - start
+        calls = rounds * len(inputs)
+        print(f"{field:<6} {calls:>9,} calls  "
+              f"{elapsed / calls * 1e6:6.2f} µs/call")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Spoken phone/email normalizer tooling."
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("check", "Run the golden corpus"),
+                            ("bench", "Time both normalizers")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--corpus", default=GOLDEN_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == "bench":
+        _bench(args.corpus)
+        return 0
+    failures = check_golden(args.corpus)
+    for case, actual in failures:
+        print(f"[{case['field']}/{case['lang']}] {case['input']!r}: "
+              f"expected {case['expected']!r}, got {actual!r}")
+    total = len(load_golden(args.corpus))
+    print(f"{total - len(failures)}/{total} golden cases pass",
+          file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
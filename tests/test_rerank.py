@@ -0,0 +1,70 @@
+"""
+test_rerank.py
+voice.rerank: the grammar overrides the recognizer only when its top
+hypothesis is not a valid answer for the field.
+"""
+
+from voice import field_grammars, rerank
+
+GRAMMARS = field_grammars()
+
+
+def transcription(*alternatives):
+    """Successful transcription with (text, confidence) alternatives."""
+    return {
+        "status": "success",
+        "text": alternatives[0][0],
+        "alternatives": [
+            {"text": text, "confidence": confidence}
+            for text, confidence in alternatives
+        ],
+    }
+
+
+def test_valid_top_phone_is_kept_over_unscored_alternative():
+    result = rerank("phone", transcription(
+        ("98765 43210", 0.62), ("98765 43211", None),
+    ), GRAMMARS)
+    assert result["text"] == "98765 43210"
+    assert result["rerank"]["chosen"] == 0
+    assert not result["rerank"]["rescued"]
+
+
+def test_valid_top_name_is_kept_over_unscored_alternative():
+    result = rerank("name", transcription(
+        ("Ravi Kumar", 0.55), ("Ravi Kumaar", None), ("Ravi Kumaran", None),
+    ), GRAMMARS)
+    assert result["text"] == "Ravi Kumar"
+    assert result["rerank"]["chosen"] == 0
+
+
+def test_invalid_top_is_rescued_by_valid_alternative():
+    result = rerank("phone", transcription(
+        ("98765 4321", 0.9), ("98765 43210", None),
+    ), GRAMMARS)
+    assert result["text"] == "98765 43210"
+    assert result["rerank"] == {
+        "chosen": 1, "candidates": 2, "valid": True, "rescued": True,
+    }
+
+
+def test_unscored_alternatives_keep_recognizer_order():
+    result = rerank("phone", transcription(
+        ("call me", 0.8), ("98765 43210", None), ("98765 43211", None),
+    ), GRAMMARS)
+    assert result["text"] == "98765 43210"
+
+
+def test_nothing_valid_keeps_top_hypothesis():
+    result = rerank("phone", transcription(
+        ("hello", 0.7), ("hello there", None),
+    ), GRAMMARS)
+    assert result["text"] == "hello"
+    assert result["rerank"]["valid"] is False
+
+
+def test_results_that_cannot_be_reranked_are_unchanged():
+    failed = {"status": "error", "text": "", "message": "boom"}
+    assert rerank("phone", failed, GRAMMARS) is failed
+    other = transcription(("anything", 0.5))
+    assert rerank("gender", other, GRAMMARS) is other
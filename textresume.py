@@ -43,7 +43,7 @@ CERTIFICATIONS
 AWS Certified Solutions Architect
 Google Cloud Professional Data Engineer
 
-Aadhaar: 2345 6789 0123"""
+Aadhaar: 3947 6182 0753"""
 
     # Manually construct a valid PDF
     lines = resume_text.split('\n')
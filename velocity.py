@@ -0,0 +1,203 @@
+"""
+velocity.py
+Sliding-window velocity limits for registrations per phone, email, session
+and device.
+
+Counts are kept in fixed time buckets (default: 12 x 5 minutes = 1 hour),
+so recording an event and reading a key's windowed count are both O(1)
+(bounded by the bucket count) and old buckets expire on their own.
+
+VelocityLimiter keeps everything in memory with an LRU bound on the number
+of keys; SqliteVelocityLimiter stores the buckets in SQLite (WAL mode) so
+several app processes share the same counters.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from duplicate_index import hash_identifier
+
+DEFAULT_VELOCITY_PATH = os.environ.get(
+    "DEET_VELOCITY_DB", "deet_velocity.db"
+)
+
+WINDOW_SECONDS = 3600
+BUCKET_SECONDS = 300
+
+# Registrations allowed per window before further ones are flagged
+DEFAULT_LIMITS = {
+    "phone": 3,
+    "email": 3,
+    "session": 3,
+    "device": 10,
+}
+
+KEY_LABELS = {
+    "phone": "this phone number",
+    "email": "this email address",
+    "session": "this browser session",
+    "device": "this device/IP address",
+}
+
+
+def velocity_key(kind: str, value: Any) -> Optional[str]:
+    """Hashed counter key for an identifier, or None if it is empty."""
+    digest = hash_identifier(kind, value)
+    return f"{kind}:{digest.hex()}" if digest else None
+
+
+class VelocityLimiter:
+    """In-memory sliding-window counters with bounded memory."""
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, int]] = None,
+        window_seconds: int = WINDOW_SECONDS,
+        bucket_seconds: int = BUCKET_SECONDS,
+        max_keys: int = 100_000,
+    ):
+        self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.num_buckets = max(1, window_seconds // bucket_seconds)
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        # key -> [epochs list, counts list]; epochs mark which bucket
+        # period each ring slot currently holds
+        self._rings = OrderedDict()
+
+    def _epoch(self, now: Optional[float]) -> int:
+        return int((time.time() if now is None else now) // self.bucket_seconds)
+
+    def record(self, kind: str, value: Any, now: Optional[float] = None):
+        key = velocity_key(kind, value)
+        if key is None:
+            return
+        epoch = self._epoch(now)
+        slot = epoch % self.num_buckets
+        with self._lock:
+            ring = self._rings.get(key)
+            if ring is None:
+                ring = [[-1] * self.num_buckets, [0] * self.num_buckets]
+                self._rings[key] = ring
+                if len(self._rings) > self.max_keys:
+                    self._rings.popitem(last=False)
+            else:
+                self._rings.move_to_end(key)
+            epochs, counts = ring
+            if epochs[slot] != epoch:
+                epochs[slot] = epoch
+                counts[slot] = 0
+            counts[slot] += 1
+
+    def count(self, kind: str, value: Any, now: Optional[float] = None) -> int:
+        key = velocity_key(kind, value)
+        if key is None:
+            return 0
+        oldest = self._epoch(now) - self.num_buckets + 1
+        with self._lock:
+            ring = self._rings.get(key)
+            if ring is None:
+                return 0
+            epochs, counts = ring
+            total = sum(c for e, c in zip(epochs, counts) if e >= oldest)
+            if total == 0:
+                # Fully expired: drop the key
+                del self._rings[key]
+            return total
+
+    def record_many(self, keys: Dict[str, Any], now: Optional[float] = None):
+        for kind, value in keys.items():
+            self.record(kind, value, now)
+
+    def exceeded(
+        self, keys: Dict[str, Any], now: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """Keys whose windowed count has reached their limit."""
+        hits = []
+        for kind, value in keys.items():
+            limit = self.limits.get(kind)
+            if limit is None:
+                continue
+            count = self.count(kind, value, now)
+            if count >= limit:
+                hits.append({"kind": kind, "count": count, "limit": limit})
+        return hits
+
+
+class SqliteVelocityLimiter(VelocityLimiter):
+    """VelocityLimiter whose buckets live in SQLite, shared by processes."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_VELOCITY_PATH,
+        limits: Optional[Dict[str, int]] = None,
+        window_seconds: int = WINDOW_SECONDS,
+        bucket_seconds: int = BUCKET_SECONDS,
+        timeout: float = 5.0,
+    ):
+        super().__init__(limits, window_seconds, bucket_seconds)
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._last_purge = 0.0
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS velocity ("
+            " key TEXT NOT NULL,"
+            " bucket INTEGER NOT NULL,"
+            " count INTEGER NOT NULL,"
+            " PRIMARY KEY (key, bucket)"
+            ") WITHOUT ROWID"
+        )
+        self._conn().execute(
+            "CREATE INDEX IF NOT EXISTS velocity_bucket ON velocity (bucket)"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path, timeout=self.timeout, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _purge(self, epoch: int):
+        # Expire old buckets at most once per bucket period
+        if time.time() - self._last_purge < self.bucket_seconds:
+            return
+        self._last_purge = time.time()
+        self._conn().execute(
+            "DELETE FROM velocity WHERE bucket < ?",
+            (epoch - self.num_buckets + 1,),
+        )
+
+    def record(self, kind: str, value: Any, now: Optional[float] = None):
+        key = velocity_key(kind, value)
+        if key is None:
+            return
+        epoch = self._epoch(now)
+        self._conn().execute(
+            "INSERT INTO velocity (key, bucket, count) VALUES (?, ?, 1) "
+            "ON CONFLICT (key, bucket) DO UPDATE SET count = count + 1",
+            (key, epoch),
+        )
+        self._purge(epoch)
+
+    def count(self, kind: str, value: Any, now: Optional[float] = None) -> int:
+        key = velocity_key(kind, value)
+        if key is None:
+            return 0
+        oldest = self._epoch(now) - self.num_buckets + 1
+        row = self._conn().execute(
+            "SELECT COALESCE(SUM(count), 0) FROM velocity "
+            "WHERE key = ? AND bucket >= ?",
+            (key, oldest),
+        ).fetchone()
+        return row[0]
@@ -0,0 +1,406 @@
+"""
+vocab_resolver.py
+Resolves spoken answers to the closed vocabularies of the registration form
+(gender, education level, district, skills).
+
+Every vocabulary is compiled once into three lookups over its aliases:
+  - exact: the alias' normalized spelling
+  - phonetic: a consonant-skeleton key that survives the usual
+    transcription drift (aspiration, vowel length, doubled letters,
+    "node js" vs "Node.js")
+  - fuzzy: an inverted index of character trigrams, scored by Dice overlap
+
+Hindi and Telugu transcripts are transliterated to Latin letters first, so
+"నల్గొండ" or "पाइथन" meet "Nalgonda" and "Python" in the same keys;
+words that differ between languages ("mahila", "दसवीं") are explicit
+aliases. resolve() ranks the candidates for one phrase; find() picks the
+best non-overlapping matches out of a whole answer ("I know node js and
+power bi"). Both are dictionary lookups over a handful of word windows and
+take well under a millisecond.
+
+A fuzzy match is ambiguous when a runner-up scores within TIE_MARGIN of it,
+or when the heard words are part of both entries ("warangal" for Warangal
+Rural / Warangal Urban); Candidate.ties then lists the other entries so
+callers can ask the user instead of picking one silently.
+"""
+
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+GENDERS = ["Male", "Female", "Transgender", "Other"]
+
+# Canonical value -> extra spoken forms, in any of the three languages
+GENDER_ALIASES = {
+    "Male": ["male", "man", "boy", "gents", "purush", "पुरुष", "मर्द",
+             "పురుషుడు", "మగ"],
+    "Female": ["female", "woman", "girl", "lady", "mahila", "stree",
+               "महिला", "स्त्री", "औरत", "స్త్రీ", "మహిళ", "ఆడ"],
+    "Transgender": ["transgender", "trans", "kinnar", "किन्नर",
+                    "ట్రాన్స్‌జెండర్", "హిజ్రా"],
+    "Other": ["other", "anya", "अन्य", "ఇతర", "ఇతరులు"],
+}
+
+_PG = "Post Graduate (M.Tech/ME/MBA/MCA/MSc/MA/MCom)"
+_UG = "Undergraduate (B.Tech/BE/BBA/BCA/BSc/BA/BCom)"
+
+EDUCATION_ALIASES = {
+    "PhD": ["phd", "p h d", "doctorate", "पीएचडी", "పీహెచ్‌డీ"],
+    _PG: ["post graduate", "postgraduate", "post graduation", "masters",
+          "master", "pg", "m tech", "स्नातकोत्तर", "पोस्ट ग्रेजुएशन",
+          "పీజీ", "పోస్ట్ గ్రాడ్యుయేషన్"],
+    _UG: ["undergraduate", "graduate", "graduation", "bachelors",
+          "bachelor", "degree", "b tech", "engineering", "स्नातक",
+          "ग्रेजुएशन", "డిగ్రీ", "ఇంజనీరింగ్"],
+    "Diploma": ["diploma", "polytechnic", "पॉलिटेक्निक", "పాలిటెక్నిక్"],
+    "Intermediate/12th": ["intermediate", "inter", "12th", "twelfth",
+                          "plus two", "बारहवीं", "इंटर", "ఇంటర్",
+                          "ఇంటర్మీడియట్"],
+    "SSC/10th": ["ssc", "10th", "tenth", "matriculation", "matric",
+                 "दसवीं", "मैट्रिक", "పదవ తరగతి", "టెన్త్"],
+    "ITI": ["iti", "i t i", "आईटीआई", "ఐటీఐ"],
+    "Below 10th": ["below 10th", "below tenth", "less than 10th",
+                   "no schooling", "दसवीं से कम", "పదవ తరగతి కంటే తక్కువ"],
+    "Other": ["other", "anya"],
+}
+
+DISTRICT_ALIASES = {
+    "Rangareddy": ["ranga reddy"],
+    "Medchal-Malkajgiri": ["medchal", "malkajgiri"],
+    "Warangal Urban": ["hanamkonda", "hanumakonda"],
+    "Kumuram Bheem": ["asifabad", "komaram bheem"],
+    "Bhadradri Kothagudem": ["kothagudem", "bhadrachalam"],
+    "Yadadri Bhuvanagiri": ["bhongir", "bhuvanagiri"],
+    "Jayashankar Bhupalpally": ["bhupalpally", "bhupalpalli"],
+    "Jogulamba Gadwal": ["gadwal"],
+    "Rajanna Sircilla": ["sircilla", "siricilla"],
+    "Jangaon": ["jangaon", "janagama"],
+}
+
+SKILL_ALIASES = {
+    "JavaScript": ["java script", "js"],
+    "Node.js": ["node", "node js", "nodejs"],
+    "React": ["react js", "reactjs"],
+    "SQL": ["sequel", "my sql", "mysql"],
+    "HTML/CSS": ["html", "css"],
+    "Machine Learning": ["ml"],
+    "Power BI": ["powerbi", "power b i"],
+    "AWS": ["amazon web services", "a w s"],
+    "MS Office": ["microsoft office", "ms word", "word", "powerpoint"],
+    "Excel": ["ms excel", "microsoft excel"],
+    "AutoCAD": ["auto cad"],
+    "Tally": ["tally erp", "टैली", "టాలీ"],
+    "Communication": ["communication skills"],
+}
+
+# Separators between items of a multi-valued answer
+_LIST_SPLIT = re.compile(
+    r"[,;&]|\b(?:and|also|aur)\b|और|మరియు|ఇంకా", re.IGNORECASE
+)
+
+MIN_CONFIDENCE = 0.75
+_MIN_TRIGRAM = 0.3      # weaker fuzzy hits are not worth ranking
+_PHONETIC_SCORE = 0.9
+_MIN_KEY_LEN = 3        # shorter phonetic keys collide too often
+TIE_MARGIN = 0.05       # runners-up this close make a match ambiguous
+
+
+class Candidate(NamedTuple):
+    value: str          # canonical vocabulary entry
+    confidence: float   # 0..1
+    heard: str          # the words it was matched from
+    ties: Tuple[str, ...] = ()  # other entries about as likely
+
+    @property
+    def ambiguous(self) -> bool:
+        return bool(self.ties)
+
+
+# ─── Transliteration / keys ─────────────────────────────────────────────────
+
+def _script_tables():
+    consonants, vowels, signs = {}, {}, {}
+    # Devanagari
+    consonants.update(zip(
+        "कखगघङचछजझञटठडढणतथदधनपफबभमयरलवशषसह",
+        "k kh g gh n ch chh j jh n t th d dh n t th d dh n p ph b bh m y r "
+        "l v sh sh s h".split(),
+    ))
+    vowels.update(zip("अआइईउऊऋएऐओऔ",
+                      "a aa i ii u uu ri e ai o au".split()))
+    signs.update(zip("ािीुूृेैो", "aa i ii u uu ri e ai o".split()))
+    signs["ौ"] = "au"
+    # Telugu
+    consonants.update(zip(
+        "కఖగఘఙచఛజఝఞటఠడఢణతథదధనపఫబభమయరఱలళవశషసహ",
+        "k kh g gh n ch chh j jh n t th d dh n t th d dh n p ph b bh m y r r "
+        "l l v sh sh s h".split(),
+    ))
+    vowels.update(zip("అఆఇఈఉఊఋఎఏఐఒఓఔ",
+                      "a aa i ii u uu ri e ee ai o oo au".split()))
+    signs.update(zip("ాిీుూృెేైొోౌ", "aa i ii u uu ri e ee ai o oo au".split()))
+    return consonants, vowels, signs
+
+
+_CONSONANTS, _VOWELS, _SIGNS = _script_tables()
+_VIRAMAS = {"्", "్"}
+_IGNORED = {"़", "‌", "‍"}   # nukta, ZWNJ, ZWJ
+# Anusvara/chandrabindu/visarga follow the inherent vowel; the nasal is
+# "m" before a labial or at the end of a word, "n" elsewhere
+_NASALS = {"ं": "\0", "ँ": "\0", "ం": "\0", "ः": "h", "ః": "h"}
+_NASAL_RE = re.compile(r"\0(?=[pbm]|$|[^a-z])")
+
+
+def transliterate(text: str) -> str:
+    """Rough Latin spelling of Devanagari/Telugu text (others unchanged)."""
+    if text.isascii():
+        return text
+    out = []
+    pending_a = False   # inherent vowel of the last consonant
+    for ch in text:
+        if ch in _NASALS:
+            if pending_a:
+                out.append("a")
+                pending_a = False
+            out.append(_NASALS[ch])
+            continue
+        if ch in _SIGNS:
+            out.append(_SIGNS[ch])
+            pending_a = False
+            continue
+        if ch in _VIRAMAS:
+            pending_a = False
+            continue
+        if ch in _IGNORED:
+            continue
+        if pending_a:
+            out.append("a")
+            pending_a = False
+        if ch in _CONSONANTS:
+            out.append(_CONSONANTS[ch])
+            pending_a = True
+        else:
+            out.append(_VOWELS.get(ch, ch))
+    if pending_a:
+        out.append("a")
+    return _NASAL_RE.sub("m", "".join(out)).replace("\0", "n")
+
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+_SOUNDS = {
+    "chh": "c", "ch": "c", "sh": "s", "th": "t", "dh": "d", "bh": "b",
+    "ph": "f", "kh": "k", "gh": "g", "ck": "k", "aa": "a", "ee": "i",
+    "ii": "i", "oo": "u", "uu": "u", "ou": "u", "q": "k", "x": "ks",
+    "z": "j", "w": "v", "ce": "se", "ci": "si",
+}
+_SOUNDS_RE = re.compile("|".join(sorted(_SOUNDS, key=len, reverse=True)))
+_DOUBLES = re.compile(r"(.)\1+")
+_VOWELS_RE = re.compile(r"[aeiouyh]")
+
+
+def normalize(text: str) -> str:
+    """Lowercase Latin words separated by single spaces."""
+    return _NON_WORD.sub(" ", transliterate(text.lower())).strip()
+
+
+def sound_form(normalized: str) -> str:
+    """Spelling with common transcription variants folded together and
+    word breaks removed ("Node.js" and "node js" -> "nodejs")."""
+    joined = normalized.replace(" ", "")
+    return _DOUBLES.sub(r"\1", _SOUNDS_RE.sub(lambda m: _SOUNDS[m.group()], joined))
+
+
+def phonetic_key(normalized: str) -> str:
+    """First letter plus the consonant skeleton of sound_form()."""
+    form = sound_form(normalized)
+    skeleton = _VOWELS_RE.sub("", form[1:]).replace("mn", "n")
+    return form[:1] + _DOUBLES.sub(r"\1", skeleton)
+
+
+def _trigrams(form: str) -> set:
+    padded = f"${form}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# ─── Vocabulary ─────────────────────────────────────────────────────────────
+
+def _derived_aliases(value: str) -> List[str]:
+    """Spellings implied by the entry itself: without the parenthetical,
+    and each "/"-separated part ("Intermediate/12th" -> "12th")."""
+    base = re.sub(r"\(.*?\)", " ", value)
+    parts = [value, base]
+    for group in re.findall(r"\((.*?)\)", value) + [base]:
+        parts.extend(group.split("/"))
+    # Very short parts ("BA", "ME") are ordinary words when spoken
+    return [p for p in parts if len(normalize(p).replace(" ", "")) >= 3]
+
+
+class Vocabulary:
+    """One closed vocabulary compiled for exact, phonetic and fuzzy lookup."""
+
+    def __init__(
+        self,
+        values: Iterable[str],
+        aliases: Optional[Dict[str, Iterable[str]]] = None,
+        word_aliases: bool = False,
+    ):
+        """
+        word_aliases: also accept any word of a multi-word entry that no
+        other entry contains ("Sircilla" for "Rajanna Sircilla").
+        """
+        self.values = [v for v in values if v]
+        aliases = aliases or {}
+        spoken: Dict[str, set] = defaultdict(set)
+        for value in self.values:
+            for alias in _derived_aliases(value) + list(aliases.get(value, ())):
+                spoken[value].add(normalize(alias))
+        if word_aliases:
+            owners = defaultdict(set)
+            for value in self.values:
+                for word in normalize(value).split():
+                    owners[word].add(value)
+            for word, values_ in owners.items():
+                if len(values_) == 1 and len(word) >= 4:
+                    spoken[next(iter(values_))].add(word)
+
+        self._exact: Dict[str, str] = {}
+        self._phonetic: Dict[str, set] = defaultdict(set)
+        self._forms: List[tuple] = []            # (value, form, trigram count)
+        self._index: Dict[str, List[int]] = defaultdict(list)
+        self.max_words = 1
+        for value in self.values:
+            for alias in spoken[value]:
+                if not alias:
+                    continue
+                form = sound_form(alias)
+                self._exact.setdefault(form, value)
+                key = phonetic_key(alias)
+                if len(key) >= _MIN_KEY_LEN:
+                    self._phonetic[key].add(value)
+                grams = _trigrams(form)
+                for gram in grams:
+                    self._index[gram].append(len(self._forms))
+                self._forms.append((value, form, len(grams)))
+                self.max_words = max(self.max_words, len(alias.split()))
+
+    def _resolve_normalized(self, phrase: str, limit: int) -> List[Candidate]:
+        form = sound_form(phrase)
+        if not form:
+            return []
+        exact = self._exact.get(form)
+        if exact is not None:
+            return [Candidate(exact, 1.0, phrase)]
+
+        scores: Dict[str, float] = {}
+        key = phonetic_key(phrase)
+        if len(key) >= _MIN_KEY_LEN:
+            for value in self._phonetic.get(key, ()):
+                scores[value] = _PHONETIC_SCORE
+        grams = _trigrams(form)
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for i in self._index.get(gram, ()):
+                shared[i] += 1
+        containing = set()      # entries with an alias that contains form
+        for i, count in shared.items():
+            value, alias_form, size = self._forms[i]
+            dice = 2.0 * count / (len(grams) + size)
+            if dice >= _MIN_TRIGRAM and dice > scores.get(value, 0.0):
+                scores[value] = dice
+            if form in alias_form:
+                containing.add(value)
+        ranked = sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))
+        ties = ()
+        if ranked:
+            top, top_score = ranked[0]
+            ties = tuple(
+                value for value, score in ranked[1:]
+                if top_score - score <= TIE_MARGIN
+                or (top in containing and value in containing)
+            )
+        return [
+            Candidate(value, round(score, 3), phrase, ties if i == 0 else ())
+            for i, (value, score) in enumerate(ranked[:limit])
+        ]
+
+    def resolve(self, phrase: str, limit: int = 3) -> List[Candidate]:
+        """Ranked candidates for a phrase naming one entry."""
+        return self._resolve_normalized(normalize(phrase), limit)
+
+    def best(self, text: str, min_confidence: float = MIN_CONFIDENCE
+             ) -> Optional[Candidate]:
+        """Most confident entry mentioned anywhere in text, or None (check
+        .ambiguous before using it unasked)."""
+        matches = self.find(text, min_confidence)
+        return max(matches, key=lambda c: c.confidence) if matches else None
+
+    def find(self, text: str, min_confidence: float = MIN_CONFIDENCE
+             ) -> List[Candidate]:
+        """
+        Entries mentioned in a free-form answer, in spoken order. Every
+        window of up to max_words words is resolved; the most confident
+        non-overlapping windows win, one match per entry. Ambiguous matches
+        carry their ties.
+        """
+        found = []          # (position in the answer, candidate)
+        offset = 0
+        for chunk in _LIST_SPLIT.split(text):
+            words = normalize(chunk).split()
+            hits = []
+            for start in range(len(words)):
+                for size in range(1, min(self.max_words, len(words) - start) + 1):
+                    phrase = " ".join(words[start:start + size])
+                    top = self._resolve_normalized(phrase, 1)
+                    if top and top[0].confidence >= min_confidence:
+                        # Prefer confident, then longer matches
+                        hits.append((-top[0].confidence, -size, start, top[0]))
+            taken = set()
+            for _, neg_size, start, candidate in sorted(hits):
+                span = set(range(start, start - neg_size))
+                if span & taken:
+                    continue
+                taken |= span
+                found.append((offset + start, candidate))
+            offset += len(words)
+        found.sort(key=lambda hit: hit[0])
+        ordered, seen = [], set()
+        for _, candidate in found:
+            if candidate.value not in seen:
+                seen.add(candidate.value)
+                ordered.append(candidate)
+        return ordered
+
+
+# ─── Form vocabularies ──────────────────────────────────────────────────────
+
+class VocabularyResolver:
+    """The form's closed vocabularies by field name."""
+
+    def __init__(self, vocabularies: Dict[str, Vocabulary]):
+        self.vocabularies = vocabularies
+
+    def resolve(self, field: str, phrase: str, limit: int = 3) -> List[Candidate]:
+        return self.vocabularies[field].resolve(phrase, limit)
+
+    def best(self, field: str, text: str,
+             min_confidence: float = MIN_CONFIDENCE) -> Optional[Candidate]:
+        return self.vocabularies[field].best(text, min_confidence)
+
+    def find(self, field: str, text: str,
+             min_confidence: float = MIN_CONFIDENCE) -> List[Candidate]:
+        return self.vocabularies[field].find(text, min_confidence)
+
+
+def build_resolver(
+    education_options: Sequence[str] = tuple(EDUCATION_ALIASES),
+    districts: Sequence[str] = (),
+    skills: Sequence[str] = (),
+    genders: Sequence[str] = GENDERS,
+) -> VocabularyResolver:
+    """Resolver for the form's option lists (app.py passes its constants)."""
+    return VocabularyResolver({
+        "gender": Vocabulary(genders, GENDER_ALIASES),
+        "education": Vocabulary(education_options, EDUCATION_ALIASES),
+        "location": Vocabulary(districts, DISTRICT_ALIASES, word_aliases=True),
+        "skills": Vocabulary(skills, SKILL_ALIASES),
+    })
@@ -1,4 +1,13 @@
+import hashlib
+import os
 import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from spoken_forms import normalize_email, normalize_phone
+from vocab_resolver import build_resolver
 
 LANGUAGE_MAP = {
     "English": "en-US",
@@ -53,6 +62,13 @@ def check_dependencies():
     except ImportError:
         pass
 
+    # Offline engine for centers without connectivity
+    try:
+        import faster_whisper
+        return True, "Local offline speech recognition available"
+    except ImportError:
+        pass
+
     # Even without speech_recognition, we can use OpenAI Whisper API
     try:
         import openai
@@ -80,230 +96,1327 @@ def get_prompt(field_key, language="English"):
     return PROMPTS.get(field_key, {}).get(language, f"Please say your {field_key}")
 
 
-def transcribe_audio(audio_bytes, language="English", api_key=None):
+# ─── ASR Metrics ─────────────────────────────────────────────────────────
+
+_metrics_lock = threading.Lock()
+_metrics = {}
+
+
+def _wav_seconds(audio_bytes):
+    """Duration of WAV audio, or None if it is not a readable WAV."""
+    import io
+    import wave
+    try:
+        with wave.open(io.BytesIO(audio_bytes)) as w:
+            return w.getnframes() / float(w.getframerate())
+    except Exception:
+        return None
+
+
+def _record_call(backend, latency_ms, ok, retries=0, audio_seconds=None):
+    with _metrics_lock:
+        m = _metrics.get(backend)
+        if m is None:
+            m = _metrics[backend] = {
+                "calls": 0, "successes": 0, "failures": 0, "retries": 0,
+                "latencies_ms": deque(maxlen=1000), "rtf": deque(maxlen=1000),
+            }
+        m["calls"] += 1
+        m["successes" if ok else "failures"] += 1
+        m["retries"] += retries
+        m["latencies_ms"].append(latency_ms)
+        if audio_seconds:
+            m["rtf"].append(latency_ms / 1000.0 / audio_seconds)
+
+
+def _percentiles(values):
+    values = sorted(values)
+    if not values:
+        return 0.0, 0.0, 0.0
+    return (
+        sum(values) / len(values),
+        values[len(values) // 2],
+        values[min(len(values) - 1, int(len(values) * 0.95))],
+    )
+
+
+def asr_metrics(backend=None):
     """
-    Transcribe audio bytes to text.
-    Tries OpenAI Whisper API first (if key provided),
-    then falls back to Google Speech Recognition.
+    Per-backend call counts, retries, latency and real-time factor
+    (processing time / audio duration) percentiles over recent calls.
     """
-    result = {"status": "error", "text": "", "message": ""}
+    with _metrics_lock:
+        snapshot = {
+            name: (dict(m), list(m["latencies_ms"]), list(m["rtf"]))
+            for name, m in _metrics.items()
+            if backend is None or name == backend
+        }
+    out = {}
+    for name, (m, latencies, rtf) in snapshot.items():
+        stats = {k: m[k] for k in ("calls", "successes", "failures", "retries")}
+        stats["mean_ms"], stats["p50_ms"], stats["p95_ms"] = _percentiles(latencies)
+        stats["mean_rtf"], stats["p50_rtf"], stats["p95_rtf"] = _percentiles(rtf)
+        stats["circuit"] = circuit_state(name)
+        out[name] = stats
+    if backend is not None:
+        return out.get(backend, {})
+    return out
 
-    if not audio_bytes:
-        result["message"] = "No audio received"
-        return result
 
-    # ── Method 1: OpenAI Whisper API ─────────────────────────────────
-    if api_key:
+def whisper_metrics():
+    """asr_metrics() of the OpenAI Whisper API backend."""
+    return asr_metrics("whisper_api")
+
+
+# ─── Circuit Breakers ────────────────────────────────────────────────────
+
+BREAKER_FAILURES = 3        # consecutive failures that open the circuit
+BREAKER_RESET_SECONDS = 30.0
+
+
+class CircuitBreaker:
+    """
+    Skips a backend after repeated failures. Closed until
+    `failure_threshold` consecutive failures, then open (calls refused) for
+    `reset_after` seconds, then half-open: one trial call is let through
+    and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=BREAKER_FAILURES,
+                 reset_after=BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self._opened_at = None
+        self._trial_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_after:
+                return "half-open"
+            return "open"
+
+    def allow(self):
+        """Whether a call may go to the backend now."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self._opened_at < self.reset_after:
+                return False
+            # One trial at a time; a trial that never reports back expires
+            if self._trial_at is None or now - self._trial_at >= self.reset_after:
+                self._trial_at = now
+                return True
+            return False
+
+    def release(self):
+        """Give back a trial slot whose call said nothing about the backend
+        (it was cancelled, or the request itself was bad)."""
+        with self._lock:
+            self._trial_at = None
+
+    def record(self, ok):
+        with self._lock:
+            self._trial_at = None
+            if ok:
+                self.failures = 0
+                self._opened_at = None
+                return
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def circuit_breaker(key):
+    """Process-wide CircuitBreaker for a backend's breaker_key."""
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker()
+        return breaker
+
+
+def circuit_state(backend):
+    """Worst circuit state over every breaker of a backend name (one per
+    credential for keyed backends)."""
+    with _breakers_lock:
+        breakers = [b for key, b in _breakers.items()
+                    if key == backend or key.startswith(backend + ":")]
+    states = {b.state for b in breakers}
+    for state in ("open", "half-open"):
+        if state in states:
+            return state
+    return "closed"
+
+
+def _is_outage(error):
+    """
+    Whether a failed call means the service is failing (timeout, connection
+    error, HTTP 5xx) rather than this request (a wrong API key, a bad
+    clip). Only outages count towards opening a circuit.
+    """
+    from urllib.error import HTTPError, URLError
+
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        status = getattr(error, "status_code", None)
+        if status is None and isinstance(error, HTTPError):
+            status = error.code
+        if isinstance(status, int):
+            return status >= 500
+        if isinstance(error, (TimeoutError, ConnectionError, URLError)):
+            return True
         try:
             import openai
-            import tempfile
-            import os
+            if isinstance(error, openai.APIConnectionError):
+                return True
+        except ImportError:
+            pass
+        error = error.__cause__ or error.__context__
+    return False
+
+
+# ─── Audio Preprocessing ─────────────────────────────────────────────────
+# Browser recordings are large WAVs (44.1/48 kHz, often stereo) with silence
+# at both ends. Recognizers work at 16 kHz mono, so converting, trimming and
+# optionally compressing before the call shrinks uploads several times over.
+
+PREPROCESS_SAMPLE_RATE = 16000
+PREPROCESS_TARGET_DBFS = -20.0
+PREPROCESS_PEAK_DBFS = -1.0
+PREPROCESS_SILENCE_DB = 16      # below the clip's average loudness
+PREPROCESS_KEEP_MS = 150        # silence kept at each end
+
+# Compact upload codec for backends that accept it: "ogg" (Opus), "mp3" or
+# "flac". Encoding needs ffmpeg; without it clips are sent as 16 kHz WAV.
+PREPROCESS_CODEC = os.environ.get("DEET_ASR_CODEC") or None
+
+_CODECS = {
+    "ogg": {"format": "ogg", "codec": "libopus", "bitrate": "24k"},
+    "mp3": {"format": "mp3", "bitrate": "32k"},
+    "flac": {"format": "flac"},
+}
+
+_AUDIO_FORMATS = (
+    (b"RIFF", "wav", "audio/wav"),
+    (b"fLaC", "flac", "audio/flac"),
+    (b"OggS", "ogg", "audio/ogg"),
+    (b"ID3", "mp3", "audio/mpeg"),
+    (b"\xff\xfb", "mp3", "audio/mpeg"),
+    (b"\xff\xf3", "mp3", "audio/mpeg"),
+)
+
+_preprocess_lock = threading.Lock()
+_preprocess_stats = deque(maxlen=1000)
+
+
+def _audio_format(audio_bytes):
+    """(extension, MIME type) from the container's magic bytes."""
+    for magic, ext, mime in _AUDIO_FORMATS:
+        if audio_bytes.startswith(magic):
+            return ext, mime
+    return "wav", "audio/wav"
+
+
+def preprocess_audio(audio_bytes, codec=None,
+                     sample_rate=PREPROCESS_SAMPLE_RATE):
+    """
+    Downmix to mono, resample, trim leading/trailing silence, normalize
+    loudness and (if `codec` is set and ffmpeg is available) compress.
+    Returns (audio bytes, info); on any failure the input is returned
+    unchanged with info["error"] set.
+    """
+    start = time.perf_counter()
+    info = {"input_bytes": len(audio_bytes), "output_bytes": len(audio_bytes),
+            "format": _audio_format(audio_bytes)[0]}
+    try:
+        import io
+        from pydub import AudioSegment
+        from pydub.silence import detect_leading_silence
+
+        # WAV is read natively; other containers need ffmpeg
+        sound = AudioSegment.from_file(
+            io.BytesIO(audio_bytes), format=info["format"]
+        )
+        info["input_seconds"] = sound.duration_seconds
+        sound = sound.set_channels(1).set_frame_rate(sample_rate)
+        sound = sound.set_sample_width(2)
+
+        if sound.dBFS != float("-inf"):
+            threshold = sound.dBFS - PREPROCESS_SILENCE_DB
+            lead = detect_leading_silence(sound, threshold)
+            tail = detect_leading_silence(sound.reverse(), threshold)
+            lead = max(0, lead - PREPROCESS_KEEP_MS)
+            end = len(sound) - max(0, tail - PREPROCESS_KEEP_MS)
+            if end > lead:
+                sound = sound[lead:end]
+            # Bring speech to a common level without clipping the peaks
+            gain = min(PREPROCESS_TARGET_DBFS - sound.dBFS,
+                       PREPROCESS_PEAK_DBFS - sound.max_dBFS)
+            sound = sound.apply_gain(gain)
+        info["output_seconds"] = sound.duration_seconds
+
+        out, fmt = None, "wav"
+        if codec:
+            try:
+                buf = io.BytesIO()
+                sound.export(buf, **_CODECS[codec])
+                out, fmt = buf.getvalue(), _CODECS[codec]["format"]
+            except Exception as e:
+                info["codec_error"] = str(e)
+        if out is None:
+            buf = io.BytesIO()
+            sound.export(buf, format="wav")
+            out = buf.getvalue()
+    except Exception as e:
+        info["error"] = str(e)
+        info["preprocess_ms"] = (time.perf_counter() - start) * 1000
+        return audio_bytes, info
+
+    info.update({
+        "output_bytes": len(out),
+        "bytes_saved": len(audio_bytes) - len(out),
+        "format": fmt,
+        "preprocess_ms": (time.perf_counter() - start) * 1000,
+    })
+    with _preprocess_lock:
+        _preprocess_stats.append(
+            (info["input_bytes"], info["output_bytes"], info["preprocess_ms"])
+        )
+    return out, info
+
+
+def preprocess_metrics():
+    """Bytes in/out and preprocessing time over recent clips."""
+    with _preprocess_lock:
+        stats = list(_preprocess_stats)
+    bytes_in = sum(s[0] for s in stats)
+    bytes_out = sum(s[1] for s in stats)
+    mean_ms, p50_ms, p95_ms = _percentiles([s[2] for s in stats])
+    return {
+        "clips": len(stats),
+        "bytes_in": bytes_in,
+        "bytes_out": bytes_out,
+        "saved_ratio": 1 - bytes_out / bytes_in if bytes_in else 0.0,
+        "mean_ms": mean_ms, "p50_ms": p50_ms, "p95_ms": p95_ms,
+    }
+
 
-            client = openai.OpenAI(api_key=api_key)
+# ─── ASR Backends ────────────────────────────────────────────────────────
 
-            with tempfile.NamedTemporaryFile(
-                suffix=".wav", delete=False
-            ) as tmp:
-                tmp.write(audio_bytes)
-                tmp_path = tmp.name
+class ASRBackend:
+    """
+    A speech-to-text engine. transcribe() returns the transcribe_audio
+    result dict: status, text, message, plus latency_ms / audio_seconds /
+    rtf when known. Engines that can score their output add
+    "alternatives": [{"text", "confidence"}, ...], best first (the n-best
+    list where the engine has one), for rerank().
+    """
+
+    name = "base"
+    # Compressed upload format this engine accepts (see preprocess_audio);
+    # None means 16 kHz WAV
+    codec = None
+
+    @property
+    def cache_id(self):
+        """Identifies the engine/model for the transcription cache."""
+        return self.name
+
+    @property
+    def breaker_key(self):
+        """Circuit breaker this backend's calls count towards."""
+        return self.name
+
+    def transcribe(self, audio_bytes, language="English"):
+        raise NotImplementedError
+
+    def _record(self, latency_ms, ok, retries=0, audio_seconds=None,
+                error=None, outage=None):
+        """Record a call in the metrics and in the circuit breaker; a failure
+        counts against the breaker only if it is an outage (by default,
+        judged from `error`)."""
+        _record_call(self.name, latency_ms, ok, retries, audio_seconds)
+        breaker = circuit_breaker(self.breaker_key)
+        if outage is None:
+            outage = _is_outage(error)
+        if ok or outage:
+            breaker.record(ok)
+        else:
+            breaker.release()
+
+    def _result(self, text, latency_ms, audio_seconds, **extra):
+        result = {
+            "status": "success" if text else "error",
+            "text": text or "",
+            "message": "" if text else "No speech recognized",
+            "backend": self.name,
+            "latency_ms": latency_ms,
+            "audio_seconds": audio_seconds,
+            "rtf": (latency_ms / 1000.0 / audio_seconds
+                    if audio_seconds else None),
+        }
+        result.update(extra)
+        return result
+
+    def _error(self, message):
+        return {"status": "error", "text": "", "message": message,
+                "backend": self.name}
+
+
+# OpenAI Whisper API
+
+WHISPER_MODEL = "whisper-1"
+WHISPER_TIMEOUT = 30.0
+WHISPER_MAX_RETRIES = 2
+WHISPER_BACKOFF = 0.5
+MAX_CACHED_CLIENTS = 8
+
+_clients = OrderedDict()
+_clients_lock = threading.Lock()
+
+
+def get_whisper_client(api_key):
+    """
+    Shared OpenAI client for an API key. Clients keep their HTTP connection
+    pool (keep-alive, TLS session) across calls; retries are done by
+    WhisperAPIBackend so they can be counted.
+    """
+    cache_key = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+    with _clients_lock:
+        client = _clients.get(cache_key)
+        if client is not None:
+            _clients.move_to_end(cache_key)
+            return client
+
+    import openai
+    http_client = None
+    try:
+        import httpx
+        http_client = httpx.Client(
+            timeout=WHISPER_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=20, max_keepalive_connections=10,
+                keepalive_expiry=120,
+            ),
+        )
+    except ImportError:
+        pass
+    client = openai.OpenAI(
+        api_key=api_key,
+        timeout=WHISPER_TIMEOUT,
+        max_retries=0,
+        http_client=http_client,
+    )
+
+    with _clients_lock:
+        existing = _clients.get(cache_key)
+        if existing is not None:
+            client.close()
+            return existing
+        _clients[cache_key] = client
+        if len(_clients) > MAX_CACHED_CLIENTS:
+            _, evicted = _clients.popitem(last=False)
+            evicted.close()
+    return client
+
+
+def _segment_confidence(segments):
+    """exp(mean avg_logprob) of Whisper segments, or None."""
+    import math
+    logprobs = [
+        seg.get("avg_logprob") if isinstance(seg, dict)
+        else getattr(seg, "avg_logprob", None)
+        for seg in segments or ()
+    ]
+    logprobs = [lp for lp in logprobs if lp is not None]
+    if not logprobs:
+        return None
+    return math.exp(sum(logprobs) / len(logprobs))
+
+
+def _is_retryable(error):
+    import openai
+    return isinstance(error, (
+        openai.APIConnectionError, openai.APITimeoutError,
+        openai.RateLimitError, openai.InternalServerError,
+    ))
+
+
+class WhisperAPIBackend(ASRBackend):
+    """OpenAI Whisper API, audio uploaded from memory, transient retries."""
+
+    name = "whisper_api"
+    codec = PREPROCESS_CODEC
+
+    def __init__(self, api_key):
+        self.api_key = api_key
+
+    @property
+    def cache_id(self):
+        return f"{self.name}:{WHISPER_MODEL}"
 
-            with open(tmp_path, "rb") as audio_file:
+    @property
+    def breaker_key(self):
+        # Per key: one user's failing key must not cut off everyone else
+        digest = hashlib.sha256((self.api_key or "").encode("utf-8"))
+        return f"{self.name}:{digest.hexdigest()[:16]}"
+
+    def transcribe(self, audio_bytes, language="English"):
+        try:
+            client = get_whisper_client(self.api_key)
+        except ImportError:
+            return self._error("Install OpenAI: pip install openai")
+        audio_seconds = _wav_seconds(audio_bytes)
+        ext, mime = _audio_format(audio_bytes)
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
                 transcript = client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
+                    model=WHISPER_MODEL,
+                    file=(f"audio.{ext}", audio_bytes, mime),
                     language=LANGUAGE_MAP.get(language, "en")[:2],
+                    # Segment log-probabilities give a confidence
+                    response_format="verbose_json",
                 )
+                break
+            except Exception as e:
+                if attempt <= WHISPER_MAX_RETRIES and _is_retryable(e):
+                    time.sleep(WHISPER_BACKOFF * 2 ** (attempt - 1))
+                    continue
+                self._record((time.perf_counter() - start) * 1000, False,
+                             attempt - 1, error=e)
+                return self._error(f"Whisper API error: {str(e)}")
+        latency_ms = (time.perf_counter() - start) * 1000
+        self._record(latency_ms, True, attempt - 1, audio_seconds)
+        confidence = _segment_confidence(getattr(transcript, "segments", None))
+        return self._result(
+            transcript.text, latency_ms, audio_seconds, attempts=attempt,
+            alternatives=[{"text": transcript.text, "confidence": confidence}],
+        )
 
-            os.unlink(tmp_path)
 
-            if transcript.text:
-                result["status"] = "success"
-                result["text"] = transcript.text
-                return result
+# Google Speech Recognition (online)
+
+class GoogleBackend(ASRBackend):
+    """Google's free web recognizer via SpeechRecognition."""
+
+    name = "google"
+
+    def transcribe(self, audio_bytes, language="English"):
+        try:
+            import speech_recognition as sr
+            import io
+
+            recognizer = sr.Recognizer()
+
+            audio_io = io.BytesIO(audio_bytes)
+
+            try:
+                with sr.AudioFile(audio_io) as source:
+                    audio_data = recognizer.record(source)
+            except Exception:
+                # Try saving as WAV first
+                import tempfile
+                import os
+
+                with tempfile.NamedTemporaryFile(
+                    suffix=".wav", delete=False
+                ) as tmp:
+                    tmp.write(audio_bytes)
+                    tmp_path = tmp.name
+
+                try:
+                    with sr.AudioFile(tmp_path) as source:
+                        audio_data = recognizer.record(source)
+                finally:
+                    os.unlink(tmp_path)
+
+            lang_code = LANGUAGE_MAP.get(language, "en-US")
+            start = time.perf_counter()
+            try:
+                # show_all returns the n-best list instead of the top text
+                response = recognizer.recognize_google(
+                    audio_data, language=lang_code, show_all=True
+                )
+            except Exception as e:
+                self._record((time.perf_counter() - start) * 1000, False,
+                             error=e)
+                raise
+            latency_ms = (time.perf_counter() - start) * 1000
+            audio_seconds = (
+                len(audio_data.frame_data)
+                / (audio_data.sample_rate * audio_data.sample_width)
+            )
+            # An empty response means no speech: the service itself is fine
+            self._record(latency_ms, True, 0, audio_seconds)
+            alternatives = [
+                {"text": alt["transcript"], "confidence": alt.get("confidence")}
+                for alt in (response or {}).get("alternative", [])
+                if alt.get("transcript")
+            ] if isinstance(response, dict) else []
+            text = alternatives[0]["text"] if alternatives else ""
+            return self._result(text, latency_ms, audio_seconds,
+                                alternatives=alternatives)
+
+        except ImportError:
+            return self._error(
+                "Install SpeechRecognition: pip install SpeechRecognition"
+            )
         except Exception as e:
-            result["message"] = f"Whisper API error: {str(e)}"
-            # Fall through to next method
+            return self._error(f"Speech recognition error: {str(e)}")
 
-    # ── Method 2: Google Speech Recognition ──────────────────────────
-    try:
-        import speech_recognition as sr
-        import io
 
-        recognizer = sr.Recognizer()
+# Local CPU model (offline)
+
+LOCAL_MODEL_PATH = os.environ.get(
+    "DEET_LOCAL_ASR_MODEL", os.path.join("models", "faster-whisper-small")
+)
+
+_local_models = {}
+_local_models_lock = threading.Lock()
+
+
+def load_local_model(model_path=LOCAL_MODEL_PATH, compute_type="int8",
+                     cpu_threads=0):
+    """
+    faster-whisper model from a local CTranslate2 directory, loaded once
+    per process and warmed up with a short silent clip so the first real
+    utterance does not pay the lazy initialisation.
+    """
+    key = (os.path.abspath(model_path), compute_type, cpu_threads)
+    with _local_models_lock:
+        model = _local_models.get(key)
+        if model is not None:
+            return model
+        if not os.path.isdir(model_path):
+            raise FileNotFoundError(
+                f"Local ASR model not found at {model_path}"
+            )
+        from faster_whisper import WhisperModel
+        import numpy as np
+
+        model = WhisperModel(
+            model_path, device="cpu", compute_type=compute_type,
+            cpu_threads=cpu_threads, local_files_only=True,
+        )
+        segments, _ = model.transcribe(
+            np.zeros(16000, dtype=np.float32), language="en", beam_size=1
+        )
+        list(segments)
+        _local_models[key] = model
+        return model
+
+
+class LocalWhisperBackend(ASRBackend):
+    """
+    Offline Whisper on CPU (faster-whisper, int8 weights). Handles English,
+    Hindi and Telugu with a multilingual model such as "small".
+    """
+
+    name = "local"
+
+    def __init__(self, model_path=LOCAL_MODEL_PATH, compute_type="int8",
+                 cpu_threads=0, beam_size=1, word_confidences=True):
+        self.model_path = model_path
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.beam_size = beam_size
+        self.word_confidences = word_confidences
+
+    @property
+    def cache_id(self):
+        return (f"{self.name}:{os.path.basename(os.path.normpath(self.model_path))}"
+                f":{self.compute_type}:{self.beam_size}")
+
+    def warm_up(self):
+        """Load (and warm) the model now rather than on the first call."""
+        load_local_model(self.model_path, self.compute_type, self.cpu_threads)
+        return self
 
-        audio_io = io.BytesIO(audio_bytes)
+    def transcribe(self, audio_bytes, language="English"):
+        import io
+        try:
+            model = load_local_model(
+                self.model_path, self.compute_type, self.cpu_threads
+            )
+        except ImportError:
+            return self._error(
+                "Install the offline engine: pip install faster-whisper"
+            )
+        except Exception as e:
+            return self._error(f"Local ASR unavailable: {str(e)}")
 
+        start = time.perf_counter()
         try:
-            with sr.AudioFile(audio_io) as source:
-                audio_data = recognizer.record(source)
-        except Exception:
-            # Try saving as WAV first
-            import tempfile
-            import os
-
-            with tempfile.NamedTemporaryFile(
-                suffix=".wav", delete=False
-            ) as tmp:
-                tmp.write(audio_bytes)
-                tmp_path = tmp.name
-
-            with sr.AudioFile(tmp_path) as source:
-                audio_data = recognizer.record(source)
-            os.unlink(tmp_path)
-
-        lang_code = LANGUAGE_MAP.get(language, "en-US")
-        text = recognizer.recognize_google(
-            audio_data, language=lang_code
+            segments, info = model.transcribe(
+                io.BytesIO(audio_bytes),
+                language=LANGUAGE_MAP.get(language, "en")[:2],
+                beam_size=self.beam_size,
+                vad_filter=True,
+                word_timestamps=self.word_confidences,
+            )
+            segments = list(segments)
+            text = " ".join(seg.text.strip() for seg in segments).strip()
+        except Exception as e:
+            # The in-process engine has no "bad request": a failure is its own
+            self._record((time.perf_counter() - start) * 1000, False,
+                         error=e, outage=True)
+            return self._error(f"Local ASR error: {str(e)}")
+        latency_ms = (time.perf_counter() - start) * 1000
+        self._record(latency_ms, True, 0, info.duration)
+        words = [
+            {"word": w.word.strip(), "probability": w.probability}
+            for seg in segments for w in (getattr(seg, "words", None) or ())
+        ]
+        confidence = (
+            sum(w["probability"] for w in words) / len(words) if words
+            else _segment_confidence(segments)
+        )
+        return self._result(
+            text, latency_ms, info.duration, words=words,
+            alternatives=[{"text": text, "confidence": confidence}],
         )
 
-        result["status"] = "success"
-        result["text"] = text
+
+class FallbackBackend(ASRBackend):
+    """Try backends in order; the first success wins."""
+
+    name = "auto"
+
+    def __init__(self, backends):
+        self.backends = list(backends)
+
+    @property
+    def cache_id(self):
+        return "auto:" + ",".join(b.cache_id for b in self.backends)
+
+    @property
+    def codec(self):
+        # The same clip may reach every backend in the chain
+        codecs = {b.codec for b in self.backends}
+        return codecs.pop() if len(codecs) == 1 else None
+
+    def transcribe(self, audio_bytes, language="English"):
+        result = self._error("No speech recognition backend available")
+        for backend in self.backends:
+            if not circuit_breaker(backend.breaker_key).allow():
+                result = backend._error(
+                    f"{backend.name} skipped after repeated failures"
+                )
+                continue
+            result = backend.transcribe(audio_bytes, language)
+            if result["status"] == "success":
+                return result
         return result
 
-    except ImportError:
-        result["message"] = (
-            "Install SpeechRecognition: pip install SpeechRecognition"
-        )
-    except Exception as e:
-        result["message"] = f"Speech recognition error: {str(e)}"
 
+# Hedged requests: if the primary has not answered within its usual
+# latency, start the next backend too and take the first good answer.
+
+HEDGE_ENABLED = os.environ.get("DEET_ASR_HEDGE", "1") != "0"
+HEDGE_PERCENTILE = float(os.environ.get("DEET_ASR_HEDGE_PERCENTILE", "0.9"))
+HEDGE_DEFAULT_DELAY = 3.0   # seconds, until a backend has latency history
+HEDGE_MIN_DELAY = 0.3
+HEDGE_MIN_SAMPLES = 20
+
+_hedge_executor = None
+_hedge_executor_lock = threading.Lock()
+
+
+def _hedge_pool():
+    # Separate from transcription_executor(): hedged calls already run on
+    # that pool and must not wait on their own workers
+    global _hedge_executor
+    with _hedge_executor_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(
+                max_workers=16, thread_name_prefix="asr-hedge"
+            )
+        return _hedge_executor
+
+
+def hedge_delay(backend, percentile=HEDGE_PERCENTILE):
+    """Seconds to wait for a backend before hedging: its recent latency at
+    `percentile`, or HEDGE_DEFAULT_DELAY without enough history."""
+    with _metrics_lock:
+        m = _metrics.get(backend)
+        latencies = sorted(m["latencies_ms"]) if m else []
+    if len(latencies) < HEDGE_MIN_SAMPLES:
+        return HEDGE_DEFAULT_DELAY
+    index = min(len(latencies) - 1, int(len(latencies) * percentile))
+    return max(HEDGE_MIN_DELAY, latencies[index] / 1000.0)
+
+
+class HedgedBackend(FallbackBackend):
+    """
+    Backends in order of preference, hedged: the next one starts when the
+    current one fails or is slower than its hedge_delay(); the first
+    success wins and the other calls are cancelled (calls already in
+    flight finish in the background and are ignored).
+    """
+
+    name = "hedged"
+
+    def __init__(self, backends, percentile=HEDGE_PERCENTILE):
+        super().__init__(backends)
+        self.percentile = percentile
+
+    def transcribe(self, audio_bytes, language="English"):
+        queue = list(self.backends)
+        pool = _hedge_pool()
+        pending = {}
+        result = None
+        started = 0
+
+        def launch():
+            # allow() only when a call really starts: in half-open state it
+            # hands out the single trial slot
+            nonlocal started
+            while queue:
+                backend = queue.pop(0)
+                if circuit_breaker(backend.breaker_key).allow():
+                    future = pool.submit(backend.transcribe, audio_bytes,
+                                         language)
+                    pending[future] = backend
+                    started += 1
+                    return backend
+            return None
+
+        current = launch()
+        if current is None:
+            return self._error(
+                "Speech recognition is temporarily unavailable; "
+                "please try again shortly"
+            )
+        while pending:
+            timeout = (hedge_delay(current.name, self.percentile)
+                       if queue else None)
+            done, _ = wait(pending, timeout=timeout,
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                backend = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = backend._error(f"{backend.name} failed: {e}")
+                if result["status"] == "success":
+                    for other, other_backend in pending.items():
+                        if other.cancel():
+                            key = other_backend.breaker_key
+                            circuit_breaker(key).release()
+                    result["hedged"] = started > 1
+                    return result
+            # Slow primary (timeout) or a failure: bring in the next one
+            if queue and (not done or not pending):
+                current = launch() or current
+        return result
+
+
+ASR_BACKENDS = {
+    "auto": "Whisper API if a key is given, else Google (online)",
+    "whisper_api": "OpenAI Whisper API (online)",
+    "google": "Google Speech Recognition (online)",
+    "local": "Local Whisper model on CPU (offline)",
+}
+
+
+def get_backend(name="auto", api_key=None, model_path=None,
+                hedge=HEDGE_ENABLED):
+    """ASR backend by name (see ASR_BACKENDS). With `hedge`, "auto" races
+    its backends (HedgedBackend) instead of trying them one after another."""
+    if name == "local":
+        return LocalWhisperBackend(model_path or LOCAL_MODEL_PATH)
+    if name == "whisper_api":
+        return WhisperAPIBackend(api_key)
+    if name == "google":
+        return GoogleBackend()
+    if name == "auto":
+        chain = [WhisperAPIBackend(api_key)] if api_key else []
+        chain.append(GoogleBackend())
+        if hedge and len(chain) > 1:
+            return HedgedBackend(chain)
+        return FallbackBackend(chain)
+    raise ValueError(f"Unknown ASR backend: {name}")
+
+
+# ─── Transcription Cache ─────────────────────────────────────────────────
+
+class TranscriptionCache:
+    """
+    Bounded LRU of successful transcriptions keyed by a hash of the audio
+    bytes, the language and the backend, optionally backed by SQLite so
+    entries survive restarts and are shared between processes.
+    """
+
+    def __init__(self, max_entries=1024, path=None, timeout=5.0):
+        self.max_entries = max_entries
+        self.path = path
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._local = threading.local()
+        if path:
+            self._conn().execute(
+                "CREATE TABLE IF NOT EXISTS transcripts ("
+                " key TEXT PRIMARY KEY,"
+                " text TEXT NOT NULL,"
+                " backend TEXT NOT NULL,"
+                " created_at REAL NOT NULL"
+                ") WITHOUT ROWID"
+            )
+
+    def _conn(self):
+        import sqlite3
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path, timeout=self.timeout, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def key(audio_bytes, language, backend):
+        digest = hashlib.sha256(audio_bytes).hexdigest()
+        return f"{digest}:{language}:{backend.cache_id}"
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key):
+        """Cached (text, backend name) or None."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+        if self.path:
+            row = self._conn().execute(
+                "SELECT text, backend FROM transcripts WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self._remember(key, row)
+                with self._lock:
+                    self.hits += 1
+                return row
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, text, backend_name):
+        self._remember(key, (text, backend_name))
+        if self.path:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?)",
+                (key, text, backend_name, time.time()),
+            )
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits,
+                    "misses": self.misses}
+
+
+# Set DEET_TRANSCRIPT_CACHE to a file path to persist the cache
+TRANSCRIPTION_CACHE = TranscriptionCache(
+    path=os.environ.get("DEET_TRANSCRIPT_CACHE") or None
+)
+
+
+def transcribe_audio(audio_bytes, language="English", api_key=None,
+                     backend=None, cache=TRANSCRIPTION_CACHE, preprocess=True):
+    """
+    Transcribe audio bytes to text.
+    Uses the given ASRBackend; by default tries OpenAI Whisper API first
+    (if key provided), then falls back to Google Speech Recognition.
+    Identical clips are answered from `cache` (pass None to bypass it);
+    cached results have "cached": True. With `preprocess`, the clip goes
+    through preprocess_audio() first and result["preprocess"] reports the
+    bytes saved and the time it took.
+    """
+    if not audio_bytes:
+        return {"status": "error", "text": "", "message": "No audio received"}
+
+    if backend is None:
+        backend = get_backend("auto", api_key)
+
+    key = cache.key(audio_bytes, language, backend) if cache is not None else None
+    if cache is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            return {"status": "success", "text": hit[0], "message": "",
+                    "backend": hit[1], "cached": True}
+
+    info = None
+    if preprocess:
+        audio_bytes, info = preprocess_audio(audio_bytes, backend.codec)
+    result = backend.transcribe(audio_bytes, language)
+    if info is not None:
+        result["preprocess"] = info
+        # Compressed uploads have no WAV header to time
+        seconds = info.get("output_seconds")
+        if result.get("latency_ms") and seconds and not result.get("rtf"):
+            result["audio_seconds"] = seconds
+            result["rtf"] = result["latency_ms"] / 1000.0 / seconds
+    if cache is not None and result["status"] == "success":
+        cache.put(key, result["text"], result.get("backend", backend.name))
     return result
 
 
-# ─── Post-Processing Functions ───────────────────────────────────────────
+# ─── Concurrent Transcription ────────────────────────────────────────────
 
-def post_process_name(text):
-    """Clean up a spoken name."""
-    name = re.sub(r'[^a-zA-Z\s\.]', '', text)
-    name = " ".join(name.split())
-    return name.title().strip()
+TRANSCRIBE_WORKERS = int(os.environ.get("DEET_ASR_WORKERS", "8"))
 
+_executor = None
+_executor_lock = threading.Lock()
 
-def post_process_phone(text):
-    """Extract phone number from spoken text."""
-    # Map spoken words to digits
-    word_to_digit = {
-        "zero": "0", "one": "1", "two": "2", "three": "3",
-        "four": "4", "five": "5", "six": "6", "seven": "7",
-        "eight": "8", "nine": "9", "oh": "0", "o": "0",
-        "to": "2", "too": "2", "for": "4", "won": "1",
-        "tree": "3", "ate": "8", "niner": "9",
-        "double": "", "triple": "",
-    }
 
-    text_lower = text.lower()
+def transcription_executor():
+    """Process-wide thread pool for transcriptions (ASR calls are I/O bound
+    or release the GIL, so threads overlap them)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=TRANSCRIBE_WORKERS, thread_name_prefix="asr"
+            )
+        return _executor
 
-    # Handle "double X" → "XX"
-    text_lower = re.sub(
-        r'double\s+(\w+)',
-        lambda m: (word_to_digit.get(m.group(1), m.group(1))) * 2,
-        text_lower,
-    )
-    text_lower = re.sub(
-        r'triple\s+(\w+)',
-        lambda m: (word_to_digit.get(m.group(1), m.group(1))) * 3,
-        text_lower,
+
+def submit_transcription(audio_bytes, language="English", api_key=None,
+                         backend=None, cache=TRANSCRIPTION_CACHE):
+    """Start transcribe_audio() in the background; returns a Future."""
+    if backend is None:
+        backend = get_backend("auto", api_key)
+    return transcription_executor().submit(
+        transcribe_audio, audio_bytes, language, api_key, backend, cache
     )
 
-    # Replace words with digits
-    for word, digit in word_to_digit.items():
-        text_lower = re.sub(r'\b' + word + r'\b', digit, text_lower)
 
-    # Extract only digits
-    digits = re.sub(r'[^\d]', '', text_lower)
+# ─── N-best Reranking ────────────────────────────────────────────────────
+# A misheard answer costs a whole re-recording. When the recognizer offers
+# alternatives, the best one that fits the field's grammar is used instead
+# of blindly taking the top hypothesis.
 
-    # Take last 10 digits
-    if len(digits) >= 10:
-        return digits[-10:]
-    return digits
+_EMAIL_SHAPE = re.compile(
+    r"^[a-z0-9][a-z0-9._%+-]*@[a-z0-9-]+(\.[a-z0-9-]+)*\.[a-z]{2,}$"
+)
+_MOBILE_SHAPE = re.compile(r"^[6-9]\d{9}$")
+_NAME_SHAPE = re.compile(r"^[A-Za-z][A-Za-z .]{1,}$")
 
+# Weight of the grammar fit against the recognizer's own confidence
+RERANK_GRAMMAR_WEIGHT = 0.6
 
-def post_process_email(text):
-    """Clean up a spoken email address."""
-    email = text.lower().strip()
-
-    replacements = {
-        " at the rate ": "@",
-        " at the rate of ": "@",
-        " at ": "@",
-        " at sign ": "@",
-        " dot ": ".",
-        " period ": ".",
-        " underscore ": "_",
-        " hyphen ": "-",
-        " dash ": "-",
-        " space ": "",
-        " ": "",
+_rerank_lock = threading.Lock()
+_rerank_stats = {}
+
+
+def field_grammars(resolver=None):
+    """
+    Grammar checks by voice field: text -> fit in (0, 1], or None if the
+    text cannot be a valid answer. Vocabulary fields need a
+    vocab_resolver.VocabularyResolver.
+    """
+    grammars = {
+        "phone": lambda text: 1.0 if _MOBILE_SHAPE.match(
+            normalize_phone(text)) else None,
+        "email": lambda text: 1.0 if _EMAIL_SHAPE.match(
+            normalize_email(text)) else None,
+        "name": lambda text: 1.0 if _NAME_SHAPE.match(
+            post_process_name(text)) else None,
     }
+    if resolver is not None:
+        def vocabulary(field):
+            def check(text):
+                matches = resolver.find(field, text)
+                return max(m.confidence for m in matches) if matches else None
+            return check
+        for field in resolver.vocabularies:
+            grammars[field] = vocabulary(field)
+    return grammars
 
-    for spoken, symbol in replacements.items():
-        email = email.replace(spoken, symbol)
 
-    # Remove remaining spaces
-    email = email.replace(" ", "")
+def _record_rerank(field, **counts):
+    with _rerank_lock:
+        stats = _rerank_stats.setdefault(field, {
+            "clips": 0, "top_valid": 0, "rescued": 0, "invalid": 0,
+            "retries": 0,
+        })
+        for key, n in counts.items():
+            stats[key] += n
 
-    return email
 
+def record_retry(field):
+    """Count a field the user had to record again."""
+    _record_rerank(field, retries=1)
 
-def post_process_gender(text):
-    """Map spoken text to gender option."""
-    text_lower = text.lower().strip()
 
-    if any(w in text_lower for w in ["male", "man", "boy", "purush", "పురుషుడు"]):
-        if "female" in text_lower or "woman" in text_lower:
-            return "Female"
-        return "Male"
-    if any(w in text_lower for w in ["female", "woman", "girl", "mahila", "స్త్రీ"]):
-        return "Female"
-    if any(w in text_lower for w in ["trans", "transgender"]):
-        return "Transgender"
-    if any(w in text_lower for w in ["other", "anya", "ఇతర"]):
-        return "Other"
+def rerank(field, transcription, grammars):
+    """
+    Keep the recognizer's top hypothesis when it fits the field's grammar;
+    otherwise pick the alternative that best fits it (weighted with the
+    recognizer's confidence). Returns the transcription with "text" set to
+    the chosen hypothesis and a "rerank" summary; results that cannot be
+    reranked are returned unchanged.
+    """
+    check = grammars.get(field)
+    if check is None or transcription.get("status") != "success":
+        return transcription
+    alternatives = transcription.get("alternatives") or [
+        {"text": transcription["text"], "confidence": None}
+    ]
+
+    # Google scores only the first of its n-best alternatives: unscored ones
+    # rank below every real confidence, in the recognizer's order
+    floor = min((alt["confidence"] for alt in alternatives
+                 if alt.get("confidence") is not None), default=1.0)
+    scored = []
+    for rank, alt in enumerate(alternatives):
+        fit = check(alt["text"])
+        confidence = alt.get("confidence")
+        if confidence is None:
+            confidence = max(0.0, floor * (1 - 0.1 * rank))
+        score = (RERANK_GRAMMAR_WEIGHT * (fit or 0.0)
+                 + (1 - RERANK_GRAMMAR_WEIGHT) * confidence)
+        scored.append((fit is not None, score, -rank, alt))
+    # The grammar only overrides the recognizer when its answer is invalid
+    # and some alternative is valid
+    top_valid = scored[0][0]
+    valid, score, neg_rank, chosen = scored[0]
+    if not top_valid and any(s[0] for s in scored):
+        valid, score, neg_rank, chosen = max(scored, key=lambda s: s[:3])
+    rescued = valid and not top_valid
+    _record_rerank(field, clips=1, top_valid=int(top_valid),
+                   rescued=int(rescued), invalid=int(not valid))
 
-    return text.strip().title()
+    result = dict(transcription)
+    result["text"] = chosen["text"]
+    result["rerank"] = {
+        "chosen": -neg_rank,
+        "candidates": len(alternatives),
+        "valid": valid,
+        "rescued": rescued,
+    }
+    return result
 
 
-def post_process_education(text):
-    """Map spoken text to education option."""
-    text_lower = text.lower().strip()
-
-    mapping = {
-        "phd": "PhD",
-        "doctorate": "PhD",
-        "post graduate": "Post Graduate (M.Tech/ME/MBA/MCA/MSc/MA/MCom)",
-        "postgraduate": "Post Graduate (M.Tech/ME/MBA/MCA/MSc/MA/MCom)",
-        "masters": "Post Graduate (M.Tech/ME/MBA/MCA/MSc/MA/MCom)",
-        "mtech": "Post Graduate (M.Tech/ME/MBA/MCA/MSc/MA/MCom)",
-        "m tech": "Post Graduate (M.Tech/ME/MBA/MCA/MSc/MA/MCom)",
-        "mba": "Post Graduate (M.Tech/ME/MBA/MCA/MSc/MA/MCom)",
-        "mca": "Post Graduate (M.Tech/ME/MBA/MCA/MSc/MA/MCom)",
-        "msc": "Post Graduate (M.Tech/ME/MBA/MCA/MSc/MA/MCom)",
-        "undergraduate": "Undergraduate (B.Tech/BE/BBA/BCA/BSc/BA/BCom)",
-        "bachelors": "Undergraduate (B.Tech/BE/BBA/BCA/BSc/BA/BCom)",
-        "bachelor": "Undergraduate (B.Tech/BE/BBA/BCA/BSc/BA/BCom)",
-        "btech": "Undergraduate (B.Tech/BE/BBA/BCA/BSc/BA/BCom)",
-        "b tech": "Undergraduate (B.Tech/BE/BBA/BCA/BSc/BA/BCom)",
-        "degree": "Undergraduate (B.Tech/BE/BBA/BCA/BSc/BA/BCom)",
-        "graduation": "Undergraduate (B.Tech/BE/BBA/BCA/BSc/BA/BCom)",
-        "diploma": "Diploma",
-        "intermediate": "Intermediate/12th",
-        "12th": "Intermediate/12th",
-        "inter": "Intermediate/12th",
-        "plus two": "Intermediate/12th",
-        "ssc": "SSC/10th",
-        "10th": "SSC/10th",
-        "tenth": "SSC/10th",
-        "matriculation": "SSC/10th",
-        "iti": "ITI",
-        "below 10th": "Below 10th",
-        "below tenth": "Below 10th",
+def rerank_metrics(field=None):
+    """
+    Per-field reranking counts: clips reranked, top hypothesis already
+    valid, rescued by a lower-ranked alternative (a retry avoided), no
+    valid alternative, and re-recordings; plus the share of would-be
+    retries that reranking avoided.
+    """
+    with _rerank_lock:
+        snapshot = {name: dict(stats) for name, stats in _rerank_stats.items()
+                    if field is None or name == field}
+    for stats in snapshot.values():
+        would_retry = stats["rescued"] + stats["retries"]
+        stats["retries_avoided"] = (
+            stats["rescued"] / would_retry if would_retry else 0.0
+        )
+    if field is not None:
+        return snapshot.get(field, {})
+    return snapshot
+
+
+# ─── Continuous Session ──────────────────────────────────────────────────
+# One recording in which the user answers every prompt in turn. An energy
+# voice-activity detector splits it at pauses into one segment per field.
+
+SESSION_FIELDS = tuple(PROMPTS)
+
+VAD_FRAME_MS = 30
+VAD_MIN_SPEECH_MS = 300     # shorter bursts are clicks/breaths
+VAD_MIN_SILENCE_MS = 600    # shorter pauses stay inside one answer
+VAD_PAD_MS = 150            # kept around each segment
+VAD_NOISE_FACTOR = 3.0      # speech threshold over the noise floor
+VAD_MIN_RMS = 0.01          # absolute floor for very clean recordings
+
+
+def _read_wav(audio_bytes):
+    """(mono float samples in [-1, 1], sample rate) of a PCM WAV."""
+    import io
+    import wave
+    import numpy as np
+
+    with wave.open(io.BytesIO(audio_bytes)) as w:
+        channels, width = w.getnchannels(), w.getsampwidth()
+        rate, frames = w.getframerate(), w.readframes(w.getnframes())
+    if width == 1:
+        samples = np.frombuffer(frames, np.uint8).astype(np.float32) - 128.0
+        scale = 128.0
+    elif width in (2, 4):
+        samples = np.frombuffer(frames, f"<i{width}").astype(np.float32)
+        scale = float(2 ** (8 * width - 1))
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width} bytes")
+    if channels > 1:
+        samples = samples[: len(samples) // channels * channels]
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples / scale, rate
+
+
+def _write_wav(samples, rate):
+    """16-bit mono WAV bytes."""
+    import io
+    import wave
+    import numpy as np
+
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(pcm.tobytes())
+    return buf.getvalue()
+
+
+def detect_speech(samples, rate):
+    """
+    [start, end) sample ranges of speech, from per-frame RMS energy against
+    an adaptive threshold (a multiple of the quietest frames' level).
+    """
+    import numpy as np
+
+    frame = max(1, rate * VAD_FRAME_MS // 1000)
+    n = len(samples) // frame
+    if n == 0:
+        return []
+    rms = np.sqrt(np.mean(samples[: n * frame].reshape(n, frame) ** 2, axis=1))
+    noise = float(np.percentile(rms, 10))
+    voiced = rms > max(noise * VAD_NOISE_FACTOR, VAD_MIN_RMS)
+
+    # Rising/falling edges of the voiced mask give the runs in one pass
+    padded = np.concatenate(([0], voiced.astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(padded))
+    runs = edges.reshape(-1, 2)
+
+    min_gap = VAD_MIN_SILENCE_MS // VAD_FRAME_MS
+    min_len = VAD_MIN_SPEECH_MS // VAD_FRAME_MS
+    merged = []
+    for start, end in runs:
+        if merged and start - merged[-1][1] < min_gap:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start * frame, end * frame) for start, end in merged
+            if end - start >= min_len]
+
+
+def _merge_to_count(segments, count):
+    """Join the segments separated by the shortest pauses until at most
+    `count` remain (pauses inside an answer are shorter than between)."""
+    segments = [list(s) for s in segments]
+    while len(segments) > count:
+        gaps = [segments[i + 1][0] - segments[i][1]
+                for i in range(len(segments) - 1)]
+        i = gaps.index(min(gaps))
+        segments[i][1] = segments[i + 1][1]
+        del segments[i + 1]
+    return [tuple(s) for s in segments]
+
+
+def split_session(audio_bytes, count=len(SESSION_FIELDS)):
+    """
+    Split a continuous recording into at most `count` WAV clips, one per
+    spoken answer, in order.
+    """
+    samples, rate = _read_wav(audio_bytes)
+    pad = rate * VAD_PAD_MS // 1000
+    segments = _merge_to_count(detect_speech(samples, rate), count)
+    return [
+        _write_wav(samples[max(0, start - pad): end + pad], rate)
+        for start, end in segments
+    ]
+
+
+class IncompleteSessionError(ValueError):
+    """Fewer answers were heard than there are fields."""
+
+    def __init__(self, heard, expected):
+        super().__init__(f"Heard {heard} answers for {expected} questions")
+        self.heard = heard
+        self.expected = expected
+
+
+def submit_session(audio_bytes, language="English", api_key=None,
+                   backend=None, cache=TRANSCRIPTION_CACHE,
+                   fields=SESSION_FIELDS):
+    """
+    Segment a continuous recording and start transcribing every segment.
+    Returns {field: Future}, in order.
+
+    Segments are matched to fields by position, so if an answer was
+    skipped every later one would land in the wrong field; a recording
+    with fewer segments than fields raises IncompleteSessionError instead.
+    """
+    clips = split_session(audio_bytes, len(fields))
+    if len(clips) < len(fields):
+        raise IncompleteSessionError(len(clips), len(fields))
+    return {
+        field: submit_transcription(clip, language, api_key, backend, cache)
+        for field, clip in zip(fields, clips)
     }
 
-    for keyword, education_level in mapping.items():
-        if keyword in text_lower:
-            return education_level
+# ─── Post-Processing Functions ───────────────────────────────────────────
+
+# Gender and education option lists (districts and skills are app-specific;
+# app.py builds a resolver over its own lists)
+_FORM_VOCABULARY = build_resolver()
 
-    return None
+def post_process_name(text):
+    """Clean up a spoken name."""
+    name = re.sub(r'[^a-zA-Z\s\.]', '', text)
+    name = " ".join(name.split())
+    return name.title().strip()
+
+
+def post_process_phone(text):
+    """Extract phone number from spoken text (English, Hindi or Telugu
+    number words, "double"/"triple", native-script digits)."""
+    return normalize_phone(text)
+
+
+def post_process_email(text):
+    """Clean up a spoken email address ("at the rate", "dot",
+    "underscore", ... in English, Hindi or Telugu)."""
+    return normalize_email(text)
+
+
+def post_process_gender(text):
+    """Map spoken text to gender option."""
+    match = _FORM_VOCABULARY.best("gender", text)
+    return match.value if match else text.strip().title()
+
+
+def post_process_education(text):
+    """Map spoken text to education option."""
+    match = _FORM_VOCABULARY.best("education", text)
+    return match.value if match else None
 
 
 def post_process_skills(text):